@@ -0,0 +1,128 @@
+"""Управление работающим ботом через локальный Unix-сокет.
+
+Пример запуска:
+    python admin.py tenants
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import threading
+
+ADMIN_SOCKET = os.getenv("ADMIN_SOCKET")
+ADMIN_TIMEOUT = 10
+
+logger = logging.getLogger(__name__)
+
+
+class AdminHandler(socketserver.StreamRequestHandler):
+    """Выполняет одну команду: строка JSON в ответ на строку JSON.
+
+    Запрос — {"command": "...", "args": [...]}, ответ —
+    {"ok": true, "result": ...} или {"ok": false, "error": "..."}.
+    """
+
+    def handle(self):
+        """Читает команду, выполняет её и отвечает."""
+        try:
+            request = json.loads(self.rfile.readline())
+            command = self.server.commands[request["command"]]
+            result = command(*request.get("args", []))
+            response = {"ok": True, "result": result}
+        except (ValueError, KeyError, TypeError) as error:
+            response = {"ok": False, "error": f"Некорректная команда: {error}"}
+        except Exception as error:
+            logger.error(f"Ошибка команды управления: {error}")
+            response = {"ok": False, "error": str(error)}
+        self.wfile.write(json.dumps(
+            response, ensure_ascii=False, default=str).encode() + b"\n")
+
+
+class AdminServer:
+    """Сервер команд управления на Unix-сокете.
+
+    commands — словарь имя → функция, результат которой отдаётся
+    в JSON. Сокет доступен только владельцу процесса.
+    """
+
+    def __init__(self, commands, path=ADMIN_SOCKET):
+        self.path = path
+        if os.path.exists(path) and not self.alive(path):
+            os.remove(path)
+        self.server = socketserver.ThreadingUnixStreamServer(
+            path, AdminHandler)
+        self.server.daemon_threads = True
+        self.server.commands = commands
+        os.chmod(path, 0o600)
+
+    @staticmethod
+    def alive(path):
+        """Слушает ли сокет другой процесс."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            try:
+                client.connect(path)
+            except OSError:
+                return False
+        return True
+
+    def start(self):
+        """Запускает сервер в фоновом потоке."""
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        logger.info(f"Команды управления на {self.path}.")
+
+    def stop(self):
+        """Останавливает сервер и удаляет сокет."""
+        self.server.shutdown()
+        self.server.server_close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def call(path, command, *args, timeout=ADMIN_TIMEOUT):
+    """Отправляет команду работающему боту и возвращает результат."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path)
+        client.sendall(json.dumps(
+            {"command": command, "args": list(args)}).encode() + b"\n")
+        with client.makefile("rb") as reply:
+            response = json.loads(reply.readline())
+    if not response["ok"]:
+        raise RuntimeError(response["error"])
+    return response["result"]
+
+
+def main():
+    """Выполняет команду управления из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--socket", default=ADMIN_SOCKET, required=not ADMIN_SOCKET,
+        help="путь к сокету (по умолчанию ADMIN_SOCKET)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser(
+        "tenants", help="тенанты: последний опрос, опоздание, состояние")
+    poll = commands.add_parser("poll", help="опросить тенанта немедленно")
+    poll.add_argument("tenant_id")
+    commands.add_parser("caches", help="размеры кешей и очередей")
+    debug = commands.add_parser("debug", help="подробный лог")
+    debug.add_argument("mode", choices=("on", "off"))
+    profile = commands.add_parser("profile", help="профилировать циклы")
+    profile.add_argument("cycles", type=int, nargs="?")
+    args = parser.parse_args()
+    arguments = [
+        value for name, value in vars(args).items()
+        if name not in ("socket", "command") and value is not None
+    ]
+    try:
+        result = call(args.socket, args.command, *arguments)
+    except (OSError, RuntimeError) as error:
+        print(f"Ошибка: {error}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
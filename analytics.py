@@ -0,0 +1,97 @@
+import math
+
+from state import homework_key, parse_date_updated
+
+REVIEW_STATUS = "reviewing"
+FINAL_STATUSES = ("approved", "rejected")
+# Скетч квантилей: логарифмические корзины с относительной ошибкой
+# SKETCH_ACCURACY. Всё короче минуты попадает в первую корзину,
+# поэтому корзин не больше ~120 на любой разброс до нескольких месяцев.
+SKETCH_ACCURACY = 0.05
+SKETCH_MIN_SECONDS = 60
+GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+
+
+def bucket_of(seconds):
+    """Номер корзины скетча для длительности seconds."""
+    if seconds <= SKETCH_MIN_SECONDS:
+        return 0
+    return math.ceil(math.log(seconds / SKETCH_MIN_SECONDS, GAMMA))
+
+
+def bucket_value(index):
+    """Представитель корзины с ошибкой не больше SKETCH_ACCURACY."""
+    if index == 0:
+        return SKETCH_MIN_SECONDS
+    return SKETCH_MIN_SECONDS * 2 * GAMMA ** index / (GAMMA + 1)
+
+
+def new_turnaround():
+    """Пустые агрегаты времени проверки."""
+    return {"count": 0, "total": 0, "max": 0, "verdicts": {}, "buckets": {}}
+
+
+def observe(stats, seconds, verdict):
+    """Добавляет одну проверку в агрегаты за O(1)."""
+    stats["count"] += 1
+    stats["total"] += seconds
+    stats["max"] = max(stats["max"], seconds)
+    stats["verdicts"][verdict] = stats["verdicts"].get(verdict, 0) + 1
+    # Ключи строковые: агрегаты хранятся в JSON-файле состояния.
+    bucket = str(bucket_of(seconds))
+    stats["buckets"][bucket] = stats["buckets"].get(bucket, 0) + 1
+
+
+def quantile(stats, fraction):
+    """Приближённый квантиль времени проверки по скетчу."""
+    if not stats["count"]:
+        return 0
+    rank = fraction * (stats["count"] - 1)
+    seen = 0
+    for bucket in sorted(stats["buckets"], key=int):
+        seen += stats["buckets"][bucket]
+        if seen > rank:
+            return min(bucket_value(int(bucket)), stats["max"])
+    return stats["max"]
+
+
+def record_transition(tenant_state, homework):
+    """Учитывает переход работы из reviewing в итоговый статус.
+
+    Вызывается до mark_seen, пока в состоянии тенанта лежит
+    предыдущий статус работы.
+    """
+    if homework.get("status") not in FINAL_STATUSES:
+        return
+    previous = tenant_state["homeworks"].get(homework_key(homework))
+    if not previous or previous["status"] != REVIEW_STATUS:
+        return
+    reviewed = parse_date_updated(homework.get("date_updated"))
+    if reviewed is None or previous["date_updated"] is None:
+        return
+    stats = tenant_state.setdefault("turnaround", new_turnaround())
+    observe(stats, max(reviewed - previous["date_updated"], 0),
+            homework["status"])
+
+
+def summary(stats):
+    """Сводка агрегатов в часах."""
+    count = stats["count"]
+    return {
+        "reviews": count,
+        "verdicts": dict(stats["verdicts"]),
+        "mean_hours": round(stats["total"] / count / 3600, 2) if count else 0,
+        "p50_hours": round(quantile(stats, 0.5) / 3600, 2),
+        "p90_hours": round(quantile(stats, 0.9) / 3600, 2),
+        "max_hours": round(stats["max"] / 3600, 2),
+    }
+
+
+def turnaround_report(state):
+    """Время проверки работ по всем тенантам состояния PollState."""
+    with state.lock:
+        return {
+            tenant_id: summary(tenant["turnaround"])
+            for tenant_id, tenant in state.tenants.items()
+            if "turnaround" in tenant
+        }
@@ -0,0 +1,151 @@
+"""Сравнение поиска изменений статусов с прежним порядком проверок.
+
+Журнал пишется в файл на уровне DEBUG, как у запущенного бота, потому
+что запись повторов в журнал — заметная часть стоимости сверки.
+
+Пример запуска:
+    python bench_diff.py --tenants 50 --homeworks 200 --changed 0.01
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import state as state_module
+from state import PollState, homework_key, parse_date_updated
+
+BENCH_START = 1_700_000_000
+STATUSES = ("reviewing", "approved", "rejected")
+
+
+def reconcile_date_first(state, tenant_id, homeworks):
+    """Прежний поиск изменений: date_updated разбирается у каждой работы.
+
+    Как и прежде, каждый повтор пишется в журнал отдельной строкой.
+    PollState.reconcile сначала сравнивает статус, разбирает дату
+    только у работ со сменившимся статусом и пишет повторы одной
+    строкой на вызов.
+    """
+    logger = state_module.logger
+    known = state.tenant(tenant_id)["homeworks"]
+    changed = []
+    for homework in homeworks:
+        if not isinstance(homework, dict):
+            changed.append(homework)
+            continue
+        previous = known.get(homework_key(homework))
+        if previous is None:
+            changed.append(homework)
+            continue
+        updated = parse_date_updated(homework.get("date_updated"))
+        if (updated is not None and previous["date_updated"]
+                and updated < previous["date_updated"]):
+            logger.debug(
+                f"Устаревшее обновление работы {homework_key(homework)}.")
+        elif previous["status"] == homework.get("status"):
+            logger.debug("Сообщение не отправлено: дублирование.")
+        else:
+            changed.append(homework)
+    return changed
+
+
+def api_date(timestamp):
+    """Дата в формате API."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime(
+        "%Y-%m-%dT%H:%M:%SZ")
+
+
+def make_responses(tenants, homeworks, changed, rng):
+    """Состояние и ответы API, в которых изменилась доля changed работ."""
+    state = PollState(None, BENCH_START)
+    responses = {}
+    for tenant in range(tenants):
+        tenant_id = f"tenant-{tenant}"
+        response = []
+        for number in range(homeworks):
+            record = {
+                "id": number,
+                "homework_name": f"hw{number}",
+                "status": rng.choice(STATUSES),
+                "date_updated": api_date(BENCH_START + number),
+            }
+            state.mark_seen(tenant_id, record)
+            if rng.random() < changed:
+                record = dict(
+                    record, status="approved",
+                    date_updated=api_date(BENCH_START + homeworks + number))
+                if state.tenants[tenant_id]["homeworks"][
+                        homework_key(record)]["status"] == "approved":
+                    record["status"] = "rejected"
+            response.append(record)
+        responses[tenant_id] = response
+    return state, responses
+
+
+def run(reconcile, responses, repeat):
+    """Лучшее время одного цикла по всем тенантам и число изменений."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = sum(
+            len(reconcile(tenant_id, response))
+            for tenant_id, response in responses.items())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, found
+
+
+def bench(tenants, homeworks, changed, repeat=5, seed=0):
+    """Сравнивает оба способа на одних и тех же ответах."""
+    state, responses = make_responses(
+        tenants, homeworks, changed, random.Random(seed))
+    date_first, expected = run(
+        lambda tenant_id, response: reconcile_date_first(
+            state, tenant_id, response),
+        responses, repeat)
+    status_first, found = run(state.reconcile, responses, repeat)
+    if found != expected:
+        raise AssertionError(
+            f"Поиск нашёл {found} изменений вместо {expected}.")
+    return {
+        "rows": tenants * homeworks,
+        "changed": found,
+        "date_first_ms": round(date_first * 1000, 3),
+        "status_first_ms": round(status_first * 1000, 3),
+        "speedup": round(date_first / status_first, 2),
+    }
+
+
+def main():
+    """Запускает сравнение из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tenants", type=int, default=50)
+    parser.add_argument("--homeworks", type=int, default=200)
+    parser.add_argument(
+        "--changed", type=float, default=0.01,
+        help="доля работ со сменившимся статусом")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--log-file", help="журнал DEBUG; по умолчанию временный файл")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        logging.basicConfig(
+            level=logging.DEBUG,
+            handlers=[logging.FileHandler(
+                args.log_file or os.path.join(directory, "bench.log"),
+                encoding="utf-8")],
+            format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        result = bench(
+            args.tenants, args.homeworks, args.changed, args.repeat,
+            args.seed)
+        logging.shutdown()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
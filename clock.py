@@ -0,0 +1,40 @@
+import time
+
+
+class SystemClock:
+    """Настоящее время процесса."""
+
+    def time(self):
+        """Текущее unix-время."""
+        return time.time()
+
+    def monotonic(self):
+        """Монотонное время для измерения интервалов."""
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        """Засыпает на seconds секунд."""
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """Виртуальное время: sleep не ждёт, а сразу сдвигает часы.
+
+    Позволяет прогнать недели работы бота за секунды.
+    """
+
+    def __init__(self, start=0.0):
+        self.now = float(start)
+
+    def time(self):
+        """Текущее виртуальное unix-время."""
+        return self.now
+
+    def monotonic(self):
+        """Виртуальное время тоже монотонно."""
+        return self.now
+
+    def sleep(self, seconds):
+        """Сдвигает часы на seconds секунд."""
+        if seconds > 0:
+            self.now += seconds
@@ -0,0 +1,104 @@
+import json
+import logging
+import os
+import threading
+
+SETTINGS_FILE = os.getenv("SETTINGS_FILE")
+CONFIG_POLL_INTERVAL = 5
+
+logger = logging.getLogger(__name__)
+
+
+def load_settings(path):
+    """Читает и проверяет файл настроек.
+
+    Поддерживаются ключи retry_period, endpoint, verdicts
+    и telegram_token; отсутствующие ключи не меняются.
+    """
+    with open(path, encoding="utf-8") as file:
+        raw = json.load(file)
+    if not isinstance(raw, dict):
+        raise TypeError("Файл настроек должен содержать объект.")
+    settings = {}
+    if "retry_period" in raw:
+        period = int(raw["retry_period"])
+        if period <= 0:
+            raise ValueError("retry_period должен быть больше нуля.")
+        settings["retry_period"] = period
+    if "endpoint" in raw:
+        if not str(raw["endpoint"]).startswith(("http://", "https://")):
+            raise ValueError("endpoint должен быть адресом http(s).")
+        settings["endpoint"] = str(raw["endpoint"])
+    if "verdicts" in raw:
+        verdicts = raw["verdicts"]
+        if not isinstance(verdicts, dict) or not all(
+                isinstance(text, str) for text in verdicts.values()):
+            raise TypeError("verdicts должен сопоставлять статусы и строки.")
+        settings["verdicts"] = dict(verdicts)
+    if raw.get("telegram_token"):
+        settings["telegram_token"] = str(raw["telegram_token"])
+    return settings
+
+
+class ConfigWatcher:
+    """Следит за файлами конфигурации и применяет изменения на ходу.
+
+    Для каждого файла задаётся загрузчик, который разбирает и проверяет
+    его целиком. Только успешно загруженная версия передаётся в apply
+    (name, value); при ошибке остаётся прежняя конфигурация.
+    """
+
+    def __init__(self, apply, interval=CONFIG_POLL_INTERVAL):
+        self.apply = apply
+        self.interval = interval
+        self.watched = {}
+        self.stop_event = threading.Event()
+
+    def watch(self, name, path, loader):
+        """Добавляет файл под наблюдение."""
+        if path:
+            self.watched[name] = (path, loader, None)
+
+    @staticmethod
+    def signature(path):
+        """Отпечаток файла: время изменения и размер."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def poll(self):
+        """Перечитывает изменившиеся файлы; возвращает имена применённых."""
+        applied = []
+        for name, (path, loader, signature) in list(self.watched.items()):
+            current = self.signature(path)
+            if current is None or current == signature:
+                continue
+            self.watched[name] = (path, loader, current)
+            try:
+                value = loader(path)
+            except (OSError, ValueError, TypeError, KeyError) as error:
+                logger.error(f"Конфигурация {path} не применена: {error}")
+                continue
+            self.apply(name, value)
+            applied.append(name)
+            logger.info(f"Конфигурация {path} применена.")
+        return applied
+
+    def run(self):
+        """Проверяет файлы каждые interval секунд до вызова stop."""
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as error:
+                logger.error(f"Ошибка применения конфигурации: {error}")
+
+    def start(self):
+        """Запускает наблюдение в фоновом потоке."""
+        if self.watched:
+            threading.Thread(target=self.run, daemon=True).start()
+
+    def stop(self):
+        """Останавливает наблюдение."""
+        self.stop_event.set()
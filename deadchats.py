@@ -0,0 +1,77 @@
+import logging
+import threading
+import time
+
+# Через столько секунд недоступный чат проверяется снова; интервал
+# удваивается после каждой неудачной проверки.
+REPROBE_PERIODS = {
+    403: (3600, 7 * 24 * 3600),
+    400: (6 * 3600, 30 * 24 * 3600),
+}
+# Больше стольких чатов не помнится: самые давние снова получают
+# сообщения и при ошибке возвращаются в кеш.
+DEAD_CHATS_LIMIT = 10000
+
+logger = logging.getLogger(__name__)
+
+
+class DeadChatCache:
+    """Чаты, в которые Telegram не доставляет сообщения.
+
+    Чат попадает сюда после ChatBlockedError (бот заблокирован, выгнан
+    из группы, чат удалён). Отправка в такой чат не выполняется, а когда
+    подходит время проверки, бот пробует действие, невидимое
+    пользователю, и при успехе возвращает чат в рассылку.
+    """
+
+    def __init__(self, clock=time.time, limit=DEAD_CHATS_LIMIT):
+        self.clock = clock
+        self.limit = limit
+        self.chats = {}
+        self.lock = threading.Lock()
+
+    def failed(self, chat_id, error_code):
+        """Отмечает чат недоступным с кодом ошибки Telegram."""
+        base, limit = REPROBE_PERIODS.get(error_code, REPROBE_PERIODS[403])
+        with self.lock:
+            entry = self.chats.get(str(chat_id))
+            failures = entry["failures"] + 1 if entry else 1
+            delay = min(base * 2 ** (failures - 1), limit)
+            self.chats.pop(str(chat_id), None)
+            self.chats[str(chat_id)] = {
+                "error_code": error_code, "failures": failures,
+                "next_probe": self.clock() + delay,
+            }
+            while len(self.chats) > self.limit:
+                del self.chats[next(iter(self.chats))]
+        logger.warning(
+            f"Чат {chat_id} недоступен (код {error_code}), "
+            f"проверка через {delay} с.")
+
+    def succeeded(self, chat_id):
+        """Возвращает чат в рассылку."""
+        with self.lock:
+            if self.chats.pop(str(chat_id), None) is not None:
+                logger.info(f"Чат {chat_id} снова доступен.")
+
+    def reachable(self, chat_id):
+        """Можно ли отправлять в чат."""
+        return str(chat_id) not in self.chats
+
+    def due_probes(self, now=None):
+        """Недоступные чаты, которые пора проверить."""
+        now = self.clock() if now is None else now
+        with self.lock:
+            return [
+                chat_id for chat_id, entry in self.chats.items()
+                if entry["next_probe"] <= now
+            ]
+
+    def report(self):
+        """Недоступные чаты с кодами ошибок и числом неудач."""
+        with self.lock:
+            return {
+                chat_id: {key: entry[key] for key in (
+                    "error_code", "failures")}
+                for chat_id, entry in self.chats.items()
+            }
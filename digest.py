@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+
+DIGEST_FILE = os.getenv("DIGEST_FILE")
+# Больше стольких событий сводок в памяти не держится: остальные
+# сбрасываются в DIGEST_FILE до отправки сводки.
+DIGEST_MEMORY_LIMIT = 1000
+URGENT_STATUSES = frozenset({"rejected"})
+
+logger = logging.getLogger(__name__)
+
+
+class DigestBuffer:
+    """Копит события для подписчиков со сводками.
+
+    Первое событие чата назначает срок сводки — через окно подписчика;
+    к сроку все накопленные события чата забираются одной сводкой.
+    События лежат в памяти, а когда их больше memory_limit или бот
+    останавливается, дописываются в файл path вместе со сроками и
+    дочитываются оттуда при отправке сводки или после перезапуска.
+    Без path события сверх memory_limit сбрасываются во временный
+    файл, который удаляется при остановке.
+    """
+
+    def __init__(self, path=DIGEST_FILE, memory_limit=DIGEST_MEMORY_LIMIT):
+        self.path = path
+        self.memory_limit = memory_limit
+        self.entries = {}
+        self.due = {}
+        self.spilled = {}
+        self.temporary = False
+        self.lock = threading.Lock()
+        for record in self.read():
+            chat_id = record["chat_id"]
+            self.spilled[chat_id] = self.spilled.get(chat_id, 0) + 1
+            self.due[chat_id] = min(
+                self.due.get(chat_id, record["due"]), record["due"])
+        if self.spilled:
+            logger.info(f"Восстановлены сводки для {len(self.due)} чатов.")
+
+    def __len__(self):
+        return self.in_memory() + sum(self.spilled.values())
+
+    def in_memory(self):
+        """Сколько событий лежит в памяти."""
+        return sum(len(entries) for entries in self.entries.values())
+
+    def read(self):
+        """Читает события, сброшенные в файл."""
+        if not self.path:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        logger.warning("Пропущена повреждённая запись сводки.")
+        except FileNotFoundError:
+            return
+
+    def add(self, chat_id, key, text, window, now):
+        """Откладывает событие чата до сводки через window секунд."""
+        with self.lock:
+            self.due.setdefault(chat_id, now + window)
+            self.entries.setdefault(chat_id, []).append((key, text))
+            if self.in_memory() > self.memory_limit:
+                self.spill()
+
+    def persist(self):
+        """Сбрасывает события из памяти в файл одним fsync.
+
+        С журналом исходящих вызывается до того, как работы отмечены
+        увиденными, чтобы события сводок тоже пережили аварию.
+        """
+        with self.lock:
+            if self.path and self.entries:
+                self.spill()
+
+    def spill(self):
+        """Дописывает события из памяти в файл."""
+        if not self.path:
+            fd, self.path = tempfile.mkstemp(prefix="digest-", suffix=".jsonl")
+            os.close(fd)
+            self.temporary = True
+        try:
+            with open(self.path, "a", encoding="utf-8") as file:
+                for chat_id, entries in self.entries.items():
+                    for key, text in entries:
+                        file.write(json.dumps({
+                            "chat_id": chat_id, "key": key, "text": text,
+                            "due": self.due[chat_id]}, ensure_ascii=False))
+                        file.write("\n")
+                file.flush()
+                os.fsync(file.fileno())
+        except OSError as error:
+            logger.error(f"Не удалось сохранить сводки: {error}")
+            return
+        for chat_id, entries in self.entries.items():
+            self.spilled[chat_id] = self.spilled.get(chat_id, 0) + len(entries)
+        self.entries = {}
+
+    def next_due(self):
+        """Ближайший срок сводки или None."""
+        with self.lock:
+            return min(self.due.values(), default=None)
+
+    def pop_due(self, now, handoff=None):
+        """Забирает сводки со сроком до now: {chat_id: [(key, text)]}.
+
+        handoff(digests) вызывается до удаления событий из файла:
+        например, чтобы сначала записать сводки в журнал исходящих.
+        Файл читается дважды, и в памяти оказываются только события
+        забираемых сводок.
+        """
+        with self.lock:
+            chats = {
+                chat_id for chat_id, due in self.due.items() if due <= now}
+            digests = {chat_id: [] for chat_id in chats}
+            spilled = any(self.spilled.get(chat_id) for chat_id in chats)
+            if spilled:
+                for record in self.read():
+                    if record["chat_id"] in chats:
+                        digests[record["chat_id"]].append(
+                            (record["key"], record["text"]))
+            for chat_id in chats:
+                digests[chat_id].extend(self.entries.get(chat_id, []))
+            if digests and handoff is not None:
+                handoff(digests)
+            if spilled:
+                self.rewrite(
+                    record for record in self.read()
+                    if record["chat_id"] not in chats)
+            for chat_id in chats:
+                self.entries.pop(chat_id, None)
+                del self.due[chat_id]
+                self.spilled.pop(chat_id, None)
+            return digests
+
+    def rewrite(self, records):
+        """Переписывает файл, оставляя только записи records.
+
+        records может быть генератором, читающим тот же файл: старый
+        файл подменяется новым только после записи всех записей.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                for record in records:
+                    file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.path)
+        except OSError as error:
+            logger.error(f"Не удалось переписать файл сводок: {error}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def close(self):
+        """Сохраняет накопленное в файл, чтобы пережить перезапуск."""
+        with self.lock:
+            if self.temporary and os.path.exists(self.path):
+                os.remove(self.path)
+            elif self.path and self.entries:
+                self.spill()
+
+
+def create_digests(outbox=None, path=DIGEST_FILE):
+    """Буфер сводок.
+
+    С журналом исходящих события сводок тоже должны переживать аварию,
+    поэтому без DIGEST_FILE они хранятся в файле рядом с журналом.
+    """
+    if not path and outbox is not None:
+        path = f"{outbox.path}.digest"
+    return DigestBuffer(path)
@@ -4,3 +4,40 @@ class EndpointError(Exception):
 
 class StatusError(Exception):
     """Исключение: Ошибка в статусе."""
+
+
+class ShutdownRequested(Exception):
+    """Исключение: Получен сигнал на остановку бота."""
+
+
+class WakeRequested(Exception):
+    """Исключение: Ожидание следующего цикла прервано по запросу."""
+
+
+class ThrottledError(EndpointError):
+    """Исключение: API ограничил частоту запросов (код 429)."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AuthError(EndpointError):
+    """Исключение: API отклонил токен (коды 401 и 403)."""
+
+
+class ServerError(EndpointError):
+    """Исключение: Сбой на стороне API (коды 5xx)."""
+
+
+class MalformedResponseError(EndpointError):
+    """Исключение: Тело ответа API не удалось разобрать."""
+
+
+class ChatBlockedError(Exception):
+    """Исключение: Telegram не доставляет сообщения в чат."""
+
+    def __init__(self, message, chat_id, error_code=None):
+        super().__init__(message)
+        self.chat_id = chat_id
+        self.error_code = error_code
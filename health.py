@@ -0,0 +1,263 @@
+import json
+import logging
+import math
+import os
+import signal
+import threading
+import time
+from collections import deque
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HEALTH_HOST = os.getenv("HEALTH_HOST", "127.0.0.1")
+HEALTH_PORT = os.getenv("HEALTH_PORT")
+WATCHDOG_INTERVAL = 30
+LAG_HISTORY = 100
+# Бот перегружен, если за последний период циклы опроса заняли
+# больше этой его доли.
+OVERLOAD_THRESHOLD = 0.8
+MAIN_WORKER = "main"
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values, fraction):
+    """Перцентиль по отсортированной выборке (без интерполяции)."""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class Watchdog:
+    """Следит за тем, что цикл опроса и фоновые потоки не зависли.
+
+    Каждый рабочий поток регистрируется с допустимым временем между
+    отметками beat. Если отметки нет дольше, поток считается зависшим:
+    /healthz отвечает 503, а фоновая проверка вызывает restart потока.
+    Для цикла опроса сохраняются длительность и опоздание циклов,
+    по ним же считается, сколько ждать до следующего цикла и не
+    перегружен ли бот.
+    """
+
+    def __init__(self, period, clock=time.monotonic):
+        self.period = period
+        self.clock = clock
+        self.workers = {}
+        self.tenants = {}
+        self.durations = deque(maxlen=LAG_HISTORY)
+        self.lags = deque(maxlen=LAG_HISTORY)
+        self.busy = deque(maxlen=LAG_HISTORY)
+        self.cycle_start = None
+        self.next_cycle = None
+        self.cycles = 0
+        self.overruns = 0
+        self.due_polls = 0
+        self.shed_polls = 0
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+
+    def register(self, name, timeout, restart=None):
+        """Регистрирует поток с допустимой паузой между отметками."""
+        with self.lock:
+            self.workers[name] = {
+                "timeout": timeout, "restart": restart,
+                "last_beat": self.clock(),
+            }
+
+    def beat(self, name):
+        """Отмечает, что поток name жив."""
+        with self.lock:
+            if name in self.workers:
+                self.workers[name]["last_beat"] = self.clock()
+
+    def tenant_done(self, tenant_id, timestamp):
+        """Отмечает успешно завершённый опрос тенанта."""
+        self.tenants[tenant_id] = timestamp
+
+    def forget(self, tenant_ids):
+        """Удаляет отметки тенантов, которых больше нет."""
+        for tenant_id in tenant_ids:
+            self.tenants.pop(tenant_id, None)
+
+    def cycle_started(self):
+        """Отмечает начало цикла и его опоздание от расписания."""
+        now = self.clock()
+        if self.next_cycle is not None:
+            self.lags.append(max(now - self.next_cycle, 0))
+        self.cycle_start = now
+        self.beat(MAIN_WORKER)
+
+    def cycle_finished(self):
+        """Отмечает конец цикла; следующий ожидается через period."""
+        now = self.clock()
+        if self.cycle_start is not None:
+            self.durations.append(now - self.cycle_start)
+            self.busy.append((self.cycle_start, now))
+            self.next_cycle = self.cycle_start + self.period
+            if now > self.next_cycle:
+                self.overruns += 1
+        self.cycles += 1
+        self.beat(MAIN_WORKER)
+
+    def remaining(self):
+        """Сколько целых секунд осталось до начала следующего цикла.
+
+        Отсчёт идёт от начала текущего цикла, поэтому длинный цикл
+        не сдвигает расписание на свою длительность.
+        """
+        if self.cycle_start is None:
+            return self.period
+        return max(math.ceil(self.cycle_start + self.period - self.clock()), 0)
+
+    def overloaded(self):
+        """Заняли ли циклы почти весь последний период."""
+        window = self.clock() - self.period
+        busy = sum(
+            max(end - max(start, window), 0) for start, end in self.busy)
+        return busy >= OVERLOAD_THRESHOLD * self.period
+
+    def shed(self, shed, due):
+        """Учитывает отложенные из-за перегрузки опросы."""
+        self.due_polls += due
+        self.shed_polls += shed
+
+    def stalled(self):
+        """Имена зависших потоков."""
+        now = self.clock()
+        with self.lock:
+            return [
+                name for name, worker in self.workers.items()
+                if now - worker["last_beat"] > worker["timeout"]
+            ]
+
+    def ready(self):
+        """Готов ли бот: завершён хотя бы один цикл опроса."""
+        return self.cycles > 0
+
+    def report(self):
+        """Сводка для /healthz: потоки, тенанты и загрузка цикла."""
+        now = self.clock()
+        durations = list(self.durations)
+        lags = list(self.lags)
+        return {
+            "stalled": self.stalled(),
+            "workers": {
+                name: round(now - worker["last_beat"], 1)
+                for name, worker in self.workers.items()
+            },
+            "tenants_last_cycle": dict(self.tenants),
+            "cycles": self.cycles,
+            "cycle_duration_p95": percentile(durations, 0.95),
+            "cycle_lag_p95": percentile(lags, 0.95),
+            "cycle_lag_max": max(lags, default=0),
+            "cycle_overruns": self.overruns,
+            "overloaded": self.overloaded(),
+            "shed_rate": (
+                round(self.shed_polls / self.due_polls, 3)
+                if self.due_polls else 0),
+            "load": (
+                sum(durations) / len(durations) / self.period
+                if durations else 0),
+        }
+
+    def check(self):
+        """Перезапускает зависшие потоки.
+
+        Отметка ставится, только если restart вернул True, то есть
+        поток действительно заменён; иначе зависание остаётся видно
+        в /healthz.
+        """
+        for name in self.stalled():
+            restart = self.workers[name]["restart"]
+            logger.error(f"Поток {name} не отвечает.")
+            if restart is None:
+                continue
+            try:
+                restarted = restart()
+            except Exception as error:
+                logger.error(f"Не удалось перезапустить {name}: {error}")
+                continue
+            if restarted:
+                self.beat(name)
+
+    def monitor(self, interval=WATCHDOG_INTERVAL):
+        """Периодически проверяет потоки до вызова stop."""
+        while not self.stop_event.wait(interval):
+            self.check()
+
+    def stop(self):
+        """Останавливает фоновую проверку."""
+        self.stop_event.set()
+
+
+def terminate_process():
+    """Просит процесс корректно завершиться.
+
+    Зависший цикл опроса перезапустит супервизор (Heroku, systemd),
+    а состояние сохранится при остановке.
+    """
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+class HealthHandler(BaseHTTPRequestHandler):
+    """Отвечает на /healthz, /readyz и /stats."""
+
+    def do_GET(self):
+        """Отдаёт состояние бота в JSON."""
+        watchdog = self.server.watchdog
+        if self.path == "/healthz":
+            report = watchdog.report()
+            healthy = not report["stalled"]
+        elif self.path == "/readyz":
+            report = {"ready": watchdog.ready()}
+            healthy = report["ready"]
+        elif self.path == "/stats" and self.server.stats is not None:
+            report, healthy = self.server.stats(), True
+        else:
+            self.send_response(HTTPStatus.NOT_FOUND)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps(report, ensure_ascii=False).encode()
+        self.send_response(
+            HTTPStatus.OK if healthy else HTTPStatus.SERVICE_UNAVAILABLE)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Пишет журнал запросов в logging вместо stderr."""
+        logger.debug(format % args)
+
+
+class HealthServer:
+    """HTTP-сервер проверок состояния и фоновый сторож.
+
+    stats — функция, отдающая статистику для /stats.
+    """
+
+    def __init__(self, watchdog, host=HEALTH_HOST, port=0, stats=None):
+        self.watchdog = watchdog
+        self.server = ThreadingHTTPServer((host, int(port)), HealthHandler)
+        self.server.daemon_threads = True
+        self.server.watchdog = watchdog
+        self.server.stats = stats
+
+    @property
+    def address(self):
+        """Адрес, на котором слушает сервер."""
+        return self.server.server_address
+
+    def start(self):
+        """Запускает сервер и сторожа в фоновых потоках."""
+        for target in (self.server.serve_forever, self.watchdog.monitor):
+            threading.Thread(target=target, daemon=True).start()
+        logger.info(f"Проверки состояния на {self.address}.")
+
+    def stop(self):
+        """Останавливает сервер и сторожа."""
+        self.watchdog.stop()
+        self.server.shutdown()
+        self.server.server_close()
@@ -1,14 +1,45 @@
 import logging
+import logging.handlers
+import math
 import sys
 import time
 import requests
 import os
+from datetime import datetime
+from functools import partial
 from http import HTTPStatus
 from telebot.apihelper import ApiException
 
-from exeptions import EndpointError, StatusError
+from admin import ADMIN_SOCKET, AdminServer
+from analytics import record_transition, turnaround_report
+from config import SETTINGS_FILE, ConfigWatcher, load_settings
+from digest import create_digests
+from exeptions import (AuthError, ChatBlockedError, EndpointError,
+                       MalformedResponseError, ServerError, ShutdownRequested,
+                       StatusError, ThrottledError)
 from dotenv import load_dotenv
+from health import (HEALTH_PORT, MAIN_WORKER, HealthServer, Watchdog,
+                    terminate_process)
+from leases import create_coordinator
+from lifecycle import Lifecycle
+from memory import memory_monitor
+from outbox import create_outbox
+from priority import (DEADLINE, DEADLINE_SPEEDUP, DEADLINES, IDLE,
+                      PRIORITY_WEIGHTS, parse_deadlines, priority_class)
+from profiling import profiler
+from push import PUSH_PORT, RECONCILE_PERIOD, WORKER_TIMEOUT, PushReceiver
+from ratelimit import parse_retry_after
+from recording import recorder
+from retry import telegram_error
+from runtime import Runtime
+from state import STATE_HOMEWORKS_LIMIT, PollState, homework_key
+from streaming import STREAM_CHUNK_SIZE, HomeworkStream
+from subscriptions import (SUBSCRIPTIONS_FILE, OutgoingBatch,
+                           SubscriptionRegistry, quiet_until)
 from telebot import TeleBot
+from tenants import TENANTS_FILE, load_tenants, tenant_headers
+from tracing import tracer
+from transport import TelegramTransport
 
 
 load_dotenv()
@@ -16,8 +47,16 @@ load_dotenv()
 PRACTICUM_TOKEN = os.getenv("PRACTICUM_TOKEN")
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+STATE_FILE = os.getenv("STATE_FILE")
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES")
 
+LOG_FILE = "tg_bot.log"
+LOG_MAX_BYTES = 10 * 2 ** 20
+LOG_BACKUPS = 5
 RETRY_PERIOD = 600
+API_TIMEOUT = (5, 30)
+SHED_FACTOR = 3
+DIGEST_HEADER = "Сводка изменений статуса"
 ENDPOINT = "https://practicum.yandex.ru/api/user_api/homework_statuses/"
 HEADERS = {"Authorization": f"OAuth {PRACTICUM_TOKEN}"}
 
@@ -50,30 +89,88 @@ def check_tokens():
 
 def send_message(bot, message):
     """Отправляет сообщение в Telegram чат."""
-    try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
-        logger.debug(f"Ура! Это сообщение успешно отправлено: {message}")
-    except (ApiException, requests.RequestException) as error:
-        logging.error(
-            f"Ужас! Это сообщение: {message}"
-            f"отправить не получилось: {error}")
+    return send_to_chat(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_to_chat(bot, chat_id, message):
+    """Отправляет сообщение в указанный Telegram чат.
+
+    Возвращает True при успехе, ChatBlockedError, если чат недоступен
+    (бот заблокирован, чат удалён), и False при прочих ошибках.
+    """
+    with tracer.span("send_message", chat_id=chat_id) as span:
+        try:
+            bot.send_message(chat_id, message)
+            logger.debug(f"Ура! Это сообщение успешно отправлено: {message}")
+            return True
+        except (ApiException, requests.RequestException) as error:
+            error = telegram_error(error, chat_id)
+            span.set("error", f"{type(error).__name__}: {error}")
+            logging.error(
+                f"Ужас! Это сообщение: {message}"
+                f"отправить не получилось: {error}")
+            if isinstance(error, ChatBlockedError):
+                return error
+            return False
 
 
 def get_api_answer(timestamp):
     """Делает запрос к эндпоинту.API-сервиса Практикум.Домашка."""
+    return fetch_api_answer(timestamp, HEADERS)
+
+
+def fetch_api_answer(timestamp, headers, get=None, stream=False):
+    """Делает запрос к API от имени владельца заголовков headers.
+
+    get заменяет requests.get при воспроизведении и моделировании.
+    При stream тело не читается сразу: возвращается HomeworkStream,
+    который разбирает записи по мере чтения (ответ при этом
+    не записывается в RECORD_FILE).
+    """
     params = {"from_date": timestamp}
     logging.info(f"Отправка запроса на {ENDPOINT} с параметрами {params}")
-    try:
-        response = requests.get(ENDPOINT, headers=HEADERS, params=params)
-    except requests.RequestException as error:
-        raise EndpointError(f"Ошибка запроса к API: {error}")
-    if response.status_code != HTTPStatus.OK:
-        endpoint_message = (
-            f'Ответ с адреса: {response.url} не соответствует ожидаемому.'
-            f'Код ответа: {response.status_code}]'
-        )
-        raise EndpointError(endpoint_message)
-    return response.json()
+    started = time.perf_counter()
+    options = {"stream": True} if stream else {}
+    with tracer.span("http_fetch", from_date=timestamp) as span:
+        try:
+            response = (get or requests.get)(
+                ENDPOINT, headers=headers, params=params,
+                timeout=API_TIMEOUT, **options)
+        except requests.RequestException as error:
+            raise EndpointError(f"Ошибка запроса к API: {error}")
+        span.set("http.status_code", response.status_code)
+    if not stream:
+        recorder.record(params, response, time.perf_counter() - started)
+    check_status(response)
+    if stream:
+        return HomeworkStream(response.iter_content(STREAM_CHUNK_SIZE))
+    with tracer.span("json_decode"):
+        try:
+            return response.json()
+        except ValueError as error:
+            raise MalformedResponseError(
+                f"Ответ API не является JSON: {error}")
+
+
+def check_status(response):
+    """Переводит код ответа API, отличный от 200, в исключение."""
+    status = response.status_code
+    if status == HTTPStatus.OK:
+        return
+    if status == HTTPStatus.TOO_MANY_REQUESTS:
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        raise ThrottledError(
+            f"API ограничил частоту запросов, повтор через {retry_after} с.",
+            retry_after)
+    if status in (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN):
+        raise AuthError(f"API отклонил токен. Код ответа: {status}")
+    endpoint_message = (
+        f'Ответ с адреса: {response.url} не соответствует ожидаемому.'
+        f'Код ответа: {status}]'
+    )
+    if status >= HTTPStatus.INTERNAL_SERVER_ERROR:
+        raise ServerError(endpoint_message)
+    raise EndpointError(endpoint_message)
 
 
 def check_response(response):
@@ -112,6 +209,582 @@ def parse_status(homework):
     return f'Изменился статус проверки работы "{homework_name}". {hw_verdict}'
 
 
+def send_to(runtime, chat_id, message):
+    """Отправляет сообщение в чат; основной чат — через send_message.
+
+    В недоступные чаты (см. deadchats) сообщения не отправляются:
+    возвращается None — отправка приостановлена, а не провалилась,
+    и журнал исходящих держит такие сообщения до возвращения чата.
+    """
+    dead_chats = runtime.dead_chats
+    if not dead_chats.reachable(chat_id):
+        logger.debug(f"Чат {chat_id} недоступен, сообщение отложено.")
+        return None
+    if chat_id == TELEGRAM_CHAT_ID:
+        result = send_message(runtime.bot, message)
+    else:
+        result = send_to_chat(runtime.bot, chat_id, message)
+    if isinstance(result, ChatBlockedError):
+        dead_chats.failed(chat_id, result.error_code)
+        return None
+    return result
+
+
+def deliver(runtime, tenant, batch, processed, current_date=None,
+            complete=False):
+    """Отправляет пачку и отмечает работы увиденными.
+
+    Отметка тенанта сдвигается только при complete, то есть когда
+    обработан весь ответ API: иначе необработанные работы остались бы
+    ниже from_date и не пришли бы снова.
+
+    При работе нескольких экземпляров аренда тенанта перепроверяется
+    перед каждой отправкой и сохранением, даже пустым: иначе экземпляр
+    без аренды затёр бы своей устаревшей копией состояние владельца
+    в общем хранилище. Состояние сохраняется туда для того, кто
+    заберёт тенанта следующим. С журналом
+    исходящих работы отмечаются увиденными, когда уведомления уже
+    записаны на диск, а отправка идёт из журнала.
+    """
+    state = runtime.state
+    coordinator = runtime.coordinator
+    outbox = runtime.outbox
+    if coordinator is not None and not coordinator.confirm(tenant.id):
+        return
+    if outbox is None:
+        with profiler.phase("send_message"):
+            batch.flush(partial(send_to, runtime))
+    else:
+        outbox.append(batch.entries())
+        runtime.digests.persist()
+    for homework in processed:
+        record_transition(state.tenant(tenant.id), homework)
+        state.mark_seen(tenant.id, homework)
+    if complete:
+        state.advance_past(tenant.id, processed, current_date)
+    state.prune(tenant.id)
+    state.save()
+    if coordinator is not None:
+        coordinator.store.save_tenant_state(tenant.id, state.tenant(tenant.id))
+    if outbox is not None:
+        with profiler.phase("send_message"):
+            outbox.deliver(partial(send_to, runtime), runtime.clock)
+
+
+def notification_key(tenant, homework):
+    """Ключ идемпотентности уведомления о смене статуса работы."""
+    return (f"{tenant.id}/{homework_key(homework)}/{homework.get('status')}"
+            f"/{homework.get('date_updated')}")
+
+
+def notify(runtime, batch, subscriber, homework, message, key):
+    """Отправляет событие в пачку цикла или откладывает до сводки.
+
+    Сводка, срок которой выпадает на тихие часы подписчика, и события
+    в тихие часы (в том числе срочные) откладываются до их конца.
+    """
+    now = runtime.clock.time()
+    delay = 0
+    if subscriber.digest and homework.get("status") not in subscriber.urgent:
+        delay = subscriber.digest
+    resume = quiet_until(
+        subscriber.quiet_hours, datetime.fromtimestamp(now + delay))
+    if resume is not None:
+        delay = resume.timestamp() - now
+    if delay:
+        runtime.digests.add(subscriber.chat_id, key, message, delay, now)
+    else:
+        batch.add(subscriber.chat_id, message, key)
+
+
+def send_digests(runtime):
+    """Отправляет сводки, срок которых наступил, по одной на чат.
+
+    С журналом исходящих сводки записываются в журнал до того, как
+    их события удаляются из буфера сводок.
+    """
+    batch = OutgoingBatch(clock=runtime.clock)
+
+    def handoff(digests):
+        for chat_id, entries in digests.items():
+            for number, (key, message) in enumerate(entries):
+                if not number:
+                    message = f"{DIGEST_HEADER}: {len(entries)}\n\n{message}"
+                batch.add(chat_id, message, key)
+        if runtime.outbox is not None:
+            runtime.outbox.append(batch.entries())
+
+    runtime.digests.pop_due(runtime.clock.time(), handoff)
+    if not len(batch):
+        return
+    send = partial(send_to, runtime)
+    with profiler.phase("send_message"):
+        if runtime.outbox is None:
+            batch.flush(send)
+        else:
+            runtime.outbox.deliver(send, runtime.clock)
+
+
+def handle_homeworks(runtime, tenant, homeworks, response, polled=True):
+    """Уведомляет подписчиков о новых статусах и сдвигает отметку.
+
+    Каждое сообщение формируется один раз и рассылается всем подходящим
+    подписчикам тенанта одной пачкой. homeworks может быть потоком
+    записей: в памяти остаются только изменившиеся, а current_date
+    берётся из response после того, как поток прочитан. Отметку
+    сдвигают только ответы опроса (polled): push-событие могло прийти
+    после потерянного, и сверка должна спросить API и о нём.
+    """
+    state = runtime.state
+    with state.lock:
+        changed = state.reconcile(tenant.id, homeworks or [])
+        current_date = response.get("current_date")
+        if not changed:
+            logging.debug("Все по прежнему, изменений нет.")
+        batch = OutgoingBatch(clock=runtime.clock)
+        processed = []
+        complete = False
+        try:
+            for homework in changed:
+                if runtime.lifecycle.drain_expired():
+                    logger.warning(
+                        "Время на остановку истекло: оставшиеся уведомления "
+                        "будут отправлены после перезапуска.")
+                    return
+                with profiler.phase("parse_status"), tracer.span(
+                        "parse_status",
+                        homework=homework.get("homework_name"),
+                        status=homework.get("status")):
+                    message = parse_status(homework)
+                key = notification_key(tenant, homework)
+                for subscriber in runtime.subscriptions.subscribers_for(
+                        tenant, homework.get("status")):
+                    notify(runtime, batch, subscriber, homework, message,
+                           f"{key}/{subscriber.chat_id}")
+                processed.append(homework)
+            complete = True
+        finally:
+            deliver(runtime, tenant, batch, processed, current_date,
+                    complete and polled)
+
+
+def poll_homeworks(runtime, tenant):
+    """Запрашивает изменения с отметки тенанта и уведомляет о новых."""
+    state = runtime.state
+    started = runtime.clock.time()
+    stream = bool(STREAM_RESPONSES) and not recorder.enabled
+    # Неудачная попытка тоже считается опросом: повтор — по расписанию.
+    with state.lock:
+        state.polled(tenant.id, runtime.schedule.polled(
+            tenant.id, state.last_poll(tenant.id),
+            poll_period(runtime, tenant), started))
+    with profiler.phase("get_api_answer"):
+        response = fetch_api_answer(
+            state.from_date(tenant.id), tenant_headers(tenant),
+            runtime.http_get, stream)
+    with profiler.phase("check_response"), tracer.span("check_response"):
+        # Поток проверяется по мере чтения записей.
+        homeworks = response if stream else check_response(response)
+    handle_homeworks(runtime, tenant, homeworks, response)
+    if runtime.watchdog is not None:
+        runtime.watchdog.tenant_done(tenant.id, runtime.clock.time())
+
+
+def poll_period(runtime, tenant):
+    """Интервал опроса.
+
+    Push-тенантам опрос нужен только для сверки, а тенантов с работой
+    на проверке перед дедлайном бот опрашивает чаще.
+    """
+    if tenant.push and runtime.receiver is not None:
+        return RECONCILE_PERIOD
+    if tenant_priority(runtime, tenant) == DEADLINE:
+        return RETRY_PERIOD / DEADLINE_SPEEDUP
+    return RETRY_PERIOD
+
+
+def tenant_priority(runtime, tenant):
+    """Класс приоритета тенанта (см. priority.priority_class)."""
+    return priority_class(
+        runtime.state.tenant(tenant.id)["homeworks"], tenant.deadlines,
+        runtime.clock.time())
+
+
+def tenant_weight(runtime, tenant):
+    """Вес тенанта во взвешенной очереди опросов."""
+    return PRIORITY_WEIGHTS[tenant_priority(runtime, tenant)]
+
+
+def active_review(runtime, tenant):
+    """Есть ли у тенанта работа на проверке."""
+    return tenant_priority(runtime, tenant) != IDLE
+
+
+def shed_polls(runtime, tenants):
+    """При перегрузке реже опрашивает тенантов без работ на проверке.
+
+    Такие тенанты опрашиваются раз в SHED_FACTOR своих периодов,
+    тенанты с работами на проверке — как обычно.
+    """
+    watchdog = runtime.watchdog
+    if watchdog is None or not watchdog.overloaded():
+        return tenants
+    now = runtime.clock.time()
+    kept = [
+        tenant for tenant in tenants
+        if active_review(runtime, tenant) or tenant.id in runtime.forced
+        or now - runtime.state.last_poll(tenant.id)
+        >= SHED_FACTOR * poll_period(runtime, tenant)
+    ]
+    watchdog.shed(len(tenants) - len(kept), len(tenants))
+    if len(kept) < len(tenants):
+        logger.warning(
+            f"Цикл перегружен: отложено {len(tenants) - len(kept)} "
+            f"из {len(tenants)} опросов.")
+    return kept
+
+
+def owned_tenants(runtime, tenants):
+    """Тенанты, которых в этом цикле обслуживает этот экземпляр."""
+    coordinator = runtime.coordinator
+    if coordinator is None:
+        return tenants
+    claimed = coordinator.heartbeat()
+    for tenant in tenants:
+        if coordinator.partition(tenant.id) not in claimed:
+            continue
+        data = coordinator.store.load_tenant_state(tenant.id)
+        if data:
+            with runtime.state.lock:
+                runtime.state.tenants[tenant.id] = data
+    return [tenant for tenant in tenants if coordinator.owns(tenant.id)]
+
+
+def next_poll(runtime, tenant):
+    """Время следующего опроса тенанта по расписанию со сдвигами."""
+    return runtime.schedule.next_due(
+        tenant.id, runtime.state.last_poll(tenant.id),
+        poll_period(runtime, tenant))
+
+
+def next_wakeup(runtime):
+    """Сколько целых секунд спать до ближайшего опроса.
+
+    Не дольше остатка периода: раз в период цикл нужен в любом случае
+    (аренда, проверка чатов). Просроченные, но отложенные тенанты
+    (квота, сбои, перегрузка) дождутся следующего пробуждения.
+    """
+    now = runtime.clock.time()
+    delay = runtime.watchdog.remaining()
+    for tenant in runtime.tenants:
+        due = next_poll(runtime, tenant)
+        if due > now:
+            delay = min(delay, math.ceil(due - now))
+    digest_due = runtime.digests.next_due()
+    if digest_due is not None:
+        delay = min(delay, max(math.ceil(digest_due - now), 0))
+    return delay
+
+
+def due_tenants(runtime, tenants):
+    """Тенанты, которым пора опрос, в порядке справедливой очереди.
+
+    Тенанты из runtime.forced опрашиваются вне расписания и пауз.
+    """
+    now = runtime.clock.time()
+    return [
+        tenant for tenant in runtime.limiter.fair_order(tenants)
+        if (tenant.id in runtime.forced or (
+            now >= next_poll(runtime, tenant)
+            and runtime.retries.ready(tenant.id, now)))
+        and any(
+            runtime.dead_chats.reachable(chat_id)
+            for chat_id in runtime.subscriptions.chats_for(tenant))
+    ]
+
+
+def probe_dead_chats(runtime):
+    """Проверяет недоступные чаты действием, невидимым пользователю."""
+    dead_chats = runtime.dead_chats
+    for chat_id in dead_chats.due_probes(runtime.clock.time()):
+        try:
+            runtime.bot.send_chat_action(chat_id, "typing")
+        except ApiException as error:
+            error = telegram_error(error, chat_id)
+            if isinstance(error, ChatBlockedError):
+                dead_chats.failed(chat_id, error.error_code)
+                continue
+            logger.warning(f"Не удалось проверить чат {chat_id}: {error}")
+            continue
+        except requests.RequestException as error:
+            logger.warning(f"Не удалось проверить чат {chat_id}: {error}")
+            continue
+        dead_chats.succeeded(chat_id)
+
+
+def run_cycle(runtime):
+    """Опрашивает тенантов, для которых подошло время опроса."""
+    tenants = owned_tenants(runtime, runtime.tenants)
+    probe_dead_chats(runtime)
+    send_digests(runtime)
+    weight = partial(tenant_weight, runtime)
+    due = shed_polls(runtime, due_tenants(runtime, tenants))
+    for tenant in runtime.queue.order(due, weight):
+        if runtime.lifecycle.stopping:
+            return
+        if not runtime.limiter.acquire(tenant.id):
+            logger.info(f"Квота API исчерпана, {tenant.id} ждёт цикла.")
+            continue
+        runtime.queue.served(tenant.id, weight(tenant))
+        runtime.forced.discard(tenant.id)
+        try:
+            with tracer.span("poll", tenant=tenant.id):
+                poll_homeworks(runtime, tenant)
+        except ShutdownRequested:
+            raise
+        except Exception as error:
+            handle_failure(runtime, tenant, error)
+        else:
+            runtime.retries.succeeded(tenant.id)
+    logger.debug(f"Расход квоты API: {runtime.limiter.usage()}")
+    logger.debug(f"Сбои опроса: {runtime.retries.report()}")
+    logger.debug(f"Недоступные чаты: {runtime.dead_chats.report()}")
+    if runtime.transport is not None:
+        logger.debug(f"Запросы к Telegram: {runtime.transport.report()}")
+
+
+def handle_failure(runtime, tenant, error):
+    """Реагирует на сбой опроса тенанта по политике из retry.POLICIES.
+
+    О серии одинаковых сбоев тенант узнаёт один раз, а опрос
+    откладывается или приостанавливается, чтобы не тратить запросы.
+    """
+    policy, failures = runtime.retries.failed(tenant.id, error)
+    if policy.pause:
+        runtime.limiter.throttled(error.retry_after)
+        return
+    message = f"{policy.title}: {type(error).__name__}: {error}"
+    logging.error(message)
+    if policy.notify and failures == 1:
+        send_to(runtime, tenant.chat_id, message)
+
+
+def handle_push(runtime, tenant_id, payload):
+    """Обрабатывает push-событие тенанта.
+
+    События для тенантов, которыми этот экземпляр не владеет,
+    отбрасываются: их обработает владелец при сверке.
+    """
+    tenant = runtime.tenants_by_id.get(tenant_id)
+    if tenant is None:
+        logger.info(f"Событие для удалённого тенанта {tenant_id}.")
+        return
+    coordinator = runtime.coordinator
+    if coordinator is not None and not coordinator.owns(tenant.id):
+        logger.info(f"Событие для чужого тенанта {tenant_id} отброшено.")
+        return
+    with tracer.trace("push_event", tenant=tenant.id):
+        handle_homeworks(
+            runtime, tenant, payload["homeworks"], payload, polled=False)
+
+
+def start_push_receiver(runtime):
+    """Запускает приём push-событий, если задан PUSH_PORT."""
+    if not PUSH_PORT:
+        return None
+
+    receiver = PushReceiver(
+        partial(handle_push, runtime), check_response, runtime.tenants_by_id,
+        port=PUSH_PORT)
+    receiver.start()
+    runtime.lifecycle.on_shutdown(receiver.stop)
+    return receiver
+
+
+def apply_settings(runtime, settings):
+    """Подменяет настройки опроса, шаблоны вердиктов и токен бота."""
+    global RETRY_PERIOD, ENDPOINT, HOMEWORK_VERDICTS
+    RETRY_PERIOD = settings.get("retry_period", RETRY_PERIOD)
+    ENDPOINT = settings.get("endpoint", ENDPOINT)
+    HOMEWORK_VERDICTS = settings.get("verdicts", HOMEWORK_VERDICTS)
+    if "telegram_token" in settings:
+        runtime.bot = TeleBot(token=settings["telegram_token"])
+    if runtime.watchdog is not None:
+        runtime.watchdog.period = RETRY_PERIOD
+        runtime.watchdog.register(
+            MAIN_WORKER, 3 * RETRY_PERIOD, terminate_process)
+
+
+def apply_config(runtime, name, value):
+    """Применяет перечитанную конфигурацию между обработкой событий."""
+    with runtime.state.lock:
+        if name == "tenants":
+            for tenant in value:
+                if runtime.tenants_by_id.get(tenant.id) != tenant:
+                    runtime.retries.resume(tenant.id)
+            added, removed = runtime.set_tenants(value)
+            logger.info(f"Тенанты: добавлены {added}, удалены {removed}.")
+        elif name == "subscriptions":
+            runtime.subscriptions = value
+        elif name == "settings":
+            apply_settings(runtime, value)
+
+
+def start_config_watcher(runtime):
+    """Следит за файлами тенантов, подписок и настроек."""
+    watcher = ConfigWatcher(partial(apply_config, runtime))
+    watcher.watch("tenants", TENANTS_FILE, lambda path: load_tenants(
+        path, PRACTICUM_TOKEN, TELEGRAM_CHAT_ID, bool(PUSH_PORT),
+        parse_deadlines(DEADLINES)))
+    watcher.watch("subscriptions", SUBSCRIPTIONS_FILE, SubscriptionRegistry)
+    watcher.watch("settings", SETTINGS_FILE, load_settings)
+    watcher.poll()
+    watcher.start()
+    runtime.lifecycle.on_shutdown(watcher.stop)
+
+
+def start_watchdog(runtime):
+    """Следит за циклом опроса и фоновыми потоками.
+
+    Если задан HEALTH_PORT, поднимает /healthz и /readyz и фоновую
+    проверку, которая перезапускает зависшие потоки.
+    """
+    watchdog = Watchdog(RETRY_PERIOD, runtime.clock.monotonic)
+    watchdog.register(MAIN_WORKER, 3 * RETRY_PERIOD, terminate_process)
+    if runtime.receiver is not None:
+        watchdog.register(
+            "push", WORKER_TIMEOUT, runtime.receiver.restart_worker)
+        runtime.receiver.heartbeat = partial(watchdog.beat, "push")
+    runtime.watchdog = watchdog
+    if HEALTH_PORT:
+        server = HealthServer(
+            watchdog, port=HEALTH_PORT,
+            stats=partial(turnaround_report, runtime.state))
+        server.start()
+        runtime.lifecycle.on_shutdown(server.stop)
+
+
+def tenant_status(runtime, tenant, now):
+    """Состояние тенанта для команды управления tenants."""
+    due = next_poll(runtime, tenant)
+    coordinator = runtime.coordinator
+    return {
+        "id": tenant.id,
+        "state": tenant_priority(runtime, tenant),
+        "last_poll": runtime.state.last_poll(tenant.id) or None,
+        "next_poll": round(due),
+        "lag": round(max(now - due, 0)),
+        "owned": coordinator is None or coordinator.owns(tenant.id),
+        "failures": runtime.retries.failures.get(tenant.id, 0),
+        "suspended": runtime.retries.suspended.get(tenant.id),
+        "forced": tenant.id in runtime.forced,
+    }
+
+
+def queue_sizes(runtime):
+    """Размеры очередей и кешей для команды управления caches."""
+    return {
+        "forced": sorted(runtime.forced),
+        "deferred": list(runtime.limiter.deferred),
+        "outbox_pending": (
+            len(runtime.outbox.pending) if runtime.outbox is not None else 0),
+        "digests": len(runtime.digests),
+        "dead_chats": len(runtime.dead_chats.chats),
+        "tracer_buffer": len(tracer.buffer),
+    }
+
+
+def admin_commands(runtime):
+    """Команды управления работающим ботом (см. admin.AdminServer)."""
+    def tenants():
+        now = runtime.clock.time()
+        with runtime.state.lock:
+            return [
+                tenant_status(runtime, tenant, now)
+                for tenant in runtime.tenants
+            ]
+
+    def poll(tenant_id):
+        if tenant_id not in runtime.tenants_by_id:
+            raise ValueError(f"неизвестный тенант {tenant_id}")
+        runtime.forced.add(tenant_id)
+        runtime.lifecycle.wake()
+        return {"queued": tenant_id}
+
+    def caches():
+        report = memory_monitor.report()
+        report["queues"] = queue_sizes(runtime)
+        report["limiter"] = runtime.limiter.usage()
+        report["retries"] = runtime.retries.report()
+        if runtime.transport is not None:
+            report["telegram"] = runtime.transport.report()
+        if runtime.watchdog is not None:
+            report["cycles"] = runtime.watchdog.report()
+        return report
+
+    def debug(mode):
+        level = logging.DEBUG if mode == "on" else logging.INFO
+        for target in (logging.getLogger(), logger):
+            target.setLevel(level)
+        return logging.getLevelName(level)
+
+    def profile(cycles=None):
+        profiler.request(cycles)
+        return {"cycles": profiler.remaining}
+
+    return {
+        "tenants": tenants, "poll": poll, "caches": caches,
+        "debug": debug, "profile": profile,
+    }
+
+
+def start_admin(runtime):
+    """Открывает сокет команд управления, если задан ADMIN_SOCKET."""
+    if not ADMIN_SOCKET:
+        return
+    server = AdminServer(admin_commands(runtime))
+    server.start()
+    runtime.lifecycle.on_shutdown(server.stop)
+
+
+def track_memory(runtime):
+    """Ставит кеши и истории бота под бюджеты самопроверки памяти."""
+    state = runtime.state
+    memory_monitor.track(
+        "state.homeworks", state.size,
+        lambda: STATE_HOMEWORKS_LIMIT * max(len(runtime.tenants), 1))
+    dead_chats = runtime.dead_chats
+    memory_monitor.track(
+        "dead_chats", lambda: len(dead_chats.chats), dead_chats.limit)
+    memory_monitor.track(
+        "digests", runtime.digests.in_memory, runtime.digests.memory_limit)
+    memory_monitor.track(
+        "tracer.buffer", lambda: len(tracer.buffer), tracer.batch)
+    if runtime.outbox is not None:
+        memory_monitor.track(
+            "outbox.done", lambda: len(runtime.outbox.done),
+            runtime.outbox.keep_done)
+
+
+def run_iteration(runtime):
+    """Один цикл опроса; ошибки цикла не останавливают бота."""
+    try:
+        profiler.start_cycle()
+        runtime.watchdog.cycle_started()
+        with tracer.trace("poll_cycle"):
+            run_cycle(runtime)
+    except ShutdownRequested:
+        raise
+    except Exception as error:
+        e_msg = f"Ошибка в работе программы: {error}"
+        logging.error(e_msg)
+        send_message(runtime.bot, e_msg)
+    finally:
+        runtime.watchdog.cycle_finished()
+        profiler.end_cycle()
+        memory_monitor.maybe_check()
+
+
 def main():
     """Основная логика работы бота."""
     tokens_ok, result = check_tokens()
@@ -123,43 +796,57 @@ def main():
         sys.exit(1)
 
     bot = TeleBot(token=TELEGRAM_TOKEN)
-    timestamp = int(time.time())
+    state = PollState(STATE_FILE, int(time.time()))
+    lifecycle = Lifecycle()
+    runtime = Runtime(bot, state, lifecycle, SubscriptionRegistry())
+    runtime.transport = TelegramTransport()
+    runtime.transport.install()
+    lifecycle.on_shutdown(runtime.transport.uninstall)
+    runtime.set_tenants(load_tenants(
+        TENANTS_FILE, PRACTICUM_TOKEN, TELEGRAM_CHAT_ID, bool(PUSH_PORT),
+        parse_deadlines(DEADLINES)))
+    runtime.coordinator = create_coordinator(clock=runtime.clock.time)
+    runtime.outbox = create_outbox()
+    runtime.digests = create_digests(runtime.outbox)
+    runtime.receiver = start_push_receiver(runtime)
+    start_watchdog(runtime)
+    start_config_watcher(runtime)
+    track_memory(runtime)
+    start_admin(runtime)
+    lifecycle.on_shutdown(state.save)
+    lifecycle.on_shutdown(profiler.uninstall)
+    lifecycle.on_shutdown(recorder.close)
+    lifecycle.on_shutdown(tracer.close)
+    lifecycle.on_shutdown(runtime.digests.close)
+    if runtime.outbox is not None:
+        lifecycle.on_shutdown(runtime.outbox.close)
+    if runtime.coordinator is not None:
+        lifecycle.on_shutdown(runtime.coordinator.release_all)
+    lifecycle.install()
+    profiler.install()
     send_message(bot, "Привет! Я готов отслеживать изменения.")
-    last_message = ""
+    if runtime.outbox is not None:
+        runtime.outbox.deliver(partial(send_to, runtime), runtime.clock)
 
-    while True:
-        try:
-            response = get_api_answer(timestamp)
-            homeworks = check_response(response)
-            if homeworks:
-                for homework in homeworks:
-                    message = parse_status(homework)
-                    if last_message != message:
-                        send_message(bot, message)
-                        last_message = message
-                    else:
-                        logger.debug("Сообщение не отправлено: дублирование.")
-            else:
-                logging.debug("Все по прежнему, изменений нет.")
-            timestamp = response.get("timestamp", timestamp)
-        except (KeyError, TypeError) as error:
-            key_type_e_msg = f"Ошибка: {type(error).__name__}: {error}"
-            logging.error(key_type_e_msg)
-            send_message(bot, key_type_e_msg)
-        except EndpointError as error:
-            logging.error(f"Ошибка API: {error}")
-            send_message(bot, f"Ошибка API: {error}")
-        except Exception as error:
-            e_msg = f"Ошибка в работе программы: {error}"
-            logging.error(e_msg)
-            send_message(bot, e_msg)
-        finally:
-            time.sleep(RETRY_PERIOD)
+    try:
+        while True:
+            try:
+                run_iteration(runtime)
+            finally:
+                delay = next_wakeup(runtime)
+                with lifecycle.interruptible():
+                    time.sleep(delay)
+    except ShutdownRequested as reason:
+        logger.info(f"Бот остановлен: {reason}")
+    finally:
+        lifecycle.shutdown()
 
 
 if __name__ == "__main__":
     logging.basicConfig(
         level=logging.DEBUG,
-        filename="tg_bot.log",
+        handlers=[logging.handlers.RotatingFileHandler(
+            LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+            encoding="utf-8")],
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",)
     main()
@@ -0,0 +1,253 @@
+import json
+import logging
+import math
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+
+LEASE_DB = os.getenv("LEASE_DB")
+LEASE_PARTITIONS = int(os.getenv("LEASE_PARTITIONS", 16))
+# Аренда продлевается раз в цикл, поэтому живёт дольше двух циклов.
+LEASE_TTL = float(os.getenv("LEASE_TTL", 1500))
+
+logger = logging.getLogger(__name__)
+
+
+def instance_id():
+    """Уникальное имя экземпляра бота."""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class LeaseStore(ABC):
+    """Хранилище аренды разделов тенантов.
+
+    Все операции атомарны относительно других экземпляров бота.
+    """
+
+    @abstractmethod
+    def heartbeat(self, owner, expires):
+        """Отмечает, что экземпляр owner жив до expires."""
+
+    @abstractmethod
+    def live_instances(self, now):
+        """Имена живых экземпляров."""
+
+    @abstractmethod
+    def claim(self, partition, owner, expires, now):
+        """Берёт свободный или просроченный раздел; True при успехе."""
+
+    @abstractmethod
+    def renew(self, partition, owner, expires, now):
+        """Продлевает аренду, если она всё ещё принадлежит owner."""
+
+    @abstractmethod
+    def release(self, partition, owner):
+        """Освобождает раздел, если он принадлежит owner."""
+
+    @abstractmethod
+    def holds(self, partition, owner, now):
+        """Проверяет, что раздел прямо сейчас арендован owner."""
+
+    @abstractmethod
+    def save_tenant_state(self, tenant_id, data):
+        """Сохраняет состояние тенанта для передачи другому экземпляру."""
+
+    @abstractmethod
+    def load_tenant_state(self, tenant_id):
+        """Загружает сохранённое состояние тенанта или None."""
+
+
+class SQLiteLeaseStore(LeaseStore):
+    """Аренда в локальном файле SQLite, общем для экземпляров на хосте."""
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS leases ("
+        "partition INTEGER PRIMARY KEY, owner TEXT NOT NULL, "
+        "expires REAL NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS instances ("
+        "owner TEXT PRIMARY KEY, expires REAL NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS tenant_state ("
+        "tenant_id TEXT PRIMARY KEY, data TEXT NOT NULL)",
+    )
+
+    def __init__(self, path=LEASE_DB):
+        self.connection = sqlite3.connect(
+            path, timeout=10, isolation_level=None, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.transaction() as cursor:
+            for statement in self.SCHEMA:
+                cursor.execute(statement)
+
+    def transaction(self):
+        """Открывает транзакцию с блокировкой записи."""
+        return _Transaction(self.connection, self.lock)
+
+    def heartbeat(self, owner, expires):
+        """Записывает, что экземпляр owner жив до expires."""
+        with self.transaction() as cursor:
+            cursor.execute(
+                "INSERT OR REPLACE INTO instances VALUES (?, ?)",
+                (owner, expires))
+
+    def live_instances(self, now):
+        """Удаляет просроченные экземпляры и возвращает живых."""
+        with self.transaction() as cursor:
+            cursor.execute("DELETE FROM instances WHERE expires <= ?", (now,))
+            rows = cursor.execute("SELECT owner FROM instances").fetchall()
+        return {owner for owner, in rows}
+
+    def claim(self, partition, owner, expires, now):
+        """Берёт раздел, если он свободен, просрочен или уже свой."""
+        with self.transaction() as cursor:
+            cursor.execute(
+                "INSERT INTO leases VALUES (?, ?, ?) "
+                "ON CONFLICT(partition) DO UPDATE SET "
+                "owner = excluded.owner, expires = excluded.expires "
+                "WHERE leases.expires <= ? OR leases.owner = excluded.owner",
+                (partition, owner, expires, now))
+            return cursor.rowcount == 1
+
+    def renew(self, partition, owner, expires, now):
+        """Продлевает непросроченную аренду owner до expires."""
+        with self.transaction() as cursor:
+            cursor.execute(
+                "UPDATE leases SET expires = ? "
+                "WHERE partition = ? AND owner = ? AND expires > ?",
+                (expires, partition, owner, now))
+            return cursor.rowcount == 1
+
+    def release(self, partition, owner):
+        """Удаляет аренду раздела, если она принадлежит owner."""
+        with self.transaction() as cursor:
+            cursor.execute(
+                "DELETE FROM leases WHERE partition = ? AND owner = ?",
+                (partition, owner))
+
+    def holds(self, partition, owner, now):
+        """Есть ли у owner действующая аренда раздела."""
+        with self.transaction() as cursor:
+            row = cursor.execute(
+                "SELECT 1 FROM leases "
+                "WHERE partition = ? AND owner = ? AND expires > ?",
+                (partition, owner, now)).fetchone()
+        return row is not None
+
+    def save_tenant_state(self, tenant_id, data):
+        """Записывает состояние тенанта в JSON."""
+        with self.transaction() as cursor:
+            cursor.execute(
+                "INSERT OR REPLACE INTO tenant_state VALUES (?, ?)",
+                (tenant_id, json.dumps(data, ensure_ascii=False)))
+
+    def load_tenant_state(self, tenant_id):
+        """Читает состояние тенанта или None."""
+        with self.transaction() as cursor:
+            row = cursor.execute(
+                "SELECT data FROM tenant_state WHERE tenant_id = ?",
+                (tenant_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK для SQLite под блокировкой."""
+
+    def __init__(self, connection, lock):
+        self.connection = connection
+        self.lock = lock
+
+    def __enter__(self):
+        self.lock.acquire()
+        self.cursor = self.connection.cursor()
+        self.cursor.execute("BEGIN IMMEDIATE")
+        return self.cursor
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.cursor.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.lock.release()
+
+
+class LeaseCoordinator:
+    """Распределяет тенантов между экземплярами бота через аренду.
+
+    Тенанты разбиты на LEASE_PARTITIONS разделов по хешу. Каждый цикл
+    экземпляр продлевает свои разделы, забирает просроченные до своей
+    справедливой доли и отдаёт лишние, если появились новые экземпляры.
+    Перед отправкой уведомлений аренда перепроверяется в хранилище,
+    поэтому экземпляр, потерявший раздел, ничего не отправит.
+    """
+
+    def __init__(self, store, owner=None, partitions=LEASE_PARTITIONS,
+                 ttl=LEASE_TTL, clock=time.time):
+        self.store = store
+        self.owner = owner or instance_id()
+        self.partitions = partitions
+        self.ttl = ttl
+        self.clock = clock
+        self.owned = set()
+
+    def partition(self, tenant_id):
+        """Раздел, к которому относится тенант."""
+        return zlib.crc32(tenant_id.encode()) % self.partitions
+
+    def heartbeat(self):
+        """Продлевает аренду и перераспределяет разделы.
+
+        Возвращает множество разделов, полученных в этом вызове.
+        """
+        now = self.clock()
+        expires = now + self.ttl
+        self.store.heartbeat(self.owner, expires)
+        self.owned = {
+            partition for partition in self.owned
+            if self.store.renew(partition, self.owner, expires, now)
+        }
+        live = self.store.live_instances(now) | {self.owner}
+        share = math.ceil(self.partitions / len(live))
+        while len(self.owned) > share:
+            self.store.release(self.owned.pop(), self.owner)
+        claimed = set()
+        for partition in range(self.partitions):
+            if len(self.owned) >= share:
+                break
+            if partition in self.owned:
+                continue
+            if self.store.claim(partition, self.owner, expires, now):
+                self.owned.add(partition)
+                claimed.add(partition)
+        if claimed:
+            logger.info(f"{self.owner} получил разделы {sorted(claimed)}.")
+        return claimed
+
+    def owns(self, tenant_id):
+        """Принадлежит ли тенант этому экземпляру по последнему циклу."""
+        return self.partition(tenant_id) in self.owned
+
+    def confirm(self, tenant_id):
+        """Перепроверяет аренду тенанта в хранилище перед отправкой."""
+        partition = self.partition(tenant_id)
+        if self.store.holds(partition, self.owner, self.clock()):
+            return True
+        self.owned.discard(partition)
+        logger.warning(f"Аренда тенанта {tenant_id} потеряна.")
+        return False
+
+    def release_all(self):
+        """Отдаёт все разделы, чтобы другой экземпляр забрал их сразу."""
+        for partition in self.owned:
+            self.store.release(partition, self.owner)
+        self.owned.clear()
+        self.store.heartbeat(self.owner, 0)
+
+
+def create_coordinator(path=LEASE_DB, clock=time.time):
+    """Координатор аренды или None, если бот работает один."""
+    if not path:
+        return None
+    return LeaseCoordinator(SQLiteLeaseStore(path), clock=clock)
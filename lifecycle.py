@@ -0,0 +1,103 @@
+import logging
+import signal
+import threading
+import time
+from contextlib import contextmanager
+
+from exeptions import ShutdownRequested, WakeRequested
+
+# Сколько секунд после сигнала даётся на отправку уже начатых
+# уведомлений. Heroku присылает SIGKILL через 30 секунд после SIGTERM.
+DRAIN_TIMEOUT = 20
+SHUTDOWN_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+# Сигнал, которым другой поток будит основной цикл раньше срока.
+WAKE_SIGNAL = signal.SIGUSR2
+
+logger = logging.getLogger(__name__)
+
+
+class Lifecycle:
+    """Управляет корректной остановкой основного цикла бота.
+
+    Первый сигнал запрещает новые опросы и даёт DRAIN_TIMEOUT секунд
+    на завершение текущих отправок. Если бот в этот момент спит, сон
+    прерывается сразу. Повторный сигнал прерывает работу немедленно.
+    Сон между циклами можно прервать и без остановки — вызовом wake.
+    """
+
+    def __init__(self, drain_timeout=DRAIN_TIMEOUT):
+        self.drain_timeout = drain_timeout
+        self.stopping = False
+        self.sleeping = False
+        self.deadline = None
+        self.flush_callbacks = []
+        self.previous_handlers = {}
+
+    def install(self):
+        """Устанавливает обработчики сигналов остановки."""
+        handlers = {signum: self.handle_signal for signum in SHUTDOWN_SIGNALS}
+        handlers[WAKE_SIGNAL] = self.handle_wake
+        for signum, handler in handlers.items():
+            try:
+                self.previous_handlers[signum] = signal.signal(
+                    signum, handler)
+            except ValueError:
+                logger.warning(
+                    "Обработчики сигналов можно установить только "
+                    "в главном потоке.")
+                return
+
+    def handle_signal(self, signum, frame):
+        """Запрашивает остановку по сигналу."""
+        if self.stopping:
+            logger.warning("Повторный сигнал: немедленная остановка.")
+            raise ShutdownRequested(signal.Signals(signum).name)
+        logger.info(f"Получен сигнал {signal.Signals(signum).name}, "
+                    "бот завершает работу.")
+        self.stopping = True
+        self.deadline = time.monotonic() + self.drain_timeout
+        if self.sleeping:
+            raise ShutdownRequested(signal.Signals(signum).name)
+
+    def handle_wake(self, signum, frame):
+        """Прерывает сон между циклами, если бот спит."""
+        if self.sleeping:
+            raise WakeRequested()
+
+    def wake(self):
+        """Будит основной цикл из другого потока."""
+        if self.sleeping and WAKE_SIGNAL in self.previous_handlers:
+            signal.pthread_kill(threading.main_thread().ident, WAKE_SIGNAL)
+
+    def on_shutdown(self, callback):
+        """Регистрирует функцию сброса состояния при остановке."""
+        self.flush_callbacks.append(callback)
+
+    def drain_expired(self):
+        """Проверяет, истекло ли время на завершение отправок."""
+        return (self.deadline is not None
+                and time.monotonic() >= self.deadline)
+
+    @contextmanager
+    def interruptible(self):
+        """Помечает участок кода, который сигнал может прервать сразу."""
+        self.sleeping = True
+        try:
+            if self.stopping:
+                raise ShutdownRequested("остановка до начала ожидания")
+            yield
+        except WakeRequested:
+            logger.info("Ожидание прервано: внеочередной цикл.")
+        finally:
+            self.sleeping = False
+
+    def shutdown(self):
+        """Сбрасывает состояние и восстанавливает обработчики сигналов."""
+        for callback in self.flush_callbacks:
+            try:
+                callback()
+            except Exception as error:
+                logger.error(f"Ошибка при сбросе состояния: {error}")
+        for signum, handler in self.previous_handlers.items():
+            signal.signal(signum, handler)
+        self.previous_handlers.clear()
@@ -0,0 +1,135 @@
+import logging
+import os
+import resource
+import time
+import tracemalloc
+from collections import deque
+
+MEMORY_CHECK_PERIOD = float(os.getenv("MEMORY_CHECK_PERIOD", 3600))
+# tracemalloc замедляет выделение памяти, поэтому включается отдельно.
+MEMORY_TRACE = os.getenv("MEMORY_TRACE")
+MEMORY_LIMIT_MB = float(os.getenv("MEMORY_LIMIT_MB", 0))
+MEMORY_TOP = 10
+# Утечкой считается рост RSS в LEAK_CHECKS проверках подряд,
+# в сумме больше чем на долю LEAK_GROWTH.
+LEAK_CHECKS = 6
+LEAK_GROWTH = 0.2
+
+logger = logging.getLogger(__name__)
+
+
+def current_rss():
+    """Текущий RSS процесса в байтах (на не-Linux — пиковый)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as file:
+            pages = int(file.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MemoryMonitor:
+    """Периодическая самопроверка памяти долгоживущего процесса.
+
+    Раз в period секунд замеряет RSS и размеры зарегистрированных
+    кешей и историй. Кеш сверх своего бюджета, RSS сверх limit_mb
+    и устойчивый рост RSS (LEAK_CHECKS проверок подряд) попадают
+    в лог с ошибкой. С trace включается tracemalloc, и в лог
+    пишутся места с наибольшим ростом памяти с прошлой проверки.
+    """
+
+    def __init__(self, period=MEMORY_CHECK_PERIOD, trace=MEMORY_TRACE,
+                 limit_mb=MEMORY_LIMIT_MB, clock=time.monotonic,
+                 rss=current_rss):
+        self.period = period
+        self.trace = bool(trace)
+        self.limit_mb = limit_mb
+        self.clock = clock
+        self.rss = rss
+        self.budgets = {}
+        self.samples = deque(maxlen=LEAK_CHECKS + 1)
+        self.last_check = clock()
+        self.snapshot = None
+        self.leak_suspected = False
+
+    def track(self, name, size, limit):
+        """Регистрирует кеш: size() — текущий размер, limit — бюджет.
+
+        limit может быть функцией, если бюджет зависит от конфигурации.
+        """
+        self.budgets[name] = (size, limit)
+
+    def sizes(self):
+        """Размеры кешей и их бюджеты."""
+        return {
+            name: {"size": size(),
+                   "limit": limit() if callable(limit) else limit}
+            for name, (size, limit) in self.budgets.items()
+        }
+
+    def maybe_check(self):
+        """Проверяет память, если с прошлой проверки прошёл период."""
+        if self.clock() - self.last_check < self.period:
+            return
+        self.check()
+
+    def check(self):
+        """Замеряет память и сообщает о превышениях и росте."""
+        self.last_check = self.clock()
+        rss = self.rss()
+        self.samples.append(rss)
+        over_budget = {
+            name: sizes for name, sizes in self.sizes().items()
+            if sizes["size"] > sizes["limit"]
+        }
+        if over_budget:
+            logger.error(f"Кеши сверх бюджета: {over_budget}")
+        if self.limit_mb and rss > self.limit_mb * 2 ** 20:
+            logger.error(
+                f"Память процесса {rss / 2 ** 20:.0f} МБ "
+                f"больше лимита {self.limit_mb:.0f} МБ.")
+        self.leak_suspected = self.growing()
+        growth = self.top_growth()
+        if self.leak_suspected:
+            logger.error(
+                f"Похоже на утечку памяти: RSS растёт {LEAK_CHECKS} "
+                f"проверок подряд, сейчас {rss / 2 ** 20:.0f} МБ. "
+                f"Наибольший рост: {growth}")
+        elif growth:
+            logger.info(f"Рост памяти с прошлой проверки: {growth}")
+
+    def growing(self):
+        """Растёт ли RSS все последние LEAK_CHECKS проверок."""
+        if len(self.samples) <= LEAK_CHECKS:
+            return False
+        samples = list(self.samples)
+        steady = all(
+            later > earlier for earlier, later in zip(samples, samples[1:]))
+        return steady and samples[-1] >= samples[0] * (1 + LEAK_GROWTH)
+
+    def top_growth(self):
+        """Места наибольшего роста памяти по tracemalloc."""
+        if not self.trace:
+            return []
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        snapshot = tracemalloc.take_snapshot()
+        previous, self.snapshot = self.snapshot, snapshot
+        if previous is None:
+            return []
+        return [
+            str(stat) for stat in snapshot.compare_to(previous, "lineno")
+            if stat.size_diff > 0
+        ][:MEMORY_TOP]
+
+    def report(self):
+        """Сводка памяти для проверок состояния."""
+        rss = self.samples[-1] if self.samples else self.rss()
+        return {
+            "rss_mb": round(rss / 2 ** 20, 1),
+            "leak_suspected": self.leak_suspected,
+            "caches": self.sizes(),
+        }
+
+
+memory_monitor = MemoryMonitor()
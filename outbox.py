@@ -0,0 +1,206 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import partial
+
+from clock import SystemClock
+from subscriptions import OutgoingBatch
+
+OUTBOX_FILE = os.getenv("OUTBOX_FILE")
+# Столько ключей доставленных сообщений помнится для идемпотентности.
+DONE_KEYS_KEPT = 10000
+# Журнал переписывается, когда в нём накопилось столько лишних записей.
+COMPACT_AFTER = 5000
+MAX_ATTEMPTS = 5
+# Повтор после n-й неудачи — через RETRY_DELAY * 2 ** (n - 1) секунд.
+RETRY_DELAY = 60
+
+logger = logging.getLogger(__name__)
+
+
+class Outbox:
+    """Журнал исходящих уведомлений с упреждающей записью.
+
+    Уведомления цикла сначала дописываются в журнал одной пачкой
+    с одним fsync, и только потом работы отмечаются увиденными.
+    После отправки в журнал дописывается отметка о доставке. При
+    перезапуске недоставленные уведомления отправляются снова, а ключи
+    идемпотентности не дают поставить одно событие в очередь дважды.
+    Журнал периодически переписывается, поэтому восстановление читает
+    только недоставленное и последние DONE_KEYS_KEPT ключей.
+    """
+
+    def __init__(self, path=OUTBOX_FILE, keep_done=DONE_KEYS_KEPT,
+                 max_attempts=MAX_ATTEMPTS, retry_delay=RETRY_DELAY):
+        self.path = path
+        self.keep_done = keep_done
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.pending = OrderedDict()
+        self.done = OrderedDict()
+        self.attempts = {}
+        self.retry_at = {}
+        self.records = 0
+        self.file = None
+        self.lock = threading.RLock()
+        self.recover()
+
+    def recover(self):
+        """Читает журнал: что ещё не доставлено и что уже доставлено."""
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                for line in file:
+                    self.replay(line)
+        except FileNotFoundError:
+            pass
+        if self.pending:
+            logger.info(f"В журнале {len(self.pending)} недоставленных.")
+        self.compact()
+
+    def replay(self, line):
+        """Применяет одну запись журнала."""
+        try:
+            record = json.loads(line)
+        except ValueError:
+            # Оборванная последняя строка после аварийной остановки.
+            logger.warning("Пропущена повреждённая запись журнала.")
+            return
+        self.records += 1
+        if record["op"] == "add":
+            if record["key"] not in self.done:
+                self.pending[record["key"]] = (
+                    record["chat_id"], record["text"])
+        elif record["op"] == "done":
+            self.pending.pop(record["key"], None)
+            self.remember(record["key"])
+
+    def remember(self, key):
+        """Запоминает ключ доставленного сообщения."""
+        self.done[key] = True
+        self.done.move_to_end(key)
+        while len(self.done) > self.keep_done:
+            self.done.popitem(last=False)
+
+    def write(self, records):
+        """Дописывает записи в журнал без fsync."""
+        if self.file is None:
+            self.file = open(self.path, "a", encoding="utf-8")
+        for record in records:
+            self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+        self.records += len(records)
+
+    def sync(self):
+        """Сбрасывает журнал на диск."""
+        if self.file is not None:
+            os.fsync(self.file.fileno())
+
+    def append(self, entries):
+        """Ставит уведомления (key, chat_id, text) в очередь одним fsync.
+
+        Уже известные ключи пропускаются; возвращает число новых.
+        """
+        with self.lock:
+            records = []
+            for key, chat_id, text in entries:
+                if key in self.pending or key in self.done:
+                    continue
+                self.pending[key] = (chat_id, text)
+                records.append({
+                    "op": "add", "key": key, "chat_id": chat_id,
+                    "text": text})
+            if records:
+                self.write(records)
+                self.sync()
+            return len(records)
+
+    def delivered(self, keys, ok, now=0):
+        """Отмечает отправку склеенных сообщений keys.
+
+        Неудачная отправка (ok is False) повторяется с удвоением паузы
+        от retry_delay, но не больше max_attempts раз. Приостановленная
+        (ok is None, чат недоступен) остаётся в очереди без попытки.
+        """
+        for key in keys:
+            if ok is None:
+                continue
+            if ok is False:
+                attempts = self.attempts[key] = self.attempts.get(key, 0) + 1
+                if attempts < self.max_attempts:
+                    self.retry_at[key] = (
+                        now + self.retry_delay * 2 ** (attempts - 1))
+                    continue
+                logger.error(f"Уведомление {key} не доставлено, пропущено.")
+            self.pending.pop(key, None)
+            self.attempts.pop(key, None)
+            self.retry_at.pop(key, None)
+            self.remember(key)
+            self.write([{"op": "done", "key": key}])
+
+    def deliver(self, send, clock=None):
+        """Отправляет недоставленное через send(chat_id, text).
+
+        Вызывается после каждого опроса, поэтому сообщения после
+        неудачной отправки ждут своего срока повтора, а не уходят
+        при каждом вызове.
+        """
+        clock = clock or SystemClock()
+        with self.lock:
+            now = clock.monotonic()
+            batch = OutgoingBatch(clock=clock)
+            for key, (chat_id, text) in self.pending.items():
+                if self.retry_at.get(key, 0) <= now:
+                    batch.add(chat_id, text, key)
+            if not len(batch):
+                return
+            try:
+                batch.flush(send, partial(self.delivered, now=now))
+            finally:
+                self.sync()
+            if self.records > COMPACT_AFTER + len(self.pending):
+                self.compact()
+
+    def compact(self):
+        """Переписывает журнал: недоставленное и ключи доставленного."""
+        with self.lock:
+            records = [
+                {"op": "done", "key": key} for key in self.done
+            ] + [
+                {"op": "add", "key": key, "chat_id": chat_id, "text": text}
+                for key, (chat_id, text) in self.pending.items()
+            ]
+            self.close()
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as file:
+                    for record in records:
+                        file.write(json.dumps(record, ensure_ascii=False))
+                        file.write("\n")
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(tmp_path, self.path)
+            except OSError as error:
+                logger.error(f"Не удалось переписать журнал: {error}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return
+            self.records = len(records)
+
+    def close(self):
+        """Закрывает файл журнала."""
+        with self.lock:
+            if self.file is not None:
+                self.sync()
+                self.file.close()
+                self.file = None
+
+
+def create_outbox(path=OUTBOX_FILE):
+    """Журнал исходящих или None, если OUTBOX_FILE не задан."""
+    if not path:
+        return None
+    return Outbox(path)
@@ -0,0 +1,97 @@
+import os
+from datetime import datetime, timezone
+
+DEADLINES = os.getenv("DEADLINES")
+# Дедлайн считается близким за столько часов до него.
+DEADLINE_WINDOW = float(os.getenv("DEADLINE_WINDOW_HOURS", 48)) * 3600
+# Во сколько раз чаще опрашивается тенант с работой на проверке
+# перед дедлайном.
+DEADLINE_SPEEDUP = 2
+
+DEADLINE = "deadline"
+REVIEWING = "reviewing"
+IDLE = "idle"
+PRIORITY_WEIGHTS = {DEADLINE: 4, REVIEWING: 2, IDLE: 1}
+
+
+def parse_deadlines(values):
+    """Переводит дедлайны ISO 8601 в отсортированные unix-времена.
+
+    values — список строк или строка через запятую; время без часового
+    пояса считается UTC.
+    """
+    if not values:
+        return ()
+    if isinstance(values, str):
+        values = values.split(",")
+    deadlines = []
+    for value in values:
+        moment = datetime.fromisoformat(str(value).strip())
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        deadlines.append(int(moment.timestamp()))
+    return tuple(sorted(deadlines))
+
+
+def near_deadline(deadlines, now, window=DEADLINE_WINDOW):
+    """Наступит ли один из дедлайнов в ближайшие window секунд."""
+    return any(0 <= deadline - now <= window for deadline in deadlines)
+
+
+def priority_class(homeworks, deadlines, now):
+    """Класс приоритета тенанта по статусам его работ и дедлайнам.
+
+    Без работ на проверке уведомлений ждать неоткуда (IDLE), с ними
+    важна задержка (REVIEWING), а перед дедлайном — тем более (DEADLINE).
+    """
+    if not any(
+            homework["status"] == "reviewing"
+            for homework in homeworks.values()):
+        return IDLE
+    if near_deadline(deadlines, now):
+        return DEADLINE
+    return REVIEWING
+
+
+class WeightedFairQueue:
+    """Взвешенная справедливая очередь опросов (start-time fair queuing).
+
+    Тенант получает метку начала, когда ему подходит время опроса,
+    и держит её, пока не будет опрошен; опрос сдвигает следующую метку
+    на 1 / weight. Тенанты обслуживаются по возрастанию меток окончания.
+    Когда квоты API на всех не хватает, тенант с весом 4 получает
+    вчетверо больше опросов, чем тенант с весом 1, но и тот не голодает:
+    его метка стоит на месте, пока другие её догоняют. Тенант, которому
+    не досталось квоты, сохраняет метку и встаёт в начало следующего
+    цикла.
+    """
+
+    def __init__(self):
+        self.virtual = 0.0
+        self.finish = {}
+        self.waiting = {}
+
+    def start_tag(self, tenant_id):
+        """Метка начала опроса тенанта, который ждёт своей очереди."""
+        if tenant_id not in self.waiting:
+            self.waiting[tenant_id] = max(
+                self.virtual, self.finish.get(tenant_id, 0.0))
+        return self.waiting[tenant_id]
+
+    def order(self, tenants, weight_of):
+        """Тенанты по возрастанию меток окончания опроса."""
+        return sorted(tenants, key=lambda tenant: (
+            self.start_tag(tenant.id) + 1 / weight_of(tenant)))
+
+    def served(self, tenant_id, weight):
+        """Учитывает опрос тенанта с весом weight."""
+        start = self.start_tag(tenant_id)
+        del self.waiting[tenant_id]
+        self.finish[tenant_id] = start + 1 / weight
+        self.virtual = max(self.virtual, start)
+
+    def forget(self, tenant_ids):
+        """Удаляет метки тенантов, которых больше нет."""
+        for tenant_id in tenant_ids:
+            self.finish.pop(tenant_id, None)
+            self.waiting.pop(tenant_id, None)
@@ -0,0 +1,141 @@
+import cProfile
+import json
+import logging
+import os
+import signal
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_CYCLES = int(os.getenv("PROFILE_CYCLES", 3))
+PROFILE_SIGNAL = signal.SIGUSR1
+TRACEMALLOC_TOP = 25
+
+logger = logging.getLogger(__name__)
+
+# Общий пустой контекст: в выключенном состоянии phase() не создаёт
+# новых объектов и не замеряет время.
+NO_PHASE = nullcontext()
+
+
+class PhaseTimer:
+    """Замеряет длительность одной фазы цикла."""
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.timings.setdefault(self.name, []).append(
+            time.perf_counter() - self.started)
+
+
+class Profiler:
+    """Профилирование живого цикла опроса по запросу.
+
+    После сигнала SIGUSR1 (или вызова request) следующие N циклов
+    выполняются под cProfile, с замером фаз и снимками tracemalloc.
+    Результаты каждого цикла сохраняются в PROFILE_DIR. Пока профилирование
+    не запрошено, start_cycle, end_cycle и phase ничего не делают.
+    """
+
+    def __init__(self, output_dir=PROFILE_DIR, cycles=PROFILE_CYCLES):
+        self.output_dir = output_dir
+        self.cycles = cycles
+        self.remaining = 0
+        self.active = False
+        self.profile = None
+        self.timings = None
+        self.snapshot = None
+        self.started_tracemalloc = False
+        self.previous_handler = None
+
+    def install(self):
+        """Включает профилирование по сигналу SIGUSR1."""
+        try:
+            self.previous_handler = signal.signal(
+                PROFILE_SIGNAL, self.handle_signal)
+        except ValueError:
+            logger.warning("Профилирование по сигналу недоступно.")
+
+    def uninstall(self):
+        """Восстанавливает прежний обработчик сигнала."""
+        if self.previous_handler is not None:
+            signal.signal(PROFILE_SIGNAL, self.previous_handler)
+            self.previous_handler = None
+
+    def handle_signal(self, signum, frame):
+        """Запрашивает профилирование по сигналу."""
+        self.request()
+
+    def request(self, cycles=None):
+        """Запрашивает профилирование следующих циклов."""
+        self.remaining = cycles or self.cycles
+        logger.info(f"Профилирование включено на {self.remaining} цикл(ов).")
+
+    def start_cycle(self):
+        """Начинает профилирование цикла, если оно запрошено."""
+        if not self.remaining or self.active:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracemalloc = True
+        self.snapshot = tracemalloc.take_snapshot()
+        self.timings = {}
+        self.active = True
+        self.cycle_started = time.perf_counter()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def end_cycle(self):
+        """Завершает профилирование цикла и сохраняет результаты."""
+        if not self.active:
+            return
+        self.profile.disable()
+        elapsed = time.perf_counter() - self.cycle_started
+        self.active = False
+        self.remaining -= 1
+        try:
+            self.dump(elapsed)
+        except OSError as error:
+            logger.error(f"Не удалось сохранить профиль: {error}")
+        if not self.remaining and self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+        self.profile = self.snapshot = self.timings = None
+
+    def phase(self, name):
+        """Возвращает контекст замера фазы цикла."""
+        if not self.active:
+            return NO_PHASE
+        return PhaseTimer(self.timings, name)
+
+    def dump(self, elapsed):
+        """Сохраняет cProfile, тайминги фаз и рост памяти за цикл."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        prefix = os.path.join(
+            self.output_dir,
+            f"cycle-{int(time.time())}-{self.remaining}")
+        self.profile.dump_stats(f"{prefix}.prof")
+        phases = {
+            name: {
+                "count": len(values),
+                "total": sum(values),
+                "max": max(values),
+            }
+            for name, values in self.timings.items()
+        }
+        with open(f"{prefix}.phases.json", "w", encoding="utf-8") as file:
+            json.dump({"cycle": elapsed, "phases": phases}, file, indent=2)
+        top = tracemalloc.take_snapshot().compare_to(self.snapshot, "lineno")
+        with open(f"{prefix}.memory.txt", "w", encoding="utf-8") as file:
+            for stat in top[:TRACEMALLOC_TOP]:
+                file.write(f"{stat}\n")
+        logger.info(f"Профиль цикла сохранён: {prefix}.*")
+
+
+profiler = Profiler()
@@ -0,0 +1,165 @@
+import hmac
+import json
+import logging
+import os
+import queue
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+PUSH_HOST = os.getenv("PUSH_HOST", "127.0.0.1")
+PUSH_PORT = os.getenv("PUSH_PORT")
+PUSH_SECRET = os.getenv("PUSH_SECRET")
+# Для тенантов на push-уведомлениях опрос остаётся только как сверка.
+RECONCILE_PERIOD = int(os.getenv("RECONCILE_PERIOD", 3600))
+PUSH_QUEUE_SIZE = 1000
+PUSH_PATH_PREFIX = "/homeworks/"
+WORKER_BEAT_INTERVAL = 1
+WORKER_TIMEOUT = 120
+MAX_BODY_SIZE = 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class PushHandler(BaseHTTPRequestHandler):
+    """Принимает POST /homeworks/<tenant_id> с телом в формате API."""
+
+    def do_POST(self):
+        """Проверяет событие и ставит его в очередь обработки."""
+        receiver = self.server.receiver
+        if not self.path.startswith(PUSH_PATH_PREFIX):
+            return self.reply(HTTPStatus.NOT_FOUND)
+        # Секрет проверяется до тенанта, чтобы без секрета нельзя было
+        # перебором узнать, какие тенанты существуют.
+        if not receiver.authorized(self.headers.get("X-Push-Secret")):
+            return self.reply(HTTPStatus.FORBIDDEN)
+        tenant_id = self.path[len(PUSH_PATH_PREFIX):].strip("/")
+        if tenant_id not in receiver.tenant_ids:
+            return self.reply(HTTPStatus.NOT_FOUND)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_SIZE:
+            return self.reply(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        try:
+            payload = json.loads(self.rfile.read(length))
+            receiver.validate(payload)
+        except (ValueError, KeyError, TypeError) as error:
+            logger.warning(f"Отклонено push-событие {tenant_id}: {error}")
+            return self.reply(HTTPStatus.BAD_REQUEST)
+        try:
+            receiver.events.put_nowait((tenant_id, payload))
+        except queue.Full:
+            return self.reply(HTTPStatus.SERVICE_UNAVAILABLE)
+        return self.reply(HTTPStatus.ACCEPTED)
+
+    def reply(self, status):
+        """Отвечает пустым телом с кодом status."""
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        """Пишет журнал запросов в logging вместо stderr."""
+        logger.debug(format % args)
+
+
+class PushReceiver:
+    """Входящий HTTP-приёмник событий о статусах домашних работ.
+
+    События проверяются функцией validate (той же, что и ответы API)
+    и обрабатываются в отдельном потоке функцией handle(tenant_id,
+    payload), то есть проходят тот же путь разбора, дедупликации
+    и уведомления, что и результаты опроса.
+    """
+
+    def __init__(self, handle, validate, tenant_ids,
+                 host=PUSH_HOST, port=0, secret=PUSH_SECRET):
+        self.handle = handle
+        self.validate = validate
+        self.tenant_ids = set(tenant_ids)
+        self.secret = secret
+        self.events = queue.Queue(maxsize=PUSH_QUEUE_SIZE)
+        self.server = ThreadingHTTPServer((host, int(port)), PushHandler)
+        self.server.daemon_threads = True
+        self.server.receiver = self
+        self.threads = []
+        self.worker = None
+        self.generation = 0
+        self.heartbeat = None
+
+    @property
+    def address(self):
+        """Адрес, на котором слушает приёмник."""
+        return self.server.server_address
+
+    def authorized(self, secret):
+        """Проверяет секрет отправителя, если он задан."""
+        if not self.secret:
+            return True
+        return hmac.compare_digest(secret or "", self.secret)
+
+    def start(self):
+        """Запускает HTTP-сервер и обработчик очереди в фоне."""
+        thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+        self.restart_worker()
+        logger.info(f"Приём push-событий на {self.address}.")
+
+    def restart_worker(self):
+        """Запускает новый обработчик очереди вместо прежнего.
+
+        Зависший обработчик остановить нельзя, поэтому он только
+        теряет своё поколение и завершится, когда handle вернёт
+        управление. Возвращает True: замена запущена.
+        """
+        if self.worker is not None and self.worker.is_alive():
+            logger.warning(
+                "Обработчик push-событий не отвечает, запускается новый.")
+        self.generation += 1
+        self.worker = threading.Thread(
+            target=self.process_events, args=(self.generation,),
+            daemon=True)
+        self.worker.start()
+        self.threads = [
+            thread for thread in self.threads if thread.is_alive()]
+        self.threads.append(self.worker)
+        return True
+
+    def process_events(self, generation):
+        """Передаёт события из очереди в обработчик.
+
+        Выходит, как только запущен обработчик следующего поколения.
+        """
+        while generation == self.generation:
+            if self.heartbeat is not None:
+                self.heartbeat()
+            try:
+                event = self.events.get(timeout=WORKER_BEAT_INTERVAL)
+            except queue.Empty:
+                continue
+            if event is None:
+                return
+            try:
+                self.handle(*event)
+            except Exception as error:
+                logger.error(f"Ошибка обработки push-события: {error}")
+
+    def stop(self):
+        """Останавливает приём и дожидается обработки принятых событий."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.events.put(None)
+        for thread in self.threads:
+            thread.join(timeout=5)
+
+
+def send_push(url, tenant_id, payload, secret=None, timeout=5):
+    """Отправляет push-событие; локальная замена отправителя для тестов."""
+    headers = {"X-Push-Secret": secret} if secret else {}
+    response = requests.post(
+        f"{url}{PUSH_PATH_PREFIX}{tenant_id}",
+        json=payload, headers=headers, timeout=timeout)
+    return response.status_code
@@ -0,0 +1,127 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+API_REQUESTS_PER_SECOND = float(os.getenv("API_REQUESTS_PER_SECOND", 2))
+API_BURST = int(os.getenv("API_BURST", 10))
+# Дольше этого ждать токен в цикле не стоит: тенант уйдёт в следующий цикл.
+MAX_WAIT = 5
+DEFAULT_RETRY_AFTER = 60
+
+logger = logging.getLogger(__name__)
+
+
+def parse_retry_after(value, default=DEFAULT_RETRY_AFTER):
+    """Переводит заголовок Retry-After в секунды ожидания."""
+    if not value:
+        return default
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    return max((moment - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
+class RateLimiter:
+    """Общий для всех тенантов token bucket запросов к API Практикума.
+
+    Ответ 429 приостанавливает все запросы на время из Retry-After.
+    Тенанты, которым не хватило квоты, запоминаются и в следующем цикле
+    опрашиваются первыми, поэтому нехватка квоты не копится на одних
+    и тех же тенантах.
+    """
+
+    def __init__(self, rate=API_REQUESTS_PER_SECOND, burst=API_BURST,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(burst)
+        self.updated = clock()
+        self.paused_until = 0
+        self.deferred = []
+        self.requests = {}
+        self.denied = 0
+        self.throttled_count = 0
+        self.lock = threading.Lock()
+
+    def refill(self, now):
+        """Пополняет корзину за прошедшее время."""
+        self.tokens = min(
+            self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Берёт токен или возвращает, сколько секунд его ждать."""
+        with self.lock:
+            now = self.clock()
+            self.refill(now)
+            if now < self.paused_until:
+                return self.paused_until - now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self, tenant_id, max_wait=MAX_WAIT):
+        """Разрешает запрос тенанта, подождав не дольше max_wait секунд."""
+        wait = self.reserve()
+        if 0 < wait <= max_wait:
+            self.sleep(wait)
+            wait = self.reserve()
+        with self.lock:
+            if wait:
+                self.denied += 1
+                if tenant_id not in self.deferred:
+                    self.deferred.append(tenant_id)
+                return False
+            if tenant_id in self.deferred:
+                self.deferred.remove(tenant_id)
+            self.requests[tenant_id] = self.requests.get(tenant_id, 0) + 1
+            return True
+
+    def throttled(self, retry_after):
+        """Приостанавливает запросы после ответа 429."""
+        with self.lock:
+            self.throttled_count += 1
+            self.tokens = 0
+            self.paused_until = max(
+                self.paused_until, self.clock() + retry_after)
+        logger.warning(
+            f"API ограничивает запросы, пауза {retry_after:.0f} с.")
+
+    def fair_order(self, tenants):
+        """Ставит тенантов, не получивших квоту, в начало очереди."""
+        deferred = set(self.deferred)
+        return (
+            [tenant for tenant in tenants if tenant.id in deferred]
+            + [tenant for tenant in tenants if tenant.id not in deferred])
+
+    def forget(self, tenant_ids):
+        """Удаляет счётчики тенантов, которых больше нет."""
+        with self.lock:
+            for tenant_id in tenant_ids:
+                self.requests.pop(tenant_id, None)
+                if tenant_id in self.deferred:
+                    self.deferred.remove(tenant_id)
+
+    def usage(self):
+        """Сводка расхода квоты."""
+        with self.lock:
+            self.refill(self.clock())
+            return {
+                "requests": sum(self.requests.values()),
+                "denied": self.denied,
+                "throttled": self.throttled_count,
+                "tokens_left": round(self.tokens, 2),
+                "paused_for": max(self.paused_until - self.clock(), 0),
+                "deferred_tenants": len(self.deferred),
+            }
@@ -0,0 +1,68 @@
+import gzip
+import json
+import logging
+import os
+import time
+
+RECORD_FILE = os.getenv("RECORD_FILE")
+
+logger = logging.getLogger(__name__)
+
+
+class Recorder:
+    """Записывает сырые ответы API Практикума в сжатый JSONL.
+
+    Каждая строка — один ответ: время получения, длительность запроса,
+    параметры, код и заголовки ответа и тело без разбора. Файл
+    дописывается новыми gzip-блоками, поэтому переживает перезапуски
+    бота.
+    """
+
+    def __init__(self, path=RECORD_FILE):
+        self.path = path
+        self.file = None
+
+    @property
+    def enabled(self):
+        """Включена ли запись ответов."""
+        return bool(self.path)
+
+    def record(self, params, response, elapsed):
+        """Дописывает ответ в файл записи."""
+        if not self.path:
+            return
+        line = json.dumps({
+            "ts": time.time(),
+            "elapsed": round(elapsed, 6),
+            "params": params,
+            "status": int(response.status_code),
+            "headers": dict(response.headers),
+            "body": response.text,
+        }, ensure_ascii=False)
+        try:
+            if self.file is None:
+                self.file = gzip.open(self.path, "at", encoding="utf-8")
+            self.file.write(line + "\n")
+            self.file.flush()
+        except OSError as error:
+            logger.error(f"Не удалось записать ответ API: {error}")
+
+    def close(self):
+        """Закрывает файл записи."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def read_records(path):
+    """Построчно читает записанные ответы, не загружая файл целиком."""
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        try:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        except EOFError:
+            logger.warning(f"Запись {path} оборвана, хвост пропущен.")
+
+
+recorder = Recorder()
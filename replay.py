@@ -0,0 +1,142 @@
+"""Воспроизведение записанных ответов API без обращения к сети.
+
+Пример запуска:
+    python replay.py responses.jsonl.gz --speed 100
+"""
+import argparse
+import json
+import logging
+import time
+
+import homework
+from exeptions import ThrottledError
+from lifecycle import Lifecycle
+from recording import read_records
+from state import PollState
+from tenants import DEFAULT_TENANT, Tenant
+
+
+class ReplayedResponse:
+    """Ответ API, восстановленный из записи.
+
+    Повторяет то, что коду опроса нужно от requests.Response: код,
+    заголовки (Retry-After у ответов 429) и тело целиком или по кускам
+    для потокового разбора. В записях старых версий заголовков нет.
+    """
+
+    def __init__(self, record):
+        self.status_code = record["status"]
+        self.headers = record.get("headers") or {}
+        self.text = record["body"]
+        self.url = homework.ENDPOINT
+
+    def json(self):
+        """Разбирает тело ответа."""
+        return json.loads(self.text)
+
+    def iter_content(self, chunk_size=1):
+        """Отдаёт тело кусками, как при stream=True."""
+        body = self.text.encode()
+        for start in range(0, len(body), chunk_size):
+            yield body[start:start + chunk_size]
+
+
+class ReplaySource:
+    """Отдаёт записанные ответы вместо сетевого запроса.
+
+    Паузы между запросами и длительность самих запросов сокращаются
+    в speed раз; при speed=0 ответы отдаются без задержек.
+    """
+
+    def __init__(self, records, speed=0):
+        self.records = iter(records)
+        self.speed = speed
+        self.current = None
+        self.calls = 0
+
+    def advance(self):
+        """Переходит к следующей записи, выдерживая паузу между ними.
+
+        Возвращает False, когда записи закончились.
+        """
+        previous = self.current
+        self.current = next(self.records, None)
+        if self.current is None:
+            return False
+        if previous is not None:
+            self.wait(self.current["ts"] - previous["ts"])
+        return True
+
+    def wait(self, seconds):
+        """Ждёт seconds, ускоренные в speed раз."""
+        if self.speed and seconds > 0:
+            time.sleep(seconds / self.speed)
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        """Отвечает на запрос к API текущим записанным ответом."""
+        record = self.current
+        self.calls += 1
+        self.wait(record["elapsed"])
+        return ReplayedResponse(record)
+
+
+class CountingBot:
+    """Бот-заглушка: считает сообщения вместо отправки в Telegram."""
+
+    def __init__(self):
+        self.sent = 0
+
+    def send_message(self, chat_id, text, **kwargs):
+        """Засчитывает отправленное сообщение."""
+        self.sent += 1
+
+
+def replay(records, speed=0, tenant_id=DEFAULT_TENANT):
+    """Прогоняет записанные ответы через цикл опроса бота.
+
+    Возвращает статистику: число ответов, уведомлений, ответов 429,
+    прочих ошибок и затраченное время.
+    """
+    source = ReplaySource(records, speed)
+    tenant = Tenant(tenant_id, None, homework.TELEGRAM_CHAT_ID)
+    bot = CountingBot()
+    runtime = None
+    errors = throttled = 0
+    started = time.perf_counter()
+    while source.advance():
+        if runtime is None:
+            state = PollState(None, int(source.current["ts"]))
+            runtime = homework.Runtime(bot, state, Lifecycle())
+            runtime.http_get = source.get
+        try:
+            homework.poll_homeworks(runtime, tenant)
+        except ThrottledError:
+            throttled += 1
+        except Exception:
+            errors += 1
+    elapsed = time.perf_counter() - started
+    return {
+        "responses": source.calls,
+        "notifications": bot.sent,
+        "throttled": throttled,
+        "errors": errors,
+        "seconds": elapsed,
+        "responses_per_second": source.calls / elapsed if elapsed else 0,
+    }
+
+
+def main():
+    """Запускает воспроизведение из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="файл, записанный с RECORD_FILE")
+    parser.add_argument(
+        "--speed", type=float, default=0,
+        help="во сколько раз ускорить паузы (0 — без пауз)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    stats = replay(read_records(args.path), args.speed)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
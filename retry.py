@@ -0,0 +1,117 @@
+import logging
+import os
+import time
+from collections import namedtuple
+
+from telebot.apihelper import ApiTelegramException
+
+from exeptions import (AuthError, ChatBlockedError, EndpointError,
+                       MalformedResponseError, ServerError, StatusError,
+                       ThrottledError)
+
+# Отозванный токен не чинится сам: проверяем его раз в сутки
+# или сразу после того, как тенанта поменяли в TENANTS_FILE.
+AUTH_SUSPEND_PERIOD = int(os.getenv("AUTH_SUSPEND_PERIOD", 24 * 3600))
+MAX_BACKOFF = 3600
+
+logger = logging.getLogger(__name__)
+
+# retry=False приостанавливает тенанта на backoff секунд. Иначе
+# следующий опрос откладывается на backoff * 2 ** (сбоев подряд - 1),
+# но не больше max_backoff. notify — сообщить в чат тенанта о первом
+# сбое серии, pause — приостановить запросы всех тенантов (код 429).
+RetryPolicy = namedtuple(
+    "RetryPolicy", "title retry notify pause backoff max_backoff",
+    defaults=(True, True, False, 0, 0))
+
+POLICIES = (
+    (AuthError, RetryPolicy(
+        "API отклонил токен", retry=False, backoff=AUTH_SUSPEND_PERIOD)),
+    (ThrottledError, RetryPolicy(
+        "API ограничил запросы", notify=False, pause=True)),
+    (ServerError, RetryPolicy(
+        "Сбой API", backoff=300, max_backoff=MAX_BACKOFF)),
+    ((MalformedResponseError, KeyError, TypeError, StatusError), RetryPolicy(
+        "Ошибка в ответе API", backoff=600, max_backoff=MAX_BACKOFF)),
+    (EndpointError, RetryPolicy(
+        "Ошибка API", backoff=300, max_backoff=MAX_BACKOFF)),
+)
+DEFAULT_POLICY = RetryPolicy("Ошибка в работе программы")
+
+
+def policy_for(error, policies=POLICIES):
+    """Политика повтора для исключения: первое подходящее правило."""
+    for classes, policy in policies:
+        if isinstance(error, classes):
+            return policy
+    return DEFAULT_POLICY
+
+
+def telegram_error(error, chat_id):
+    """Переводит ошибку Telegram в ChatBlockedError, если чат недоступен.
+
+    Бот заблокирован пользователем или выгнан из группы (403),
+    либо чат удалён (400 chat not found).
+    """
+    if not isinstance(error, ApiTelegramException):
+        return error
+    description = str(error.description).lower()
+    if error.error_code == 403 or (
+            error.error_code == 400 and "chat not found" in description):
+        return ChatBlockedError(
+            f"Чат {chat_id} недоступен: {error.description}", chat_id,
+            error.error_code)
+    return error
+
+
+class RetryTracker:
+    """Счётчики сбоев тенантов и время, до которого их не опрашивают."""
+
+    def __init__(self, policies=POLICIES, clock=time.time):
+        self.policies = policies
+        self.clock = clock
+        self.failures = {}
+        self.blocked_until = {}
+        self.suspended = {}
+
+    def failed(self, tenant_id, error):
+        """Учитывает сбой; возвращает политику и число сбоев подряд."""
+        policy = policy_for(error, self.policies)
+        failures = self.failures.get(tenant_id, 0) + 1
+        self.failures[tenant_id] = failures
+        if policy.retry:
+            delay = min(
+                policy.backoff * 2 ** (failures - 1), policy.max_backoff)
+        else:
+            delay = policy.backoff
+            self.suspended[tenant_id] = policy.title
+            logger.warning(
+                f"Тенант {tenant_id} приостановлен на {delay} с: {error}")
+        if delay:
+            self.blocked_until[tenant_id] = self.clock() + delay
+        return policy, failures
+
+    def succeeded(self, tenant_id):
+        """Сбрасывает серию сбоев после успешного опроса."""
+        self.failures.pop(tenant_id, None)
+        self.blocked_until.pop(tenant_id, None)
+        self.suspended.pop(tenant_id, None)
+
+    resume = succeeded
+
+    def forget(self, tenant_ids):
+        """Удаляет счётчики тенантов, которых больше нет."""
+        for tenant_id in tenant_ids:
+            self.succeeded(tenant_id)
+
+    def ready(self, tenant_id, now=None):
+        """Можно ли опрашивать тенанта сейчас."""
+        until = self.blocked_until.get(tenant_id)
+        if until is None:
+            return True
+        return (self.clock() if now is None else now) >= until
+
+    def report(self):
+        """Сводка: сбои подряд и приостановленные тенанты."""
+        return {"failures": dict(self.failures),
+                "suspended": dict(self.suspended)}
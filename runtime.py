@@ -0,0 +1,53 @@
+from clock import SystemClock
+from deadchats import DeadChatCache
+from ratelimit import RateLimiter
+from retry import RetryTracker
+from digest import DigestBuffer
+from priority import WeightedFairQueue
+from stagger import StaggeredSchedule
+from subscriptions import SubscriptionRegistry
+
+
+class Runtime:
+    """Общие объекты работающего бота, которые нужны циклу опроса."""
+
+    def __init__(self, bot, state, lifecycle, subscriptions=None,
+                 limiter=None, clock=None):
+        self.bot = bot
+        self.state = state
+        self.lifecycle = lifecycle
+        self.clock = clock or SystemClock()
+        self.schedule = StaggeredSchedule(self.clock.time())
+        self.queue = WeightedFairQueue()
+        self.forced = set()
+        self.subscriptions = subscriptions or SubscriptionRegistry(None)
+        self.limiter = limiter or RateLimiter(
+            clock=self.clock.monotonic, sleep=self.clock.sleep)
+        self.retries = RetryTracker(clock=self.clock.time)
+        self.dead_chats = DeadChatCache(clock=self.clock.time)
+        self.http_get = None
+        self.transport = None
+        self.outbox = None
+        self.digests = DigestBuffer(None)
+        self.receiver = None
+        self.coordinator = None
+        self.watchdog = None
+        self.tenants = []
+        self.tenants_by_id = {}
+
+    def set_tenants(self, tenants):
+        """Заменяет список тенантов; возвращает добавленных и удалённых."""
+        by_id = {tenant.id: tenant for tenant in tenants}
+        added = sorted(by_id.keys() - self.tenants_by_id.keys())
+        removed = sorted(self.tenants_by_id.keys() - by_id.keys())
+        self.tenants, self.tenants_by_id = list(tenants), by_id
+        self.schedule.plan(by_id)
+        for registry in (self.queue, self.retries, self.limiter):
+            registry.forget(removed)
+        with self.state.lock:
+            self.state.forget(set(self.state.tenants) - by_id.keys())
+        if self.watchdog is not None:
+            self.watchdog.forget(removed)
+        if self.receiver is not None:
+            self.receiver.tenant_ids = set(by_id)
+        return added, removed
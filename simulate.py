@@ -0,0 +1,222 @@
+"""Моделирование многодневной работы бота в виртуальном времени.
+
+Пример запуска:
+    python simulate.py --tenants 5 --days 14 --throttle 0.05
+"""
+import argparse
+import json
+import logging
+import random
+from collections import Counter
+from datetime import datetime, timezone
+from http import HTTPStatus
+
+import homework
+from clock import VirtualClock
+from health import Watchdog, percentile
+from lifecycle import Lifecycle
+from runtime import Runtime
+from state import PollState
+from tenants import Tenant
+
+SIMULATION_START = 1_700_000_000
+FINAL_STATUSES = ("approved", "rejected")
+
+
+class SimulatedResponse:
+    """Ответ модели API в виде, привычном коду опроса."""
+
+    def __init__(self, status_code, data=None, headers=None):
+        self.status_code = status_code
+        self.data = data
+        self.headers = headers or {}
+        self.text = json.dumps(data) if data is not None else ""
+        self.url = homework.ENDPOINT
+
+    def json(self):
+        """Тело ответа."""
+        return self.data
+
+    def iter_content(self, chunk_size=1):
+        """Тело ответа кусками, как при stream=True."""
+        raw = self.text.encode()
+        for start in range(0, len(raw), chunk_size):
+            yield raw[start:start + chunk_size]
+
+
+class SimulatedAPI:
+    """Модель API Практикума для нескольких тенантов.
+
+    Тенант определяется по токену в заголовке Authorization.
+    Изменения статусов заранее расписаны в виртуальном времени;
+    с вероятностью throttle API отвечает 429 с Retry-After, а каждый
+    запрос занимает latency виртуальных секунд.
+    """
+
+    def __init__(self, clock, rng, throttle=0.0, retry_after=120,
+                 latency=0.0):
+        self.clock = clock
+        self.rng = rng
+        self.throttle = throttle
+        self.retry_after = retry_after
+        self.latency = latency
+        self.events = {}
+        self.calls = Counter()
+        self.throttled = 0
+
+    def schedule(self, token, at, homework_id, status):
+        """Планирует смену статуса работы в момент at."""
+        self.events.setdefault(token, []).append((at, homework_id, status))
+
+    def snapshot(self, token, now):
+        """Последний статус каждой работы тенанта к моменту now."""
+        latest = {}
+        for at, homework_id, status in sorted(self.events.get(token, ())):
+            if at <= now:
+                latest[homework_id] = (at, status)
+        return latest
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        """Отвечает на запрос к API так же, как настоящий сервис."""
+        token = headers["Authorization"].split()[-1]
+        self.calls[token] += 1
+        self.clock.sleep(self.latency)
+        if self.throttle and self.rng.random() < self.throttle:
+            self.throttled += 1
+            return SimulatedResponse(
+                HTTPStatus.TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(self.retry_after)})
+        now = int(self.clock.time())
+        from_date = int(params["from_date"])
+        homeworks = [
+            {
+                "id": homework_id,
+                "homework_name": f"{token}/hw{homework_id}.zip",
+                "status": status,
+                "date_updated": datetime.fromtimestamp(
+                    at, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            }
+            for homework_id, (at, status)
+            in self.snapshot(token, now).items()
+            if at >= from_date
+        ]
+        homeworks.sort(key=lambda item: item["date_updated"], reverse=True)
+        return SimulatedResponse(
+            HTTPStatus.OK, {"homeworks": homeworks, "current_date": now})
+
+
+class RecordingBot:
+    """Бот-заглушка: запоминает сообщения с виртуальным временем."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.messages = []
+
+    def send_message(self, chat_id, text, **kwargs):
+        """Запоминает сообщение вместо отправки в Telegram."""
+        self.messages.append((chat_id, text, self.clock.time()))
+
+
+def schedule_reviews(api, tokens, start, end, reviews_per_day, rng):
+    """Расписывает для каждого тенанта сдачи и проверки работ.
+
+    Возвращает ожидаемые уведомления: (текст, момент изменения).
+    """
+    expected = []
+    for token in tokens:
+        count = int((end - start) / 86400 * reviews_per_day)
+        for homework_id in range(1, count + 1):
+            submitted = rng.uniform(start, end)
+            reviewed = submitted + rng.expovariate(1 / 86400)
+            for at, status in (
+                    (submitted, "reviewing"),
+                    (reviewed, rng.choice(FINAL_STATUSES))):
+                at = int(at)
+                if at >= end:
+                    break
+                api.schedule(token, at, homework_id, status)
+                expected.append((homework.parse_status({
+                    "homework_name": f"{token}/hw{homework_id}.zip",
+                    "status": status,
+                }), at))
+    return expected
+
+
+def simulate(tenants=3, days=7, reviews_per_day=4, throttle=0.0, seed=0,
+             api_latency=0.0):
+    """Прогоняет days виртуальных суток опроса tenants тенантов.
+
+    Возвращает статистику: число обращений к API и ответов 429,
+    уведомлений, дубликатов и пропущенных изменений (статус сменился
+    ещё раз до опроса), задержку уведомлений (p50, p95, max)
+    в секундах, а также число циклов дольше периода и долю отложенных
+    из-за перегрузки опросов.
+    """
+    rng = random.Random(seed)
+    clock = VirtualClock(SIMULATION_START)
+    end = SIMULATION_START + days * 86400
+    api = SimulatedAPI(clock, rng, throttle, latency=api_latency)
+    tenant_list = [
+        Tenant(f"tenant{number}", f"token{number}", 1000 + number)
+        for number in range(tenants)
+    ]
+    expected = schedule_reviews(
+        api, [tenant.practicum_token for tenant in tenant_list],
+        SIMULATION_START, end, reviews_per_day, rng)
+    bot = RecordingBot(clock)
+    state = PollState(None, SIMULATION_START)
+    runtime = Runtime(bot, state, Lifecycle(), clock=clock)
+    runtime.http_get = api.get
+    runtime.watchdog = Watchdog(homework.RETRY_PERIOD, clock.monotonic)
+    runtime.set_tenants(tenant_list)
+    while clock.time() < end:
+        homework.run_iteration(runtime)
+        clock.sleep(homework.next_wakeup(runtime))
+
+    sent = {}
+    for chat_id, text, at in bot.messages:
+        for line in text.split("\n\n"):
+            sent.setdefault(line, []).append(at)
+    latencies = [
+        min(sent[text]) - at for text, at in expected if text in sent
+    ]
+    return {
+        "virtual_days": days,
+        "api_calls": sum(api.calls.values()),
+        "api_throttled": api.throttled,
+        "notifications": sum(len(times) for times in sent.values()),
+        "duplicates": sum(len(times) - 1 for times in sent.values()),
+        "missed": len(expected) - len(latencies),
+        "latency_p50": percentile(latencies, 0.5),
+        "latency_p95": percentile(latencies, 0.95),
+        "latency_max": max(latencies, default=0),
+        "cycle_overruns": runtime.watchdog.overruns,
+        "shed_rate": runtime.watchdog.report()["shed_rate"],
+    }
+
+
+def main():
+    """Запускает моделирование из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tenants", type=int, default=3)
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument(
+        "--reviews", type=float, default=4,
+        help="сдач работ в сутки на тенанта")
+    parser.add_argument(
+        "--throttle", type=float, default=0,
+        help="доля ответов API с кодом 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--latency", type=float, default=0,
+        help="длительность запроса к API в секундах")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+    stats = simulate(
+        args.tenants, args.days, args.reviews, args.throttle, args.seed,
+        args.latency)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
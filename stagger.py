@@ -0,0 +1,71 @@
+import math
+import zlib
+
+# Случайный сдвиг опроса — не больше этой доли промежутка между
+# соседними тенантами, поэтому порядок опросов сохраняется.
+JITTER_FRACTION = 0.1
+
+
+def stable_hash(value):
+    """Хеш строки, одинаковый во всех процессах и запусках."""
+    return zlib.crc32(value.encode())
+
+
+class StaggeredSchedule:
+    """Равномерно разносит опросы тенантов по периоду.
+
+    Тенанты упорядочиваются по хешу id и получают сдвиги 0, P/n, 2P/n...
+    от момента запуска anchor, поэтому первый опрос каждого тенанта
+    приходится на свою долю периода, а не на общую секунду. Дальше
+    опросы идут по сетке с шагом в период, каждый — с детерминированным
+    сдвигом в пределах JITTER_FRACTION промежутка между тенантами.
+    Сдвиги не накапливаются: отметкой опроса служит узел сетки.
+    """
+
+    def __init__(self, anchor, jitter=JITTER_FRACTION):
+        self.anchor = anchor
+        self.jitter = jitter
+        self.fractions = {}
+
+    def plan(self, tenant_ids):
+        """Назначает тенантам доли периода."""
+        ordered = sorted(tenant_ids, key=lambda tenant_id: (
+            stable_hash(tenant_id), tenant_id))
+        self.fractions = {
+            tenant_id: rank / len(ordered)
+            for rank, tenant_id in enumerate(ordered)
+        }
+
+    def jitter_for(self, tenant_id, slot, period):
+        """Сдвиг очередного опроса; у единственного тенанта его нет."""
+        if len(self.fractions) < 2:
+            return 0
+        spread = self.jitter * period / len(self.fractions)
+        unit = stable_hash(f"{tenant_id}:{int(slot)}") / 0xFFFFFFFF
+        return (2 * unit - 1) * spread
+
+    def slot(self, tenant_id, last_poll, period):
+        """Узел сетки для следующего опроса тенанта."""
+        if not last_poll:
+            return self.anchor + self.fractions.get(tenant_id, 0) * period
+        return last_poll + period
+
+    def next_due(self, tenant_id, last_poll, period):
+        """Время следующего опроса тенанта: узел сетки со сдвигом."""
+        slot = self.slot(tenant_id, last_poll, period)
+        return slot + self.jitter_for(tenant_id, slot, period)
+
+    def polled(self, tenant_id, last_poll, period, now):
+        """Отметка для опроса в момент now.
+
+        Если опрос отстал от сетки больше чем на полпериода (перегрузка,
+        простой), пропущенные опросы не навёрстываются: отметкой
+        становится ближайший не прошедший узел собственной сетки тенанта.
+        Так тенанты, отставшие вместе, не начинают опрашиваться в одну
+        секунду.
+        """
+        slot = self.slot(tenant_id, last_poll, period)
+        if now - slot <= period / 2:
+            return slot
+        phase = self.anchor + self.fractions.get(tenant_id, 0) * period
+        return phase + math.ceil((now - phase) / period) * period
@@ -0,0 +1,216 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+# Перекрытие окна from_date: запаздывающие обновления с date_updated
+# чуть меньше отметки всё равно попадут в следующий ответ API.
+LATE_UPDATES_WINDOW = 60
+# Столько работ тенанта помнится; старые проверенные забываются первыми.
+STATE_HOMEWORKS_LIMIT = 500
+
+logger = logging.getLogger(__name__)
+
+
+def parse_date_updated(value):
+    """Переводит date_updated из формата API в unix-время."""
+    if not value:
+        return None
+    try:
+        return int(datetime.strptime(
+            value, "%Y-%m-%dT%H:%M:%S%z").timestamp())
+    except (TypeError, ValueError):
+        logger.warning(f"Не удалось разобрать date_updated: {value}")
+        return None
+
+
+def homework_key(homework):
+    """Возвращает ключ домашней работы для хранения состояния."""
+    return str(homework.get("id", homework.get("homework_name")))
+
+
+class PollState:
+    """Отметки high-water mark по тенантам и домашним работам.
+
+    Для каждого тенанта хранится максимальное увиденное время
+    (date_updated или current_date ответа), а для каждой работы —
+    последние date_updated и статус. Повторно пришедшие и устаревшие
+    записи отбрасываются, поэтому окно from_date можно брать с запасом.
+    Изменения из разных потоков выполняются под блокировкой lock.
+    """
+
+    def __init__(self, path=None, start_timestamp=0):
+        self.path = path
+        self.start_timestamp = start_timestamp
+        self.tenants = {}
+        self.dirty = False
+        self.lock = threading.RLock()
+        if path:
+            self.load()
+
+    def tenant(self, tenant_id):
+        """Возвращает (создаёт при необходимости) состояние тенанта."""
+        if tenant_id not in self.tenants:
+            self.tenants[tenant_id] = {
+                "high_water_mark": self.start_timestamp,
+                "homeworks": {},
+            }
+        return self.tenants[tenant_id]
+
+    def from_date(self, tenant_id):
+        """Минимальное значение from_date для следующего запроса."""
+        mark = self.tenant(tenant_id)["high_water_mark"]
+        return max(mark - LATE_UPDATES_WINDOW, 0)
+
+    def last_poll(self, tenant_id):
+        """Время последнего успешного опроса тенанта."""
+        return self.tenant(tenant_id).get("last_poll", 0)
+
+    def polled(self, tenant_id, timestamp):
+        """Запоминает время успешного опроса тенанта."""
+        self.tenant(tenant_id)["last_poll"] = timestamp
+        self.dirty = True
+
+    def advance(self, tenant_id, timestamp):
+        """Сдвигает отметку тенанта вперёд, но никогда не назад."""
+        if not isinstance(timestamp, int):
+            return
+        tenant = self.tenant(tenant_id)
+        if timestamp > tenant["high_water_mark"]:
+            tenant["high_water_mark"] = timestamp
+            self.dirty = True
+
+    def reconcile(self, tenant_id, homeworks):
+        """Возвращает только новые или изменившиеся домашние работы.
+
+        Сначала сравнивается статус: почти все записи ответа повторяют
+        уже увиденные, и date_updated разбирается только у работ
+        со сменившимся статусом, чтобы отбросить устаревшие.
+        Повторы пишутся в журнал одной строкой на вызов, а не на запись.
+        Состояние не меняется: работа считается увиденной только после
+        вызова mark_seen, то есть после успешной обработки.
+        """
+        known = self.tenant(tenant_id)["homeworks"]
+        changed = []
+        duplicates = 0
+        for homework in homeworks:
+            if not isinstance(homework, dict):
+                changed.append(homework)
+                continue
+            previous = known.get(homework_key(homework))
+            if previous is None:
+                changed.append(homework)
+            elif previous["status"] == homework.get("status"):
+                duplicates += 1
+            elif self.stale(homework, previous["date_updated"]):
+                logger.debug(
+                    f"Устаревшее обновление работы {homework_key(homework)}.")
+            else:
+                changed.append(homework)
+        if duplicates:
+            logger.debug(
+                f"Сообщения не отправлены: дублирование ({duplicates}).")
+        return changed
+
+    @staticmethod
+    def stale(homework, previous_date):
+        """Старше ли обновление уже увиденного."""
+        updated = parse_date_updated(homework.get("date_updated"))
+        return bool(
+            updated is not None and previous_date
+            and updated < previous_date)
+
+    def mark_seen(self, tenant_id, homework):
+        """Запоминает статус работы.
+
+        Отметка тенанта здесь не сдвигается: API отдаёт работы от новых
+        к старым, и отметка по обработанной работе спрятала бы ниже
+        from_date ещё не обработанные. Её сдвигает advance_past после
+        обработки всего ответа.
+        """
+        if not isinstance(homework, dict):
+            return
+        updated = parse_date_updated(homework.get("date_updated"))
+        self.tenant(tenant_id)["homeworks"][homework_key(homework)] = {
+            "status": homework.get("status"),
+            "date_updated": updated,
+        }
+        self.dirty = True
+
+    def advance_past(self, tenant_id, homeworks, current_date):
+        """Сдвигает отметку за полностью обработанный ответ API.
+
+        Отметка встаёт на current_date ответа или на самую свежую
+        из работ homeworks, если ответ без current_date.
+        """
+        self.advance(tenant_id, current_date)
+        for homework in homeworks:
+            if isinstance(homework, dict):
+                self.advance(tenant_id, parse_date_updated(
+                    homework.get("date_updated")))
+
+    def prune(self, tenant_id, limit=STATE_HOMEWORKS_LIMIT):
+        """Забывает самые старые работы тенанта сверх limit.
+
+        Забываются только работы не на проверке, обновлённые раньше
+        from_date: API их больше не вернёт, а повторное появление после
+        новой сдачи придёт с новым статусом.
+        """
+        homeworks = self.tenant(tenant_id)["homeworks"]
+        if len(homeworks) <= limit:
+            return 0
+        horizon = self.from_date(tenant_id)
+        stale = sorted(
+            (homework["date_updated"] or 0, key)
+            for key, homework in homeworks.items()
+            if homework["status"] != "reviewing"
+            and (homework["date_updated"] or 0) < horizon)
+        evicted = stale[:len(homeworks) - limit]
+        for _, key in evicted:
+            del homeworks[key]
+        self.dirty = True
+        return len(evicted)
+
+    def forget(self, tenant_ids):
+        """Забывает состояние тенантов, которых больше нет."""
+        for tenant_id in tenant_ids:
+            if self.tenants.pop(tenant_id, None) is not None:
+                self.dirty = True
+
+    def size(self):
+        """Сколько работ помнится по всем тенантам."""
+        return sum(
+            len(tenant["homeworks"]) for tenant in self.tenants.values())
+
+    def load(self):
+        """Читает состояние из файла, если он существует."""
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                self.tenants = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as error:
+            logger.error(f"Не удалось прочитать состояние: {error}")
+
+    def save(self):
+        """Атомарно записывает изменившееся состояние в файл."""
+        with self.lock:
+            self.dump()
+
+    def dump(self):
+        """Записывает состояние во временный файл и подменяет им старый."""
+        if not self.path or not self.dirty:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(self.tenants, file, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError as error:
+            logger.error(f"Не удалось сохранить состояние: {error}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,145 @@
+import codecs
+import json
+
+import requests
+
+from exeptions import EndpointError, MalformedResponseError
+
+STREAM_CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+
+decoder = json.JSONDecoder()
+
+
+class HomeworkStream:
+    """Потоковый разбор ответа API без загрузки тела целиком.
+
+    Записи массива homeworks выдаются по одной по мере чтения, поэтому
+    в памяти одновременно находятся только текущий кусок ответа и одна
+    запись. Остальные ключи верхнего уровня (например, current_date)
+    доступны через get после того, как записи прочитаны.
+
+    Тело читается уже во время разбора, поэтому обрыв соединения
+    превращается в EndpointError, а повреждённый JSON -
+    в MalformedResponseError, как и при обычном запросе.
+    """
+
+    def __init__(self, chunks, key="homeworks"):
+        self.chunks = iter(chunks)
+        self.key = key
+        self.fields = {}
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+
+    def __iter__(self):
+        return self.homeworks()
+
+    def get(self, name, default=None):
+        """Значение ключа верхнего уровня, уже прочитанного из ответа."""
+        return self.fields.get(name, default)
+
+    def read_more(self):
+        """Дочитывает следующий кусок; False, если данные кончились."""
+        if self.eof:
+            return False
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+        for chunk in self.chunks:
+            if isinstance(chunk, bytes):
+                chunk = self.utf8.decode(chunk)
+            if chunk:
+                self.buffer += chunk
+                return True
+        self.eof = True
+        self.buffer += self.utf8.decode(b"", final=True)
+        return False
+
+    def peek(self):
+        """Следующий значимый символ или пустая строка в конце данных."""
+        while True:
+            while (self.pos < len(self.buffer)
+                   and self.buffer[self.pos] in WHITESPACE):
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read_more():
+                return ""
+
+    def expect(self, chars):
+        """Пропускает один из символов chars и возвращает его."""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(
+                f"Ответ API повреждён: ожидался один из {chars!r}, "
+                f"получено {char!r}.")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Разбирает следующее JSON-значение целиком."""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.read_more():
+                    raise
+                continue
+            # Число на границе куска могло оборваться: дочитываем.
+            if end == len(self.buffer) and self.read_more():
+                continue
+            self.pos = end
+            return value
+
+    def homeworks(self):
+        """Выдаёт записи массива homeworks по одной.
+
+        Ошибки структуры ответа те же, что у check_response.
+        """
+        try:
+            yield from self.records()
+        except requests.RequestException as error:
+            raise EndpointError(f"Ошибка чтения ответа API: {error}")
+        except ValueError as error:
+            raise MalformedResponseError(
+                f"Ответ API не является JSON: {error}")
+
+    def records(self):
+        """Разбирает тело ответа и выдаёт записи homeworks."""
+        char = self.peek()
+        if not char:
+            raise KeyError("Ответ API пуст.")
+        if char != "{":
+            raise TypeError("Ответ API должен быть словарем.")
+        self.pos += 1
+        found = False
+        if self.peek() == "}":
+            self.pos += 1
+        else:
+            while True:
+                name = self.value()
+                self.expect(":")
+                if name == self.key:
+                    found = True
+                    yield from self.items()
+                else:
+                    self.fields[name] = self.value()
+                if self.expect(",}") == "}":
+                    break
+        if not found:
+            raise KeyError("Ключ 'homeworks' отсутствует в ответе API.")
+
+    def items(self):
+        """Выдаёт элементы массива, начинающегося с текущей позиции."""
+        if self.peek() != "[":
+            raise TypeError("Значение ключа 'homeworks' должно быть списком.")
+        self.pos += 1
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
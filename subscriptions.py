@@ -0,0 +1,195 @@
+import json
+import logging
+import os
+from collections import namedtuple
+from datetime import timedelta
+
+from clock import SystemClock
+from digest import URGENT_STATUSES
+
+SUBSCRIPTIONS_FILE = os.getenv("SUBSCRIPTIONS_FILE")
+# Telegram разрешает боту около 30 сообщений в секунду во все чаты.
+TELEGRAM_MESSAGES_PER_SECOND = 25
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+logger = logging.getLogger(__name__)
+
+Subscriber = namedtuple(
+    "Subscriber",
+    ("chat_id", "statuses", "quiet_hours", "digest", "urgent"),
+    defaults=(None, None, None, URGENT_STATUSES),
+)
+
+
+def in_quiet_hours(quiet_hours, hour):
+    """Попадает ли час hour в тихие часы (start, end), в т.ч. через полночь."""
+    if not quiet_hours:
+        return False
+    start, end = quiet_hours
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+def quiet_until(quiet_hours, moment):
+    """Конец тихих часов, идущих в момент moment, или None вне них."""
+    if not in_quiet_hours(quiet_hours, moment.hour):
+        return None
+    end = moment.replace(hour=quiet_hours[1], minute=0, second=0,
+                         microsecond=0)
+    if end <= moment:
+        end += timedelta(days=1)
+    return end
+
+
+def string_set(raw, name):
+    """Множество строк из списка поля name."""
+    if not isinstance(raw, list) or not all(
+            isinstance(item, str) for item in raw):
+        raise TypeError(f"{name} должен быть списком строк.")
+    return frozenset(raw)
+
+
+def parse_subscriber(raw):
+    """Проверяет и разбирает описание одного подписчика."""
+    if not isinstance(raw, dict):
+        raise TypeError("Подписчик должен быть объектом.")
+    if not isinstance(raw.get("chat_id"), (str, int)) or isinstance(
+            raw["chat_id"], bool):
+        raise TypeError("chat_id должен быть строкой или числом.")
+    statuses = quiet_hours = digest = None
+    if raw.get("statuses") is not None:
+        statuses = string_set(raw["statuses"], "statuses") or None
+    if raw.get("quiet_hours") is not None:
+        quiet_hours = raw["quiet_hours"]
+        if not isinstance(quiet_hours, list) or len(quiet_hours) != 2 or any(
+                type(hour) is not int or not 0 <= hour <= 23
+                for hour in quiet_hours):
+            raise ValueError("quiet_hours должен быть парой часов 0–23.")
+        quiet_hours = tuple(quiet_hours)
+    if raw.get("digest_minutes") is not None:
+        minutes = raw["digest_minutes"]
+        if isinstance(minutes, bool) or not isinstance(minutes, (int, float)):
+            raise TypeError("digest_minutes должен быть числом.")
+        if minutes <= 0:
+            raise ValueError("digest_minutes должен быть больше нуля.")
+        digest = float(minutes) * 60
+    urgent = string_set(raw.get("urgent", list(URGENT_STATUSES)), "urgent")
+    return Subscriber(
+        str(raw["chat_id"]), statuses, quiet_hours, digest, urgent)
+
+
+class SubscriptionRegistry:
+    """Подписки чатов на события тенантов.
+
+    Файл SUBSCRIPTIONS_FILE — JSON-объект вида
+    {"<tenant_id>": [{"chat_id": "1", "statuses": ["approved"],
+    "quiet_hours": [23, 8], "digest_minutes": 60, "urgent": ["rejected"]}]}.
+    Тенант без подписок в файле уведомляет только свой собственный чат.
+    Файл проверяется целиком: при ошибке выбрасывается TypeError или
+    ValueError, и прежние подписки остаются в силе.
+    """
+
+    def __init__(self, path=SUBSCRIPTIONS_FILE):
+        self.subscribers = {}
+        if path:
+            self.load(path)
+
+    def load(self, path):
+        """Читает и проверяет подписки из файла."""
+        with open(path, encoding="utf-8") as file:
+            raw_subscriptions = json.load(file)
+        if not isinstance(raw_subscriptions, dict):
+            raise TypeError("Файл подписок должен содержать объект.")
+        subscribers = {}
+        for tenant_id, raw_list in raw_subscriptions.items():
+            if not isinstance(raw_list, list):
+                raise TypeError(
+                    f"Подписки тенанта {tenant_id} должны быть списком.")
+            try:
+                subscribers[tenant_id] = [
+                    parse_subscriber(raw) for raw in raw_list]
+            except (TypeError, ValueError) as error:
+                raise type(error)(f"Подписки тенанта {tenant_id}: {error}")
+        self.subscribers = subscribers
+
+    def chats_for(self, tenant):
+        """Все чаты, которые получают события тенанта."""
+        subscribers = self.subscribers.get(
+            tenant.id, [Subscriber(tenant.chat_id)])
+        return {subscriber.chat_id for subscriber in subscribers}
+
+    def subscribers_for(self, tenant, status):
+        """Возвращает чаты, которые хотят получать событие со статусом.
+
+        Тихие часы здесь не учитываются: событие в тихие часы
+        откладывается до их конца (см. homework.notify), а не теряется.
+        """
+        subscribers = self.subscribers.get(
+            tenant.id, [Subscriber(tenant.chat_id)])
+        return [
+            subscriber for subscriber in subscribers
+            if subscriber.statuses is None or status in subscriber.statuses
+        ]
+
+
+class OutgoingBatch:
+    """Пачка исходящих сообщений одного цикла.
+
+    Сообщения для одного чата склеиваются в одно (в пределах лимита
+    длины Telegram), а отправка выдерживает общий лимит скорости.
+    """
+
+    def __init__(self, rate=TELEGRAM_MESSAGES_PER_SECOND, clock=None):
+        self.rate = rate
+        self.clock = clock or SystemClock()
+        self.messages = {}
+
+    def add(self, chat_id, message, key=None):
+        """Добавляет сообщение для чата с ключом идемпотентности key."""
+        self.messages.setdefault(chat_id, []).append((key, message))
+
+    def __len__(self):
+        return sum(len(messages) for messages in self.messages.values())
+
+    def entries(self):
+        """Сообщения пачки: (key, chat_id, message)."""
+        for chat_id, messages in self.messages.items():
+            for key, message in messages:
+                yield key, chat_id, message
+
+    def chunks(self, messages):
+        """Склеивает сообщения в тексты не длиннее лимита Telegram.
+
+        Возвращает пары (ключи склеенных сообщений, текст).
+        """
+        keys, chunk = [], ""
+        for key, message in messages:
+            too_long = len(chunk) + len(message) + 2 > TELEGRAM_MESSAGE_LIMIT
+            if chunk and too_long:
+                yield keys, chunk
+                keys, chunk = [], ""
+            chunk = f"{chunk}\n\n{message}" if chunk else message
+            keys.append(key)
+        if chunk:
+            yield keys, chunk
+
+    def flush(self, send, done=None):
+        """Отправляет накопленное через send(chat_id, text).
+
+        После каждой отправки вызывается done(keys, ok), где ok —
+        результат send.
+        """
+        interval = 1 / self.rate
+        last_sent = None
+        for chat_id, messages in self.messages.items():
+            for keys, text in self.chunks(messages):
+                if last_sent is not None:
+                    delay = last_sent + interval - self.clock.monotonic()
+                    if delay > 0:
+                        self.clock.sleep(delay)
+                ok = send(chat_id, text)
+                last_sent = self.clock.monotonic()
+                if done is not None:
+                    done(keys, ok)
+        self.messages = {}
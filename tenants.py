@@ -0,0 +1,52 @@
+import json
+import os
+from collections import namedtuple
+
+from priority import parse_deadlines
+
+TENANTS_FILE = os.getenv("TENANTS_FILE")
+DEFAULT_TENANT = "default"
+
+Tenant = namedtuple(
+    "Tenant",
+    ("id", "practicum_token", "chat_id", "push", "deadlines"),
+    defaults=(False, ()),
+)
+
+
+def tenant_headers(tenant):
+    """Заголовки запроса к API Практикума от имени тенанта."""
+    return {"Authorization": f"OAuth {tenant.practicum_token}"}
+
+
+def load_tenants(path, practicum_token, chat_id, push=False, deadlines=()):
+    """Загружает список тенантов.
+
+    Без файла бот работает с одним тенантом из переменных окружения.
+    Файл — JSON-список объектов с полями id, practicum_token, chat_id
+    и необязательными push и deadlines (даты ISO 8601). Файл
+    проверяется целиком: если он не список или хоть одно описание
+    некорректно, выбрасывается ValueError и ни один тенант не
+    загружается, чтобы при перечитывании остался прежний список.
+    """
+    if not path:
+        return [Tenant(
+            DEFAULT_TENANT, practicum_token, chat_id, push, deadlines)]
+    with open(path, encoding="utf-8") as file:
+        raw_tenants = json.load(file)
+    if not isinstance(raw_tenants, list):
+        raise ValueError("Файл тенантов должен содержать список.")
+    tenants = []
+    for number, raw in enumerate(raw_tenants):
+        try:
+            tenant = Tenant(
+                str(raw["id"]), raw["practicum_token"],
+                str(raw["chat_id"]), bool(raw.get("push", False)),
+                parse_deadlines(raw.get("deadlines")))
+        except (KeyError, TypeError, ValueError) as error:
+            raise ValueError(
+                f"Некорректное описание тенанта №{number + 1}: {error}")
+        if any(other.id == tenant.id for other in tenants):
+            raise ValueError(f"Тенант {tenant.id} описан дважды.")
+        tenants.append(tenant)
+    return tenants
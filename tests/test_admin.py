@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+import homework
+from admin import AdminServer, call
+from clock import VirtualClock
+from exeptions import WakeRequested
+from health import Watchdog
+from lifecycle import Lifecycle
+from runtime import Runtime
+from state import PollState
+from tenants import Tenant
+
+
+@pytest.fixture
+def admin(tmp_path):
+    clock = VirtualClock(1_700_000_000)
+    runtime = Runtime(None, PollState(None, 0), Lifecycle(), clock=clock)
+    runtime.watchdog = Watchdog(homework.RETRY_PERIOD, clock.monotonic)
+    runtime.set_tenants([Tenant('a', 't', '1'), Tenant('b', 't', '2')])
+    path = str(tmp_path / 'admin.sock')
+    server = AdminServer(homework.admin_commands(runtime), path)
+    server.start()
+    yield runtime, path
+    server.stop()
+
+
+class TestAdmin:
+    def test_lists_tenants(self, admin):
+        runtime, path = admin
+        tenants = call(path, 'tenants')
+        assert [tenant['id'] for tenant in tenants] == ['a', 'b']
+        assert tenants[0]['state'] == 'idle'
+        assert tenants[0]['last_poll'] is None
+
+    def test_force_poll(self, admin):
+        runtime, path = admin
+        for tenant in runtime.tenants:
+            runtime.state.polled(tenant.id, runtime.clock.time())
+        assert homework.due_tenants(runtime, runtime.tenants) == []
+        assert call(path, 'poll', 'b') == {'queued': 'b'}
+        assert [tenant.id for tenant in homework.due_tenants(
+            runtime, runtime.tenants)] == ['b'], (
+            'Тенант должен опрашиваться вне расписания по команде.'
+        )
+        with pytest.raises(RuntimeError):
+            call(path, 'poll', 'unknown')
+
+    def test_caches_and_unknown_command(self, admin):
+        runtime, path = admin
+        report = call(path, 'caches')
+        assert {'rss_mb', 'caches', 'queues', 'limiter'} <= set(report)
+        with pytest.raises(RuntimeError, match='Некорректная команда'):
+            call(path, 'reboot')
+
+
+class TestWake:
+    def test_wake_interrupts_sleep(self):
+        lifecycle = Lifecycle()
+        lifecycle.install()
+        try:
+            threading.Timer(0.1, lifecycle.wake).start()
+            started = time.monotonic()
+            with lifecycle.interruptible():
+                time.sleep(1.5)
+            assert time.monotonic() - started < 1, (
+                'Команда poll должна будить спящий цикл.'
+            )
+        finally:
+            lifecycle.shutdown()
+
+    def test_wake_outside_sleep_is_ignored(self):
+        lifecycle = Lifecycle()
+        with lifecycle.interruptible():
+            raise WakeRequested()
+        assert not lifecycle.sleeping
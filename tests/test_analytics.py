@@ -0,0 +1,65 @@
+import json
+import random
+from urllib.request import urlopen
+
+from analytics import (SKETCH_ACCURACY, new_turnaround, observe, quantile,
+                       record_transition, turnaround_report)
+from health import HealthServer, Watchdog
+from state import PollState
+
+
+def homework(status, date_updated):
+    return {'id': 1, 'homework_name': 'hw.zip', 'status': status,
+            'date_updated': date_updated}
+
+
+class TestSketch:
+    def test_quantiles_within_accuracy_and_bounded_memory(self):
+        rng = random.Random(1)
+        values = [rng.expovariate(1 / 86400) + 60 for _ in range(20000)]
+        stats = new_turnaround()
+        for value in values:
+            observe(stats, value, 'approved')
+        ordered = sorted(values)
+        for fraction in (0.5, 0.9, 0.99):
+            exact = ordered[int(fraction * (len(ordered) - 1))]
+            assert abs(quantile(stats, fraction) - exact) <= (
+                exact * SKETCH_ACCURACY * 1.01
+            ), f'Квантиль {fraction} вне заявленной точности.'
+        assert len(stats['buckets']) < 200, (
+            'Размер скетча не должен расти с числом проверок.'
+        )
+
+
+class TestTransitions:
+    def test_review_time_is_recorded_once(self):
+        state = PollState()
+        review = homework('reviewing', '2024-01-01T10:00:00Z')
+        approved = homework('approved', '2024-01-01T16:00:00Z')
+        record_transition(state.tenant('a'), review)
+        state.mark_seen('a', review)
+        record_transition(state.tenant('a'), approved)
+        state.mark_seen('a', approved)
+        record_transition(state.tenant('a'), approved)
+        report = turnaround_report(state)
+        assert report['a']['reviews'] == 1, (
+            'Повторно пришедший статус не должен учитываться.'
+        )
+        assert report['a']['max_hours'] == 6
+        assert report['a']['verdicts'] == {'approved': 1}
+
+    def test_stats_endpoint(self):
+        state = PollState()
+        observe(state.tenant('a').setdefault(
+            'turnaround', new_turnaround()), 7200, 'rejected')
+        server = HealthServer(
+            Watchdog(period=600), port=0,
+            stats=lambda: turnaround_report(state))
+        server.start()
+        host, port = server.address
+        try:
+            with urlopen(f'http://{host}:{port}/stats', timeout=1) as resp:
+                report = json.loads(resp.read())
+        finally:
+            server.stop()
+        assert report['a']['reviews'] == 1
@@ -0,0 +1,89 @@
+import json
+import os
+
+import pytest
+
+from config import ConfigWatcher, load_settings
+from subscriptions import SubscriptionRegistry
+from tenants import load_tenants
+
+
+class TestConfigWatcher:
+    def write(self, path, data, mtime):
+        path.write_text(json.dumps(data))
+        os.utime(path, ns=(mtime, mtime))
+
+    def test_changes_are_applied_once(self, tmp_path):
+        path = tmp_path / 'settings.json'
+        self.write(path, {'retry_period': 300}, 1_000_000_000)
+        applied = []
+        watcher = ConfigWatcher(lambda name, value: applied.append(value))
+        watcher.watch('settings', str(path), load_settings)
+        assert watcher.poll() == ['settings']
+        assert watcher.poll() == [], (
+            'Неизменившийся файл не должен применяться повторно.'
+        )
+        self.write(path, {'retry_period': 120}, 2_000_000_000)
+        watcher.poll()
+        assert applied == [{'retry_period': 300}, {'retry_period': 120}]
+
+    def test_invalid_config_keeps_previous(self, tmp_path):
+        path = tmp_path / 'settings.json'
+        self.write(path, {'retry_period': -1}, 1_000_000_000)
+        applied = []
+        watcher = ConfigWatcher(lambda name, value: applied.append(value))
+        watcher.watch('settings', str(path), load_settings)
+        assert watcher.poll() == []
+        assert applied == []
+
+    @pytest.mark.parametrize('broken', [
+        {'alice': {'practicum_token': 't', 'chat_id': 1}},
+        [{'id': 'alice', 'practicum_token': 't', 'chat_id': 1},
+         {'id': 'bob', 'chat_id': 2}],
+        [{'id': 'alice', 'practicum_token': 't', 'chat_id': 1},
+         {'id': 'alice', 'practicum_token': 't', 'chat_id': 2}],
+    ])
+    def test_invalid_tenants_keep_previous(self, tmp_path, broken):
+        path = tmp_path / 'tenants.json'
+        self.write(path, [{'id': 'alice', 'practicum_token': 't',
+                           'chat_id': 1}], 1_000_000_000)
+        applied = []
+        watcher = ConfigWatcher(lambda name, value: applied.append(value))
+        watcher.watch('tenants', str(path),
+                      lambda name: load_tenants(name, None, None))
+        assert watcher.poll() == ['tenants']
+        self.write(path, broken, 2_000_000_000)
+        assert watcher.poll() == [], (
+            'Некорректный файл тенантов не должен применяться частично.'
+        )
+        assert [tenant.id for tenant in applied[-1]] == ['alice']
+
+    @pytest.mark.parametrize('broken', [
+        [{'chat_id': '100'}],
+        {'alice': {'chat_id': '100'}},
+        {'alice': [{'chat_id': '100', 'quiet_hours': [23]}]},
+        {'alice': [{'chat_id': '100', 'quiet_hours': [23, 24]}]},
+        {'alice': [{'chat_id': '100', 'statuses': 'approved'}]},
+        {'alice': [{'chat_id': '100', 'urgent': [1]}]},
+        {'alice': [{'chat_id': '100', 'digest_minutes': 0}]},
+        {'alice': [{'statuses': ['approved']}]},
+    ])
+    def test_invalid_subscriptions_keep_previous(self, tmp_path, broken):
+        path = tmp_path / 'subscriptions.json'
+        self.write(path, {'alice': [
+            {'chat_id': '100', 'quiet_hours': [23, 8]}]}, 1_000_000_000)
+        applied = []
+        watcher = ConfigWatcher(lambda name, value: applied.append(value))
+        watcher.watch('subscriptions', str(path), SubscriptionRegistry)
+        assert watcher.poll() == ['subscriptions']
+        self.write(path, broken, 2_000_000_000)
+        assert watcher.poll() == [], (
+            'Некорректный файл подписок не должен применяться.'
+        )
+        assert applied[-1].subscribers['alice'][0].quiet_hours == (23, 8)
+
+    def test_load_settings_validates_verdicts(self, tmp_path):
+        path = tmp_path / 'settings.json'
+        path.write_text(json.dumps({'verdicts': {'approved': 1}}))
+        with pytest.raises(TypeError):
+            load_settings(str(path))
@@ -0,0 +1,99 @@
+from functools import partial
+
+import pytest
+from telebot.apihelper import ApiTelegramException
+
+import homework
+from clock import VirtualClock
+from deadchats import DeadChatCache
+from lifecycle import Lifecycle
+from outbox import Outbox
+from runtime import Runtime
+from state import PollState
+from tenants import Tenant
+
+
+def blocked():
+    return ApiTelegramException('sendMessage', None, {
+        'error_code': 403,
+        'description': 'Forbidden: bot was blocked by the user'})
+
+
+class BlockingBot:
+    def __init__(self):
+        self.blocked = True
+        self.sends = 0
+        self.probes = 0
+
+    def send_message(self, chat_id, text, **kwargs):
+        self.sends += 1
+        if self.blocked:
+            raise blocked()
+
+    def send_chat_action(self, chat_id, action, **kwargs):
+        self.probes += 1
+        if self.blocked:
+            raise blocked()
+
+
+@pytest.fixture
+def clock():
+    return VirtualClock(1_700_000_000)
+
+
+class TestDeadChatCache:
+    def test_reprobe_interval_doubles(self):
+        clock = VirtualClock(0)
+        cache = DeadChatCache(clock.time)
+        cache.failed(1, 403)
+        clock.sleep(3600)
+        assert cache.due_probes() == ['1']
+        cache.failed(1, 403)
+        clock.sleep(3600)
+        assert cache.due_probes() == [], (
+            'Повторная неудача должна удваивать интервал проверки.'
+        )
+        assert cache.report() == {'1': {'error_code': 403, 'failures': 2}}
+
+
+class TestSuppression:
+    def test_blocked_chat_pauses_sends_and_polls(self, clock):
+        bot = BlockingBot()
+        runtime = Runtime(
+            bot, PollState(None, int(clock.time())), Lifecycle(), clock=clock)
+        tenant = Tenant('a', 'token', 7)
+        runtime.set_tenants([tenant])
+
+        assert homework.send_to(runtime, 7, 'first') is None
+        assert homework.send_to(runtime, 7, 'second') is None
+        assert bot.sends == 1, 'В заблокированный чат не нужно слать снова.'
+        assert homework.due_tenants(runtime, [tenant]) == [], (
+            'Тенанта без доступных чатов не нужно опрашивать.'
+        )
+
+        bot.blocked = False
+        clock.sleep(3600)
+        homework.probe_dead_chats(runtime)
+        assert bot.probes == 1
+        assert homework.due_tenants(runtime, [tenant]) == [tenant]
+        assert homework.send_to(runtime, 7, 'third') is True
+
+    def test_outbox_keeps_messages_for_dead_chat(self, clock, tmp_path):
+        bot = BlockingBot()
+        runtime = Runtime(
+            bot, PollState(None, int(clock.time())), Lifecycle(), clock=clock)
+        runtime.outbox = Outbox(str(tmp_path / 'outbox.jsonl'))
+        runtime.outbox.append([('k1', 7, 'first')])
+        send = partial(homework.send_to, runtime)
+        for _ in range(10):
+            runtime.outbox.deliver(send, clock)
+        assert 'k1' in runtime.outbox.pending, (
+            'Сообщения в недоступный чат должны ждать, а не теряться.'
+        )
+        assert bot.sends == 1
+        bot.blocked = False
+        clock.sleep(3600)
+        homework.probe_dead_chats(runtime)
+        runtime.outbox.deliver(send, clock)
+        assert not runtime.outbox.pending
+        assert bot.sends == 2
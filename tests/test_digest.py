@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+import homework
+from clock import VirtualClock
+from digest import DigestBuffer, create_digests
+from lifecycle import Lifecycle
+from outbox import Outbox
+from runtime import Runtime
+from simulate import RecordingBot
+from state import PollState
+from subscriptions import SubscriptionRegistry
+from tenants import Tenant
+
+NOW = 1_700_000_000
+
+
+class TestDigestBuffer:
+    def test_events_wait_for_window(self):
+        digests = DigestBuffer(None)
+        digests.add('100', 'a', 'first', 3600, NOW)
+        digests.add('100', 'b', 'second', 3600, NOW + 600)
+        assert digests.next_due() == NOW + 3600, (
+            'Срок сводки назначает первое событие.'
+        )
+        assert digests.pop_due(NOW + 3599) == {}
+        assert digests.pop_due(NOW + 3600) == {
+            '100': [('a', 'first'), ('b', 'second')]}
+        assert len(digests) == 0
+
+    def test_spilled_events_survive_restart(self, tmp_path):
+        path = str(tmp_path / 'digest.jsonl')
+        digests = DigestBuffer(path, memory_limit=1)
+        digests.add('100', 'a', 'first', 3600, NOW)
+        digests.add('200', 'b', 'other', 7200, NOW)
+        assert digests.entries == {}, (
+            'События сверх лимита памяти должны уходить в файл.'
+        )
+        digests.add('100', 'c', 'third', 3600, NOW)
+        digests.close()
+        restored = DigestBuffer(path)
+        assert len(restored) == 3
+        assert restored.pop_due(NOW + 3600) == {
+            '100': [('a', 'first'), ('c', 'third')]}
+        assert DigestBuffer(path).pop_due(NOW + 7200) == {
+            '200': [('b', 'other')]}
+
+    def test_failed_handoff_keeps_spilled_events(self, tmp_path):
+        path = str(tmp_path / 'digest.jsonl')
+        digests = DigestBuffer(path, memory_limit=0)
+        digests.add('100', 'a', 'first', 60, NOW)
+        digests.add('200', 'b', 'other', 7200, NOW)
+
+        def crash(due):
+            raise OSError('журнал недоступен')
+
+        with pytest.raises(OSError):
+            digests.pop_due(NOW + 60, crash)
+        assert DigestBuffer(path).pop_due(NOW + 60) == {
+            '100': [('a', 'first')]}, (
+            'События удаляются из файла только после передачи сводки.'
+        )
+
+
+class TestDigestDelivery:
+    def test_digest_collects_events_but_not_urgent(self, tmp_path):
+        path = tmp_path / 'subscriptions.json'
+        path.write_text(json.dumps({'alice': [
+            {'chat_id': '100', 'digest_minutes': 60},
+        ]}))
+        clock = VirtualClock(NOW)
+        bot = RecordingBot(clock)
+        runtime = Runtime(
+            bot, PollState(None, NOW), Lifecycle(),
+            SubscriptionRegistry(str(path)), clock=clock)
+        tenant = Tenant('alice', 'token', '100')
+        homework.handle_homeworks(runtime, tenant, [
+            {'id': 1, 'homework_name': 'hw1', 'status': 'reviewing'},
+            {'id': 2, 'homework_name': 'hw2', 'status': 'approved'},
+            {'id': 3, 'homework_name': 'hw3', 'status': 'rejected'},
+        ], {'current_date': NOW})
+        assert [text for _, text, _ in bot.messages] == [
+            homework.parse_status({'homework_name': 'hw3',
+                                   'status': 'rejected'}),
+        ], 'Срочные статусы должны приходить сразу.'
+        clock.sleep(3600)
+        homework.send_digests(runtime)
+        assert len(bot.messages) == 2, 'Сводка должна быть одним сообщением.'
+        digest = bot.messages[1][1]
+        assert digest.startswith(f'{homework.DIGEST_HEADER}: 2')
+        assert 'hw1' in digest and 'hw2' in digest
+
+    def test_digest_events_survive_crash_with_outbox(self, tmp_path):
+        outbox = Outbox(str(tmp_path / 'outbox.jsonl'))
+        path = tmp_path / 'subscriptions.json'
+        path.write_text(json.dumps({'alice': [
+            {'chat_id': '100', 'digest_minutes': 60},
+        ]}))
+        clock = VirtualClock(NOW)
+        runtime = Runtime(
+            RecordingBot(clock), PollState(None, NOW), Lifecycle(),
+            SubscriptionRegistry(str(path)), clock=clock)
+        runtime.outbox = outbox
+        runtime.digests = create_digests(outbox)
+        homework.handle_homeworks(runtime, Tenant('alice', 'token', '100'), [
+            {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+        ], {'current_date': NOW})
+        restored = create_digests(outbox)
+        assert len(restored) == 1, (
+            'С журналом исходящих события сводок должны быть на диске '
+            'до того, как работа отмечена увиденной.'
+        )
@@ -0,0 +1,82 @@
+import json
+from http import HTTPStatus
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from health import HealthServer, Watchdog
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestWatchdog:
+    def test_stalled_worker_is_restarted(self):
+        clock = FakeClock()
+        watchdog = Watchdog(period=600, clock=clock)
+        restarted = []
+        watchdog.register(
+            'main', 1800, lambda: restarted.append(True) or True)
+        clock.now = 1000
+        watchdog.check()
+        assert not restarted
+        clock.now = 2000
+        assert watchdog.stalled() == ['main']
+        watchdog.check()
+        assert restarted, 'Зависший поток должен перезапускаться.'
+        assert watchdog.stalled() == []
+
+    def test_cycle_lag_is_recorded(self):
+        clock = FakeClock()
+        watchdog = Watchdog(period=600, clock=clock)
+        watchdog.cycle_started()
+        clock.now = 700
+        watchdog.cycle_finished()
+        clock.now = 1300
+        watchdog.cycle_started()
+        report = watchdog.report()
+        assert report['cycle_lag_max'] == 700
+        assert report['load'] > 1, (
+            'Цикл дольше периода должен давать нагрузку больше 1.'
+        )
+
+    def test_sleep_only_remainder_of_period(self):
+        clock = FakeClock()
+        watchdog = Watchdog(period=600, clock=clock)
+        assert watchdog.remaining() == 600
+        watchdog.cycle_started()
+        clock.now = 100.5
+        watchdog.cycle_finished()
+        assert watchdog.remaining() == 500, (
+            'Ждать нужно только остаток периода.'
+        )
+        assert not watchdog.overloaded()
+        clock.now = 700
+        watchdog.cycle_started()
+        clock.now = 1400
+        watchdog.cycle_finished()
+        assert watchdog.remaining() == 0
+        assert watchdog.overruns == 1
+
+    def test_health_endpoints(self):
+        watchdog = Watchdog(period=600)
+        server = HealthServer(watchdog, port=0)
+        server.start()
+        host, port = server.address
+        try:
+            try:
+                urlopen(f'http://{host}:{port}/readyz', timeout=1)
+            except HTTPError as error:
+                assert error.code == HTTPStatus.SERVICE_UNAVAILABLE
+            else:
+                raise AssertionError('До первого цикла бот не готов.')
+            watchdog.cycle_started()
+            watchdog.cycle_finished()
+            with urlopen(f'http://{host}:{port}/healthz', timeout=1) as resp:
+                assert json.load(resp)['cycles'] == 1
+        finally:
+            server.stop()
@@ -0,0 +1,82 @@
+import homework
+from clock import VirtualClock
+from leases import LeaseCoordinator, SQLiteLeaseStore
+from lifecycle import Lifecycle
+from runtime import Runtime
+from simulate import RecordingBot
+from state import PollState
+from tenants import Tenant
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLeaseCoordinator:
+    def make_pair(self, tmp_path):
+        path = str(tmp_path / 'leases.db')
+        clock = FakeClock()
+        first = LeaseCoordinator(
+            SQLiteLeaseStore(path), 'first', partitions=4, ttl=100,
+            clock=clock
+        )
+        second = LeaseCoordinator(
+            SQLiteLeaseStore(path), 'second', partitions=4, ttl=100,
+            clock=clock
+        )
+        return first, second, clock
+
+    def test_partitions_are_shared_without_overlap(self, tmp_path):
+        first, second, _ = self.make_pair(tmp_path)
+        first.heartbeat()
+        assert first.owned == {0, 1, 2, 3}
+        second.heartbeat()
+        first.heartbeat()
+        second.heartbeat()
+        assert len(first.owned) == len(second.owned) == 2
+        assert not first.owned & second.owned, (
+            'Один раздел не должен принадлежать двум экземплярам.'
+        )
+
+    def test_takeover_after_expiry_and_fencing(self, tmp_path):
+        first, second, clock = self.make_pair(tmp_path)
+        first.heartbeat()
+        tenant_id = 'alice'
+        assert first.confirm(tenant_id)
+        clock.now += 101
+        second.heartbeat()
+        assert second.owns(tenant_id)
+        assert not first.confirm(tenant_id), (
+            'Экземпляр с просроченной арендой не должен отправлять '
+            'уведомления.'
+        )
+
+    def test_tenant_state_is_handed_over(self, tmp_path):
+        first, second, _ = self.make_pair(tmp_path)
+        first.store.save_tenant_state('alice', {'high_water_mark': 5})
+        assert second.store.load_tenant_state('alice') == {
+            'high_water_mark': 5
+        }
+
+    def test_non_owner_does_not_overwrite_state(self, tmp_path):
+        first, second, _ = self.make_pair(tmp_path)
+        first.heartbeat()
+        first.store.save_tenant_state('alice', {'high_water_mark': 5})
+        clock = VirtualClock(1000)
+        runtime = Runtime(RecordingBot(clock), PollState(None, 1),
+                          Lifecycle(), clock=clock)
+        runtime.coordinator = second
+        tenant = Tenant('alice', 'token', 7)
+        runtime.set_tenants([tenant])
+
+        homework.handle_homeworks(
+            runtime, tenant, [], {'current_date': 900})
+        homework.handle_push(
+            runtime, 'alice', {'homeworks': [], 'current_date': 900})
+        assert second.store.load_tenant_state('alice') == {
+            'high_water_mark': 5
+        }, 'Экземпляр без аренды не должен сохранять состояние тенанта.'
@@ -0,0 +1,86 @@
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+import homework
+from clock import VirtualClock
+from exeptions import ShutdownRequested
+from lifecycle import Lifecycle
+from runtime import Runtime
+from simulate import RecordingBot
+from state import PollState
+from tenants import Tenant
+
+NOW = 1_700_000_000
+
+
+class TestLifecycle:
+    def test_signal_interrupts_sleep_and_flushes(self):
+        lifecycle = Lifecycle()
+        flushed = []
+        lifecycle.on_shutdown(lambda: flushed.append(True))
+        lifecycle.install()
+        threading.Timer(
+            0.1, os.kill, (os.getpid(), signal.SIGTERM)
+        ).start()
+        started = time.monotonic()
+        with pytest.raises(ShutdownRequested):
+            with lifecycle.interruptible():
+                time.sleep(5)
+        lifecycle.shutdown()
+        assert time.monotonic() - started < 1, (
+            'Сигнал остановки должен прерывать ожидание сразу.'
+        )
+        assert flushed, 'При остановке должно сбрасываться состояние.'
+        assert signal.getsignal(signal.SIGTERM) is not lifecycle.handle_signal
+
+    def test_signal_outside_sleep_only_sets_flag(self):
+        lifecycle = Lifecycle(drain_timeout=0)
+        lifecycle.handle_signal(signal.SIGTERM, None)
+        assert lifecycle.stopping
+        assert lifecycle.drain_expired()
+        with pytest.raises(ShutdownRequested):
+            with lifecycle.interruptible():
+                pass
+
+
+class TestPartialResponse:
+    NEWER = {'id': 2, 'homework_name': 'hw2', 'status': 'approved',
+             'date_updated': '2023-11-14T20:00:00Z'}
+    OLDER = {'id': 1, 'homework_name': 'hw1', 'status': 'approved',
+             'date_updated': '2023-11-14T10:00:00Z'}
+
+    def make_runtime(self):
+        clock = VirtualClock(NOW)
+        return Runtime(RecordingBot(clock), PollState(None, 100),
+                       Lifecycle(), clock=clock)
+
+    def test_drain_keeps_unsent_homeworks_above_mark(self, monkeypatch):
+        runtime = self.make_runtime()
+        expired = iter([False, True])
+        monkeypatch.setattr(
+            runtime.lifecycle, 'drain_expired', lambda: next(expired))
+        tenant = Tenant('alice', 'token', '100')
+        homework.handle_homeworks(
+            runtime, tenant, [self.NEWER, self.OLDER], {'current_date': NOW})
+        assert runtime.state.tenant('alice')['high_water_mark'] == 100, (
+            'Необработанная работа должна прийти в следующем ответе API.'
+        )
+        assert runtime.state.reconcile('alice', [self.OLDER]) == [self.OLDER]
+
+    def test_failed_homework_keeps_mark(self):
+        runtime = self.make_runtime()
+        broken = dict(self.OLDER, status='unknown')
+        tenant = Tenant('alice', 'token', '100')
+        with pytest.raises(KeyError):
+            homework.handle_homeworks(
+                runtime, tenant, [self.NEWER, broken], {'current_date': NOW})
+        assert runtime.state.tenant('alice')['high_water_mark'] == 100, (
+            'Отметка сдвигается только после обработки всего ответа.'
+        )
+        homework.handle_homeworks(
+            runtime, tenant, [self.NEWER], {'current_date': NOW})
+        assert runtime.state.tenant('alice')['high_water_mark'] == NOW
@@ -0,0 +1,95 @@
+import logging
+import os
+
+from clock import VirtualClock
+from deadchats import DeadChatCache
+from digest import DigestBuffer
+from lifecycle import Lifecycle
+from memory import LEAK_CHECKS, MemoryMonitor
+from runtime import Runtime
+from state import PollState
+from tenants import Tenant
+
+
+class TestMemoryMonitor:
+    def test_steady_growth_is_reported_as_leak(self, caplog):
+        samples = iter(range(100, 1000, 10))
+        monitor = MemoryMonitor(period=60, rss=lambda: next(samples) << 20)
+        with caplog.at_level(logging.ERROR, logger='memory'):
+            for _ in range(LEAK_CHECKS):
+                monitor.check()
+            assert not monitor.leak_suspected
+            monitor.check()
+        assert monitor.leak_suspected, 'Рост RSS подряд — признак утечки.'
+        assert 'утечку' in caplog.text
+
+    def test_flat_memory_is_not_a_leak(self):
+        monitor = MemoryMonitor(rss=lambda: 100 << 20)
+        for _ in range(LEAK_CHECKS * 2):
+            monitor.check()
+        assert not monitor.leak_suspected
+
+    def test_cache_over_budget_is_logged(self, caplog):
+        clock = VirtualClock(0)
+        monitor = MemoryMonitor(period=60, clock=clock.monotonic,
+                                rss=lambda: 1 << 20)
+        cache = list(range(11))
+        monitor.track('cache', cache.__len__, 10)
+        with caplog.at_level(logging.ERROR, logger='memory'):
+            monitor.maybe_check()
+            assert not caplog.text, 'Проверка раньше периода не нужна.'
+            clock.sleep(60)
+            monitor.maybe_check()
+        assert 'сверх бюджета' in caplog.text
+        assert monitor.report()['caches'] == {
+            'cache': {'size': 11, 'limit': 10}}
+
+
+class TestBudgets:
+    def test_state_forgets_old_reviewed_homeworks(self):
+        state = PollState(None, 0)
+        state.advance('a', 10_000)
+        for number in range(10):
+            state.mark_seen('a', {
+                'id': number, 'status': 'approved',
+                'date_updated': f'1970-01-01T00:00:{number:02d}Z'})
+        state.mark_seen('a', {
+            'id': 'old', 'status': 'reviewing',
+            'date_updated': '1970-01-01T00:00:00Z'})
+        assert state.prune('a', limit=5) == 6
+        assert set(state.tenant('a')['homeworks']) == {
+            '6', '7', '8', '9', 'old'}, (
+            'Забываться должны самые старые проверенные работы.'
+        )
+
+    def test_dead_chats_are_capped(self):
+        chats = DeadChatCache(clock=lambda: 0, limit=2)
+        for chat_id in (1, 2, 3):
+            chats.failed(chat_id, 403)
+        assert set(chats.chats) == {'2', '3'}
+
+    def test_removed_tenants_are_forgotten(self):
+        runtime = Runtime(None, PollState(None, 0), Lifecycle(),
+                          clock=VirtualClock(0))
+        runtime.set_tenants([Tenant('a', 't', '1'), Tenant('b', 't', '2')])
+        runtime.retries.failed('b', ValueError('сбой'))
+        runtime.limiter.acquire('b')
+        runtime.state.tenant('b')
+        runtime.set_tenants([Tenant('a', 't', '1')])
+        assert 'b' not in runtime.state.tenants, (
+            'Состояние удалённого тенанта должно забываться.'
+        )
+        assert 'b' not in runtime.retries.failures
+        assert 'b' not in runtime.limiter.requests
+
+    def test_digests_without_file_are_capped(self):
+        digests = DigestBuffer(None, memory_limit=2)
+        for number in range(5):
+            digests.add('100', str(number), 'text', 60, 0)
+        assert digests.in_memory() <= 2, (
+            'Без DIGEST_FILE события сверх лимита должны уходить на диск.'
+        )
+        assert len(digests.pop_due(60)['100']) == 5
+        path = digests.path
+        digests.close()
+        assert not os.path.exists(path)
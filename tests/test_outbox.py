@@ -0,0 +1,116 @@
+import os
+
+import pytest
+
+import homework
+import outbox as outbox_module
+from clock import VirtualClock
+from lifecycle import Lifecycle
+from outbox import Outbox
+from runtime import Runtime
+from state import PollState
+from tenants import Tenant
+
+
+class Crash(Exception):
+    pass
+
+
+class Bot:
+    def __init__(self, crash=False):
+        self.crash = crash
+        self.sent = []
+
+    def send_message(self, chat_id, text, **kwargs):
+        if self.crash:
+            raise Crash('процесс упал')
+        self.sent.append((chat_id, text))
+
+
+class TestOutbox:
+    def test_append_is_group_committed_and_idempotent(
+            self, tmp_path, monkeypatch):
+        synced = []
+        real_fsync = os.fsync
+        monkeypatch.setattr(
+            outbox_module.os, 'fsync',
+            lambda fd: synced.append(fd) or real_fsync(fd))
+        box = Outbox(str(tmp_path / 'outbox.jsonl'))
+        synced.clear()
+        assert box.append([('k1', 1, 'a'), ('k2', 2, 'b')]) == 2
+        assert len(synced) == 1, 'Пачка должна сбрасываться одним fsync.'
+        assert box.append([('k1', 1, 'a')]) == 0
+
+    def test_pending_survive_restart_and_done_are_not_resent(self, tmp_path):
+        path = str(tmp_path / 'outbox.jsonl')
+        Outbox(path).append([('k1', 1, 'a'), ('k2', 1, 'b')])
+        sent = []
+        box = Outbox(path)
+        box.deliver(
+            lambda chat_id, text: sent.append((chat_id, text)) or True)
+        assert sent == [(1, 'a\n\nb')]
+        box.close()
+        box = Outbox(path)
+        assert not box.pending
+        assert box.append([('k1', 1, 'a')]) == 0, (
+            'Доставленное событие не должно ставиться в очередь повторно.'
+        )
+
+    def test_failed_send_is_retried_then_dropped(self, tmp_path):
+        clock = VirtualClock()
+        box = Outbox(str(tmp_path / 'outbox.jsonl'), max_attempts=2)
+        box.append([('k1', 1, 'a')])
+        calls = []
+
+        def fail(chat_id, text):
+            calls.append(text)
+            return False
+
+        box.deliver(fail, clock)
+        assert 'k1' in box.pending
+        for _ in range(6):
+            box.deliver(fail, clock)
+        assert calls == ['a'], (
+            'Повтор после неудачи должен ждать паузы, а не каждого вызова.'
+        )
+        clock.sleep(60)
+        box.deliver(fail, clock)
+        assert not box.pending
+
+    def test_torn_tail_and_compaction(self, tmp_path, monkeypatch):
+        path = str(tmp_path / 'outbox.jsonl')
+        monkeypatch.setattr(outbox_module, 'COMPACT_AFTER', 10)
+        box = Outbox(path, keep_done=5)
+        for number in range(20):
+            box.append([(f'k{number}', 1, 'a')])
+            box.deliver(lambda chat_id, text: True)
+        box.close()
+        with open(path) as file:
+            assert len(file.readlines()) < 20, 'Журнал должен сжиматься.'
+        with open(path, 'a') as file:
+            file.write('{"op": "add", "ke')
+        assert not Outbox(path).pending
+
+
+class TestCrashBetweenParseAndSend:
+    def test_notification_is_delivered_after_restart(self, tmp_path):
+        path = str(tmp_path / 'outbox.jsonl')
+        tenant = Tenant('a', 'token', 1)
+        response = {'homeworks': [{
+            'id': 1, 'homework_name': 'hw.zip', 'status': 'approved',
+            'date_updated': '2024-01-01T10:00:00Z'}], 'current_date': 1}
+        state = PollState()
+        runtime = Runtime(Bot(crash=True), state, Lifecycle())
+        runtime.outbox = Outbox(path)
+        with pytest.raises(Crash):
+            homework.handle_homeworks(
+                runtime, tenant, response['homeworks'], response)
+
+        bot = Bot()
+        runtime = Runtime(bot, state, Lifecycle())
+        runtime.outbox = Outbox(path)
+        homework.handle_homeworks(
+            runtime, tenant, response['homeworks'], response)
+        assert len(bot.sent) == 1, (
+            'После перезапуска уведомление должно уйти ровно один раз.'
+        )
@@ -0,0 +1,66 @@
+import homework
+from clock import VirtualClock
+from lifecycle import Lifecycle
+from priority import (DEADLINE, IDLE, REVIEWING, WeightedFairQueue,
+                      parse_deadlines, priority_class)
+from runtime import Runtime
+from state import PollState
+from tenants import Tenant
+
+NOW = 1_700_000_000
+REVIEWING_WORK = {'1': {'status': 'reviewing', 'date_updated': NOW}}
+
+
+class TestPriorityClass:
+    def test_classes_follow_status_and_deadline(self):
+        assert priority_class({}, (NOW + 3600,), NOW) == IDLE
+        assert priority_class(REVIEWING_WORK, (), NOW) == REVIEWING
+        assert priority_class(
+            REVIEWING_WORK, (NOW + 3600,), NOW) == DEADLINE, (
+            'Работа на проверке перед дедлайном важнее всего.'
+        )
+        assert priority_class(
+            REVIEWING_WORK, (NOW - 3600,), NOW) == REVIEWING, (
+            'Прошедший дедлайн не повышает приоритет.'
+        )
+
+    def test_parse_deadlines(self):
+        assert parse_deadlines(
+            '2023-11-15T00:00:00Z, 2023-11-14T22:13:20') == (
+            1_700_000_000, 1_700_006_400)
+        assert parse_deadlines(None) == ()
+
+
+class TestWeightedFairQueue:
+    def test_capacity_split_by_weight(self):
+        queue = WeightedFairQueue()
+        tenants = [Tenant('idle', 't', '1'), Tenant('urgent', 't', '2')]
+        weights = {'idle': 1, 'urgent': 4}
+        served = {'idle': 0, 'urgent': 0}
+        for _ in range(50):
+            first = queue.order(tenants, lambda t: weights[t.id])[0]
+            queue.served(first.id, weights[first.id])
+            served[first.id] += 1
+        assert served == {'idle': 10, 'urgent': 40}, (
+            'Квота должна делиться пропорционально весам.'
+        )
+
+    def test_unserved_tenant_moves_ahead(self):
+        queue = WeightedFairQueue()
+        tenants = [Tenant('a', 't', '1'), Tenant('b', 't', '2')]
+        queue.served('a', 1)
+        assert [t.id for t in queue.order(tenants, lambda t: 1)] == [
+            'b', 'a']
+
+
+class TestDeadlinePolling:
+    def test_deadline_tenant_polled_more_often(self):
+        clock = VirtualClock(NOW)
+        state = PollState(None, NOW)
+        runtime = Runtime(None, state, Lifecycle(), clock=clock)
+        tenant = Tenant('a', 't', '1', deadlines=(NOW + 3600,))
+        assert homework.poll_period(runtime, tenant) == (
+            homework.RETRY_PERIOD)
+        state.tenant('a')['homeworks'].update(REVIEWING_WORK)
+        assert homework.poll_period(runtime, tenant) < (
+            homework.RETRY_PERIOD)
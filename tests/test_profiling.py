@@ -0,0 +1,27 @@
+import os
+
+from profiling import NO_PHASE, Profiler
+
+
+class TestProfiler:
+    def test_disabled_profiler_is_noop(self, tmp_path):
+        profiler = Profiler(output_dir=str(tmp_path))
+        profiler.start_cycle()
+        assert profiler.phase('get_api_answer') is NO_PHASE
+        profiler.end_cycle()
+        assert not os.listdir(tmp_path)
+
+    def test_requested_cycles_are_dumped(self, tmp_path):
+        profiler = Profiler(output_dir=str(tmp_path))
+        profiler.request(cycles=1)
+        profiler.start_cycle()
+        with profiler.phase('get_api_answer'):
+            sum(range(1000))
+        profiler.end_cycle()
+        files = sorted(os.listdir(tmp_path))
+        assert len(files) == 3
+        assert any(name.endswith('.prof') for name in files)
+        profiler.start_cycle()
+        assert not profiler.active, (
+            'После N циклов профилирование должно выключаться.'
+        )
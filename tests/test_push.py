@@ -0,0 +1,115 @@
+import threading
+from http import HTTPStatus
+
+import homework
+from clock import VirtualClock
+from lifecycle import Lifecycle
+from push import PushReceiver, send_push
+from runtime import Runtime
+from simulate import RecordingBot
+from state import PollState
+from tenants import Tenant
+
+
+class TestPushReceiver:
+    PAYLOAD = {
+        'homeworks': [{'homework_name': 'hw1.zip', 'status': 'approved'}],
+        'current_date': 1000198000,
+    }
+
+    def start_receiver(self, handle):
+        receiver = PushReceiver(
+            handle, homework.check_response, ['alice'], port=0,
+            secret='s3cret'
+        )
+        receiver.start()
+        host, port = receiver.address
+        return receiver, f'http://{host}:{port}'
+
+    def test_valid_event_is_handled(self):
+        received = []
+        done = threading.Event()
+
+        def handle(tenant_id, payload):
+            received.append((tenant_id, payload))
+            done.set()
+
+        receiver, url = self.start_receiver(handle)
+        try:
+            status = send_push(url, 'alice', self.PAYLOAD, secret='s3cret')
+            assert status == HTTPStatus.ACCEPTED
+            assert done.wait(1), 'Принятое событие должно быть обработано.'
+            assert received == [('alice', self.PAYLOAD)]
+        finally:
+            receiver.stop()
+
+    def test_invalid_events_are_rejected(self):
+        receiver, url = self.start_receiver(lambda *args: None)
+        try:
+            assert send_push(url, 'alice', self.PAYLOAD) == (
+                HTTPStatus.FORBIDDEN
+            )
+            assert send_push(url, 'bob', self.PAYLOAD, secret='s3cret') == (
+                HTTPStatus.NOT_FOUND
+            )
+            assert send_push(url, 'bob', self.PAYLOAD) == (
+                HTTPStatus.FORBIDDEN
+            ), 'Без секрета нельзя узнать, существует ли тенант.'
+
+            assert send_push(
+                url, 'alice', {'homeworks': {}}, secret='s3cret'
+            ) == HTTPStatus.BAD_REQUEST, (
+                'Событие должно проверяться функцией `check_response`.'
+            )
+        finally:
+            receiver.stop()
+
+    def test_restart_replaces_hung_worker(self):
+        release = threading.Event()
+        hanging = threading.Event()
+        handled = threading.Event()
+
+        def handle(tenant_id, payload):
+            if payload == 'hang':
+                hanging.set()
+                release.wait(5)
+            else:
+                handled.set()
+
+        receiver = PushReceiver(handle, homework.check_response, ['alice'])
+        receiver.restart_worker()
+        hung = receiver.worker
+        receiver.events.put(('alice', 'hang'))
+        assert hanging.wait(1)
+        assert receiver.restart_worker() is True
+        receiver.events.put(('alice', 'next'))
+        try:
+            assert handled.wait(1), (
+                'Новый обработчик должен разбирать очередь, пока прежний '
+                'завис.'
+            )
+            release.set()
+            hung.join(timeout=3)
+            assert not hung.is_alive(), (
+                'Зависший обработчик должен выйти, когда освободится.'
+            )
+        finally:
+            release.set()
+            receiver.server.server_close()
+            receiver.events.put(None)
+
+
+class TestPushState:
+    def test_push_does_not_move_mark(self):
+        clock = VirtualClock(1_699_999_999)
+        runtime = Runtime(RecordingBot(clock), PollState(None, 1_699_900_000),
+                          Lifecycle(), clock=clock)
+        tenant = Tenant('alice', 'token', '100', push=True)
+        homework.handle_homeworks(runtime, tenant, [
+            {'id': 2, 'homework_name': 'hw2', 'status': 'approved',
+             'date_updated': '2023-11-14T22:13:00Z'},
+        ], {'current_date': 1_699_999_999}, polled=False)
+        assert len(runtime.bot.messages) == 1
+        assert runtime.state.tenant('alice')['high_water_mark'] == (
+            1_699_900_000
+        ), 'Сверка должна спрашивать API и о пропущенных push-событиях.'
@@ -0,0 +1,49 @@
+from ratelimit import RateLimiter, parse_retry_after
+from tenants import Tenant
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestRateLimiter:
+    def make_limiter(self, **kwargs):
+        clock = FakeClock()
+        return RateLimiter(clock=clock, sleep=clock.sleep, **kwargs), clock
+
+    def test_bucket_limits_burst(self):
+        limiter, clock = self.make_limiter(rate=1, burst=2)
+        assert limiter.acquire('a', max_wait=0)
+        assert limiter.acquire('b', max_wait=0)
+        assert not limiter.acquire('c', max_wait=0)
+        assert limiter.acquire('c', max_wait=1), (
+            'Токен должен появиться после ожидания.'
+        )
+        assert clock.now == 1
+
+    def test_retry_after_pauses_everyone(self):
+        limiter, clock = self.make_limiter(rate=10, burst=10)
+        limiter.throttled(30)
+        assert not limiter.acquire('a')
+        assert limiter.usage()['throttled'] == 1
+        clock.now += 31
+        assert limiter.acquire('a')
+
+    def test_deferred_tenants_go_first(self):
+        limiter, _ = self.make_limiter(rate=1, burst=1)
+        tenants = [Tenant('a', 't', '1'), Tenant('b', 't', '2')]
+        assert limiter.acquire('a', max_wait=0)
+        assert not limiter.acquire('b', max_wait=0)
+        assert [t.id for t in limiter.fair_order(tenants)] == ['b', 'a']
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after('120') == 120
+        assert parse_retry_after(None) == 60
+        assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0
@@ -0,0 +1,39 @@
+import logging
+import random
+
+from bench_diff import (BENCH_START, api_date, make_responses,
+                        reconcile_date_first)
+from state import PollState
+
+
+class TestReconcile:
+    def test_same_result_as_date_first(self):
+        state, responses = make_responses(5, 300, 0.1, random.Random(1))
+        for tenant_id, response in responses.items():
+            response = response + ['не словарь', {'id': 10_000}]
+            assert state.reconcile(tenant_id, response) == (
+                reconcile_date_first(state, tenant_id, response)
+            ), 'Порядок проверок не должен менять найденные изменения.'
+
+    def test_stale_and_duplicate_updates_skipped(self):
+        state = PollState(None, BENCH_START)
+        seen = {'id': 1, 'status': 'approved',
+                'date_updated': api_date(BENCH_START)}
+        state.mark_seen('alice', seen)
+        stale = dict(seen, status='reviewing',
+                     date_updated=api_date(BENCH_START - 60))
+        newer = dict(seen, status='rejected',
+                     date_updated=api_date(BENCH_START + 60))
+        assert state.reconcile('alice', [seen, stale]) == [], (
+            'Повтор и устаревшее обновление не считаются изменением.'
+        )
+        assert state.reconcile('alice', [newer]) == [newer]
+
+    def test_duplicates_logged_once_per_call(self, caplog):
+        state, responses = make_responses(1, 100, 0, random.Random(2))
+        (tenant_id, response), = responses.items()
+        with caplog.at_level(logging.DEBUG, logger='state'):
+            assert state.reconcile(tenant_id, response) == []
+        assert [record.getMessage() for record in caplog.records] == [
+            'Сообщения не отправлены: дублирование (100).'
+        ], 'Повторы должны попадать в журнал одной строкой на вызов.'
@@ -0,0 +1,62 @@
+import json
+
+import homework
+from recording import Recorder, read_records
+from replay import replay
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = json.dumps(data)
+
+
+class TestRecordAndReplay:
+    def test_recorded_responses_are_replayed(self, tmp_path):
+        path = str(tmp_path / 'responses.jsonl.gz')
+        recorder = Recorder(path)
+        homeworks = [
+            {'id': 1, 'homework_name': 'hw1.zip', 'status': 'reviewing',
+             'date_updated': '2021-04-11T10:31:09Z'},
+            {'id': 1, 'homework_name': 'hw1.zip', 'status': 'reviewing',
+             'date_updated': '2021-04-11T10:31:09Z'},
+            {'id': 1, 'homework_name': 'hw1.zip', 'status': 'approved',
+             'date_updated': '2021-04-12T10:31:09Z'},
+        ]
+        for item in homeworks:
+            recorder.record(
+                {'from_date': 0},
+                FakeResponse({'homeworks': [item], 'current_date': 1}),
+                0.5
+            )
+        recorder.close()
+        assert len(list(read_records(path))) == 3
+
+        stats = replay(read_records(path))
+        assert stats['responses'] == 3
+        assert stats['notifications'] == 2, (
+            'Повтор того же статуса не должен давать уведомления.'
+        )
+        assert stats['errors'] == 0
+
+    def test_throttled_and_streamed_replay(self, tmp_path, monkeypatch):
+        path = str(tmp_path / 'responses.jsonl.gz')
+        recorder = Recorder(path)
+        recorder.record(
+            {'from_date': 0},
+            FakeResponse({}, 429, {'Retry-After': '30'}), 0.1)
+        recorder.record({'from_date': 0}, FakeResponse({
+            'homeworks': [{'id': 1, 'homework_name': 'hw1.zip',
+                           'status': 'approved'}],
+            'current_date': 1}), 0.1)
+        recorder.close()
+        monkeypatch.setattr(homework, 'STREAM_RESPONSES', '1')
+        stats = replay(read_records(path))
+        assert stats['throttled'] == 1, (
+            'Записанный ответ 429 должен воспроизводиться как ThrottledError.'
+        )
+        assert stats['errors'] == 0
+        assert stats['notifications'] == 1, (
+            'Воспроизведение должно работать и с потоковым разбором.'
+        )
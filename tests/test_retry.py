@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+from telebot.apihelper import ApiTelegramException
+
+import homework
+from clock import VirtualClock
+from exeptions import (AuthError, ChatBlockedError, EndpointError,
+                       ServerError, ThrottledError)
+from lifecycle import Lifecycle
+from retry import RetryTracker, policy_for, telegram_error
+from runtime import Runtime
+from state import PollState
+from tenants import Tenant
+
+
+class FakeResponse:
+    url = homework.ENDPOINT
+    headers = {}
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class RecordingBot:
+    def __init__(self):
+        self.messages = []
+
+    def send_message(self, chat_id, text, **kwargs):
+        self.messages.append((chat_id, text))
+
+
+class TestRetryPolicy:
+    def test_most_specific_policy_wins(self):
+        assert policy_for(ThrottledError('429', 10)).pause
+        assert not policy_for(AuthError('401')).retry
+        assert policy_for(EndpointError('x')).retry
+        assert policy_for(KeyError('homeworks')).title == (
+            'Ошибка в ответе API'
+        )
+
+    def test_backoff_doubles_up_to_limit(self):
+        clock = VirtualClock(0)
+        tracker = RetryTracker(clock=clock.time)
+        delays = []
+        for _ in range(6):
+            tracker.failed('a', ServerError('500'))
+            delays.append(tracker.blocked_until['a'] - clock.time())
+        assert delays == [300, 600, 1200, 2400, 3600, 3600]
+        tracker.succeeded('a')
+        assert tracker.ready('a'), 'Успешный опрос должен сбросить сбои.'
+
+    def test_telegram_blocked_chat_is_classified(self):
+        blocked = ApiTelegramException('sendMessage', None, {
+            'error_code': 403,
+            'description': 'Forbidden: bot was blocked by the user'})
+        other = ApiTelegramException('sendMessage', None, {
+            'error_code': 500, 'description': 'Internal Server Error'})
+        assert isinstance(telegram_error(blocked, 42), ChatBlockedError)
+        assert telegram_error(other, 42) is other
+
+
+class TestRevokedToken:
+    def test_revoked_token_suspends_tenant(self):
+        clock = VirtualClock(1_700_000_000)
+        bot = RecordingBot()
+        calls = []
+
+        def get(url, **kwargs):
+            calls.append(kwargs['headers'])
+            return FakeResponse(HTTPStatus.UNAUTHORIZED)
+
+        runtime = Runtime(
+            bot, PollState(None, int(clock.time())), Lifecycle(), clock=clock)
+        runtime.http_get = get
+        runtime.set_tenants([Tenant('a', 'revoked', 1)])
+        for _ in range(10):
+            homework.run_cycle(runtime)
+            clock.sleep(homework.RETRY_PERIOD)
+        assert len(calls) == 1, (
+            'Тенант с отозванным токеном не должен опрашиваться каждый цикл.'
+        )
+        assert len(bot.messages) == 1
+        assert runtime.retries.report()['suspended'] == {
+            'a': 'API отклонил токен'
+        }
+
+        homework.apply_config(
+            runtime, 'tenants', [Tenant('a', 'new-token', 1)])
+        homework.run_cycle(runtime)
+        assert len(calls) == 2, (
+            'Новый токен в TENANTS_FILE должен снимать приостановку.'
+        )
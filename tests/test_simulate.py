@@ -0,0 +1,46 @@
+import homework
+from clock import VirtualClock
+from simulate import simulate
+
+
+class TestVirtualClock:
+    def test_sleep_advances_time_without_waiting(self):
+        clock = VirtualClock(100)
+        clock.sleep(600)
+        assert clock.time() == 700, (
+            'sleep виртуальных часов должен сдвигать время.'
+        )
+        assert clock.monotonic() == 700
+
+
+class TestSimulation:
+    def test_days_of_polling_without_duplicates(self):
+        stats = simulate(tenants=3, days=3, seed=1)
+        # Сдвиг последнего опроса может уложить его в конец прогона.
+        expected_calls = 3 * 3 * 86400 // homework.RETRY_PERIOD
+        assert expected_calls <= stats['api_calls'] <= expected_calls + 3
+        assert stats['notifications'] > 0
+        assert stats['duplicates'] == 0, (
+            'Бот не должен повторять уведомления.'
+        )
+        assert stats['latency_max'] <= homework.RETRY_PERIOD, (
+            'Без ограничений API уведомление приходит за один период.'
+        )
+
+    def test_throttled_api_delays_but_not_duplicates(self):
+        stats = simulate(tenants=3, days=2, throttle=0.2, seed=2)
+        assert stats['api_throttled'] > 0
+        assert stats['duplicates'] == 0, (
+            'Ответы 429 не должны приводить к повторным уведомлениям.'
+        )
+
+    def test_overload_sheds_idle_tenants(self):
+        stats = simulate(tenants=40, days=1, seed=4, api_latency=20)
+        assert stats['shed_rate'] > 0, (
+            'При перегрузке опросы тенантов без проверок должны '
+            'откладываться.'
+        )
+        assert stats['duplicates'] == 0
+        assert stats['latency_max'] <= (
+            (homework.SHED_FACTOR + 1) * homework.RETRY_PERIOD
+        )
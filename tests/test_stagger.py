@@ -0,0 +1,76 @@
+import homework
+from clock import VirtualClock
+from health import Watchdog
+from lifecycle import Lifecycle
+from runtime import Runtime
+from stagger import JITTER_FRACTION, StaggeredSchedule
+from state import PollState
+from tenants import Tenant
+
+PERIOD = 600
+
+
+class TestStaggeredSchedule:
+    def test_first_polls_spread_evenly(self):
+        schedule = StaggeredSchedule(1000)
+        schedule.plan([f'tenant{number}' for number in range(4)])
+        starts = sorted(
+            schedule.slot(tenant_id, 0, PERIOD)
+            for tenant_id in schedule.fractions)
+        assert starts == [1000, 1150, 1300, 1450], (
+            'Первые опросы должны делить период поровну.'
+        )
+
+    def test_single_tenant_polls_immediately_without_jitter(self):
+        schedule = StaggeredSchedule(1000)
+        schedule.plan(['default'])
+        assert schedule.next_due('default', 0, PERIOD) == 1000
+        assert schedule.next_due('default', 1000, PERIOD) == 1600
+
+    def test_jitter_is_bounded_and_does_not_drift(self):
+        schedule = StaggeredSchedule(0)
+        schedule.plan([f'tenant{number}' for number in range(10)])
+        spread = JITTER_FRACTION * PERIOD / 10
+        last_poll = 0
+        for _ in range(100):
+            due = schedule.next_due('tenant3', last_poll, PERIOD)
+            grid = schedule.slot('tenant3', last_poll, PERIOD)
+            assert abs(due - grid) <= spread
+            last_poll = schedule.polled('tenant3', last_poll, PERIOD, due)
+        assert last_poll == grid, (
+            'Сдвиги не должны накапливаться от опроса к опросу.'
+        )
+
+    def test_late_poll_restarts_grid(self):
+        schedule = StaggeredSchedule(0)
+        schedule.plan(['default'])
+        assert schedule.polled('default', 600, PERIOD, 1300) == 1200
+        assert schedule.polled('default', 600, PERIOD, 5000) == 5400
+
+    def test_late_polls_keep_tenant_phases(self):
+        schedule = StaggeredSchedule(1000)
+        schedule.plan([f'tenant{number}' for number in range(4)])
+        marks = sorted(
+            schedule.polled(tenant_id, 1000, PERIOD, 9000)
+            for tenant_id in schedule.fractions)
+        assert marks == [9100, 9250, 9400, 9550], (
+            'Отставшие вместе тенанты должны вернуться на свои доли '
+            'периода, а не опрашиваться одновременно.'
+        )
+
+
+class TestNextWakeup:
+    def test_wakes_for_each_tenant_slot(self):
+        clock = VirtualClock(0)
+        runtime = Runtime(None, PollState(None, 0), Lifecycle(), clock=clock)
+        runtime.watchdog = Watchdog(PERIOD, clock.monotonic)
+        runtime.set_tenants([
+            Tenant(f'tenant{number}', 'token', number)
+            for number in range(3)
+        ])
+        runtime.watchdog.cycle_started()
+        spread = JITTER_FRACTION * PERIOD / 3
+        assert abs(homework.next_wakeup(runtime) - PERIOD / 3) <= spread + 1, (
+            'Бот должен просыпаться к опросу следующего тенанта, '
+            'а не через весь период.'
+        )
@@ -0,0 +1,49 @@
+from state import LATE_UPDATES_WINDOW, PollState
+
+
+class TestPollState:
+    HOMEWORK = {
+        'id': 1,
+        'homework_name': 'hw1.zip',
+        'status': 'reviewing',
+        'date_updated': '2021-04-11T10:31:09Z',
+    }
+
+    def test_reconcile_skips_duplicates(self):
+        state = PollState(start_timestamp=100)
+        assert state.reconcile('t', [self.HOMEWORK]) == [self.HOMEWORK]
+        state.mark_seen('t', self.HOMEWORK)
+        assert state.reconcile('t', [dict(self.HOMEWORK)]) == [], (
+            'Повторно пришедшая работа не должна считаться изменением.'
+        )
+
+    def test_reconcile_skips_stale_update(self):
+        state = PollState(start_timestamp=100)
+        newer = dict(self.HOMEWORK, status='approved',
+                     date_updated='2021-04-12T10:31:09Z')
+        state.mark_seen('t', newer)
+        assert state.reconcile('t', [self.HOMEWORK]) == [], (
+            'Запаздывающее обновление не должно перезаписывать новое.'
+        )
+
+    def test_from_date_follows_high_water_mark(self):
+        state = PollState(start_timestamp=100)
+        state.mark_seen('t', self.HOMEWORK)
+        assert state.tenant('t')['high_water_mark'] == 100, (
+            'Отметка тенанта не должна сдвигаться по отдельной работе.'
+        )
+        state.advance_past('t', [self.HOMEWORK], None)
+        state.advance('t', 50)
+        mark = state.tenant('t')['high_water_mark']
+        assert mark == 1618137069
+        assert state.from_date('t') == mark - LATE_UPDATES_WINDOW
+
+    def test_state_survives_restart(self, tmp_path):
+        path = str(tmp_path / 'state.json')
+        state = PollState(path, start_timestamp=100)
+        state.mark_seen('t', self.HOMEWORK)
+        state.advance_past('t', [self.HOMEWORK], None)
+        state.save()
+        restored = PollState(path, start_timestamp=200)
+        assert restored.reconcile('t', [self.HOMEWORK]) == []
+        assert restored.from_date('t') == state.from_date('t')
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+import requests
+
+import homework
+from exeptions import EndpointError, MalformedResponseError
+from simulate import simulate
+from streaming import HomeworkStream
+
+
+def chunked(data, size):
+    raw = json.dumps(data, ensure_ascii=False).encode()
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+
+class TestHomeworkStream:
+    def test_records_and_fields_split_across_chunks(self):
+        data = {
+            'homeworks': [
+                {'id': 12345, 'homework_name': 'Работа №1', 'status': 'ok'},
+                {'id': 67890, 'homework_name': 'hw2', 'status': 'ok'},
+            ],
+            'current_date': 1700000000,
+        }
+        for size in (1, 3, 7, 1024):
+            stream = HomeworkStream(chunked(data, size))
+            assert list(stream) == data['homeworks'], (
+                f'Записи должны разбираться при кусках по {size} байт.'
+            )
+            assert stream.get('current_date') == 1700000000, (
+                'Число на границе кусков не должно обрываться.'
+            )
+
+    def test_records_are_yielded_before_body_is_read(self):
+        read = []
+
+        def chunks():
+            yield b'{"homeworks": [{"id": 1}, '
+            read.append('tail')
+            yield b'{"id": 2}], "current_date": 5}'
+
+        records = iter(HomeworkStream(chunks()))
+        assert next(records) == {'id': 1}
+        assert not read, (
+            'Первая запись должна выдаваться до чтения всего ответа.'
+        )
+
+    @pytest.mark.parametrize('body, error', [
+        (b'', KeyError),
+        (b'[]', TypeError),
+        (b'{"current_date": 1}', KeyError),
+        (b'{"homeworks": {}}', TypeError),
+        (b'{"homeworks": [{"id": 1}', MalformedResponseError),
+        (b'{"homeworks": [{"id": 1}}', MalformedResponseError),
+        (b'{"homeworks": [\xff]}', MalformedResponseError),
+    ])
+    def test_invalid_structure(self, body, error):
+        with pytest.raises(error):
+            list(HomeworkStream([body]))
+
+    def test_broken_connection_is_endpoint_error(self):
+        def chunks():
+            yield b'{"homeworks": [{"id": 1}, '
+            raise requests.ConnectionError('connection reset')
+
+        with pytest.raises(EndpointError) as error:
+            list(HomeworkStream(chunks()))
+        assert not isinstance(error.value, MalformedResponseError), (
+            'Обрыв соединения не должен считаться повреждённым ответом.'
+        )
+
+
+class TestStreamingPolling:
+    def test_streaming_gives_same_notifications(self, monkeypatch):
+        expected = simulate(tenants=2, days=1, seed=3)
+        monkeypatch.setattr(homework, 'STREAM_RESPONSES', '1')
+        monkeypatch.setattr(homework, 'STREAM_CHUNK_SIZE', 16)
+        assert simulate(tenants=2, days=1, seed=3) == expected, (
+            'Потоковый разбор не должен менять уведомления.'
+        )
@@ -0,0 +1,78 @@
+import json
+from datetime import datetime
+
+import homework
+from clock import VirtualClock
+from lifecycle import Lifecycle
+from runtime import Runtime
+from simulate import RecordingBot
+from state import PollState
+from subscriptions import OutgoingBatch, SubscriptionRegistry, quiet_until
+from tenants import Tenant
+
+
+class TestSubscriptions:
+    TENANT = Tenant('alice', 'token', '100')
+
+    def test_default_subscriber_is_tenant_chat(self):
+        registry = SubscriptionRegistry(None)
+        subscribers = registry.subscribers_for(self.TENANT, 'approved')
+        assert [s.chat_id for s in subscribers] == ['100']
+
+    def test_filters_by_status(self, tmp_path):
+        path = tmp_path / 'subscriptions.json'
+        path.write_text(json.dumps({'alice': [
+            {'chat_id': '100'},
+            {'chat_id': '200', 'statuses': ['approved', 'rejected']},
+            {'chat_id': '300', 'quiet_hours': [23, 8]},
+        ]}))
+        registry = SubscriptionRegistry(str(path))
+        chats = [s.chat_id for s in registry.subscribers_for(
+            self.TENANT, 'reviewing')]
+        assert chats == ['100', '300'], (
+            'Тихие часы не должны отфильтровывать событие.'
+        )
+        chats = [s.chat_id for s in registry.subscribers_for(
+            self.TENANT, 'approved')]
+        assert chats == ['100', '200', '300']
+
+    def test_quiet_until(self):
+        assert quiet_until((23, 8), datetime(2024, 1, 1, 2)) == (
+            datetime(2024, 1, 1, 8))
+        assert quiet_until((23, 8), datetime(2024, 1, 1, 23, 30)) == (
+            datetime(2024, 1, 2, 8))
+        assert quiet_until((23, 8), datetime(2024, 1, 1, 12)) is None
+
+    def test_quiet_hours_defer_event(self, tmp_path):
+        path = tmp_path / 'subscriptions.json'
+        path.write_text(json.dumps({'alice': [
+            {'chat_id': '300', 'quiet_hours': [23, 8]},
+        ]}))
+        night = datetime(2024, 1, 1, 2).timestamp()
+        clock = VirtualClock(night)
+        bot = RecordingBot(clock)
+        runtime = Runtime(
+            bot, PollState(None, int(night)), Lifecycle(),
+            SubscriptionRegistry(str(path)), clock=clock)
+        homework.handle_homeworks(runtime, self.TENANT, [
+            {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+        ], {'current_date': int(night)})
+        assert bot.messages == [], 'В тихие часы сообщения не отправляются.'
+        clock.sleep(6 * 3600)
+        homework.send_digests(runtime)
+        assert len(bot.messages) == 1, (
+            'Событие в тихие часы должно прийти после их конца.'
+        )
+        assert 'hw1' in bot.messages[0][1]
+
+    def test_batch_merges_messages_per_chat(self):
+        batch = OutgoingBatch(rate=1000)
+        batch.add('100', 'first')
+        batch.add('200', 'first')
+        batch.add('100', 'second')
+        sent = []
+        batch.flush(lambda chat_id, text: sent.append((chat_id, text)))
+        assert sent == [('100', 'first\n\nsecond'), ('200', 'first')], (
+            'Сообщения для одного чата должны уходить одной отправкой.'
+        )
+        assert len(batch) == 0
@@ -0,0 +1,89 @@
+import json
+import random
+
+import pytest
+
+import homework
+from clock import VirtualClock
+from health import Watchdog
+from lifecycle import Lifecycle
+from runtime import Runtime
+from simulate import SIMULATION_START, RecordingBot, SimulatedAPI
+from state import PollState
+from tenants import Tenant
+from tracing import NO_SPAN, TRACE_MAX_SPANS, Tracer
+
+
+def read_spans(path):
+    spans = []
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            for resource in json.loads(line)['resourceSpans']:
+                for scope in resource['scopeSpans']:
+                    spans.extend(scope['spans'])
+    return spans
+
+
+def traced_cycle(monkeypatch, path, sample=1.0):
+    clock = VirtualClock(SIMULATION_START)
+    api = SimulatedAPI(clock, random.Random(0))
+    api.schedule('token', SIMULATION_START - 10, 1, 'approved')
+    runtime = Runtime(
+        RecordingBot(clock), PollState(None, SIMULATION_START - 100),
+        Lifecycle(), clock=clock)
+    runtime.http_get = api.get
+    runtime.watchdog = Watchdog(homework.RETRY_PERIOD, clock.monotonic)
+    runtime.set_tenants([Tenant('default', 'token', 42)])
+    tracer = Tracer(path, sample=sample, rng=random.Random(0))
+    monkeypatch.setattr(homework, 'tracer', tracer)
+    homework.run_iteration(runtime)
+    tracer.close()
+
+
+class TestTracer:
+    def test_cycle_spans_form_one_trace(self, monkeypatch, tmp_path):
+        path = tmp_path / 'traces.jsonl'
+        traced_cycle(monkeypatch, path)
+        spans = {span['name']: span for span in read_spans(path)}
+        assert set(spans) == {
+            'poll_cycle', 'poll', 'http_fetch', 'json_decode',
+            'check_response', 'parse_status', 'send_message',
+        }, 'Каждая фаза цикла должна попадать в трассу.'
+        assert len({span['traceId'] for span in spans.values()}) == 1
+        assert 'parentSpanId' not in spans['poll_cycle']
+        assert spans['poll']['parentSpanId'] == (
+            spans['poll_cycle']['spanId'])
+        assert spans['http_fetch']['parentSpanId'] == spans['poll']['spanId']
+        assert {'key': 'tenant', 'value': {'stringValue': 'default'}} in (
+            spans['poll']['attributes'])
+        assert {'key': 'status', 'value': {'stringValue': 'approved'}} in (
+            spans['parse_status']['attributes'])
+
+    def test_unsampled_cycle_writes_nothing(self, monkeypatch, tmp_path):
+        path = tmp_path / 'traces.jsonl'
+        traced_cycle(monkeypatch, path, sample=0)
+        assert not path.exists(), (
+            'Неотобранный цикл не должен записывать трассы.'
+        )
+
+    def test_error_status_and_batching(self, tmp_path):
+        path = tmp_path / 'traces.jsonl'
+        tracer = Tracer(path, sample=1, batch=2)
+        with pytest.raises(ValueError):
+            with tracer.trace('cycle'):
+                with tracer.span('step'):
+                    raise ValueError('сбой')
+        spans = read_spans(path)
+        assert [span['name'] for span in spans] == ['step', 'cycle']
+        assert spans[0]['status'] == {
+            'code': 'STATUS_CODE_ERROR', 'message': 'ValueError: сбой'}
+        assert tracer.current() is None
+
+    def test_spans_per_trace_are_bounded(self, tmp_path):
+        tracer = Tracer(tmp_path / 'traces.jsonl', sample=1)
+        with tracer.trace('cycle'):
+            for _ in range(TRACE_MAX_SPANS + 10):
+                with tracer.span('send'):
+                    pass
+        assert tracer.dropped == 11
+        assert tracer.span('outside') is NO_SPAN
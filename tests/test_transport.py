@@ -0,0 +1,50 @@
+import pytest
+from telebot import TeleBot, apihelper
+from telebot.apihelper import ApiTelegramException
+
+import homework
+from transport import FakeTelegramSession, TelegramTransport
+
+
+@pytest.fixture
+def fake_transport():
+    session = FakeTelegramSession(failures={13: 403})
+    transport = TelegramTransport(session=session)
+    transport.install()
+    yield transport, session
+    transport.uninstall()
+
+
+class TestTelegramTransport:
+    def test_messages_go_through_transport(self, fake_transport):
+        transport, session = fake_transport
+        bot = TeleBot(token='123:TEST')
+        bot.send_message(42, 'Привет')
+        bot.send_message(42, 'Ещё раз')
+        assert session.sent == [('42', 'Привет'), ('42', 'Ещё раз')], (
+            'TeleBot должен отправлять запросы через транспорт.'
+        )
+        report = transport.report()['sendMessage']
+        assert report['calls'] == 2
+        assert report['errors'] == {}
+
+    def test_errors_are_counted(self, fake_transport):
+        transport, _ = fake_transport
+        bot = TeleBot(token='123:TEST')
+        with pytest.raises(ApiTelegramException):
+            bot.send_message(13, 'Привет')
+        assert transport.report()['sendMessage']['errors'] == {'403': 1}
+        homework.send_to_chat(bot, 13, 'Привет')
+        assert transport.report()['sendMessage']['calls'] == 2, (
+            'Ошибка отправки не должна прерывать работу бота.'
+        )
+
+    def test_uninstall_restores_sender(self):
+        previous = apihelper.CUSTOM_REQUEST_SENDER
+        session = FakeTelegramSession()
+        transport = TelegramTransport(session=session)
+        transport.install()
+        assert apihelper.CUSTOM_REQUEST_SENDER is transport
+        transport.uninstall()
+        assert apihelper.CUSTOM_REQUEST_SENDER is previous
+        assert session.closed
@@ -0,0 +1,211 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+TRACE_FILE = os.getenv("TRACE_FILE")
+# Доля трассируемых циклов: решение принимается один раз на цикл,
+# поэтому неотобранный цикл не создаёт ни одного span.
+TRACE_SAMPLE = float(os.getenv("TRACE_SAMPLE", 0.1))
+TRACE_BATCH = 512
+TRACE_FLUSH_SECONDS = 5
+# Больше стольких span на одну трассу не записывается.
+TRACE_MAX_SPANS = 1000
+SERVICE_NAME = "homework-bot"
+
+logger = logging.getLogger(__name__)
+
+
+class NoSpan:
+    """Span неотобранного цикла: ничего не замеряет и не записывает."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set(self, key, value):
+        """Ничего не делает."""
+
+
+# Общий пустой span: в выключенном состоянии span() не создаёт объектов.
+NO_SPAN = NoSpan()
+
+
+def encode_value(value):
+    """Значение атрибута в виде OTLP JSON."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # В OTLP JSON 64-битные целые передаются строкой.
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """Замер одной операции внутри трассы."""
+
+    def __init__(self, tracer, name, trace_id, parent, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.parent = parent
+        self.root = parent.root if parent is not None else self
+        self.span_id = f"{tracer.rng.getrandbits(64):016x}"
+        self.attributes = attributes
+        self.spans = 1
+        self.error = None
+
+    def set(self, key, value):
+        """Добавляет атрибут span."""
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self.previous = self.tracer.current()
+        self.tracer.local.span = self
+        self.start = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.end = time.time_ns()
+        self.tracer.local.span = self.previous
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc_value}"
+        self.tracer.finish(self)
+        return False
+
+    def encode(self):
+        """Span в виде OTLP JSON."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end),
+            "attributes": [
+                {"key": key, "value": encode_value(value)}
+                for key, value in self.attributes.items()
+            ],
+        }
+        if self.parent is not None:
+            span["parentSpanId"] = self.parent.span_id
+        if self.error is not None:
+            span["status"] = {
+                "code": "STATUS_CODE_ERROR", "message": self.error}
+        return span
+
+
+class JsonlSpanExporter:
+    """Дописывает пачки span в файл JSONL.
+
+    Каждая строка — запрос экспорта в формате OTLP JSON
+    (resourceSpans → scopeSpans → spans), поэтому файл можно
+    загрузить в коллектор OpenTelemetry или разобрать jq.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def export(self, spans):
+        """Записывает пачку span одной строкой."""
+        line = json.dumps({"resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name",
+                 "value": encode_value(SERVICE_NAME)},
+            ]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+        }]}, ensure_ascii=False)
+        try:
+            if self.file is None:
+                self.file = open(self.path, "a", encoding="utf-8")
+            self.file.write(line + "\n")
+            self.file.flush()
+        except OSError as error:
+            logger.error(f"Не удалось записать трассы: {error}")
+
+    def close(self):
+        """Закрывает файл трасс."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class Tracer:
+    """Трассировка циклов опроса с выборкой.
+
+    Корневой span цикла создаёт trace, вложенные — span. Текущий span
+    хранится отдельно для каждого потока, поэтому вложенные операции
+    находят родителя сами. Законченные span копятся в памяти и уходят
+    в экспортёр пачками по batch штук или раз в TRACE_FLUSH_SECONDS.
+    Пока TRACE_FILE не задан или цикл не попал в выборку, trace и span
+    возвращают пустой NO_SPAN.
+    """
+
+    def __init__(self, path=TRACE_FILE, sample=TRACE_SAMPLE,
+                 batch=TRACE_BATCH, rng=None):
+        self.exporter = JsonlSpanExporter(path) if path else None
+        self.sample = sample
+        self.batch = batch
+        self.rng = rng or random.Random()
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.flushed = time.monotonic()
+        self.dropped = 0
+
+    def current(self):
+        """Текущий span потока или None."""
+        return getattr(self.local, "span", None)
+
+    def trace(self, name, **attributes):
+        """Корневой span новой трассы, если она попала в выборку."""
+        if self.current() is not None:
+            return self.span(name, **attributes)
+        if self.exporter is None or self.rng.random() >= self.sample:
+            return NO_SPAN
+        trace_id = f"{self.rng.getrandbits(128):032x}"
+        return Span(self, name, trace_id, None, attributes)
+
+    def span(self, name, **attributes):
+        """Вложенный span текущей трассы."""
+        parent = self.current()
+        if parent is None:
+            return NO_SPAN
+        if parent.root.spans >= TRACE_MAX_SPANS:
+            self.dropped += 1
+            return NO_SPAN
+        parent.root.spans += 1
+        return Span(self, name, parent.trace_id, parent, attributes)
+
+    def finish(self, span):
+        """Откладывает законченный span до отправки пачкой."""
+        with self.lock:
+            self.buffer.append(span.encode())
+            due = len(self.buffer) >= self.batch or (
+                span.parent is None
+                and time.monotonic() - self.flushed >= TRACE_FLUSH_SECONDS)
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Отправляет накопленные span в экспортёр."""
+        with self.lock:
+            spans, self.buffer = self.buffer, []
+            self.flushed = time.monotonic()
+            if spans and self.exporter is not None:
+                self.exporter.export(spans)
+
+    def close(self):
+        """Отправляет остаток и закрывает экспортёр."""
+        self.flush()
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+tracer = Tracer()
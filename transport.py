@@ -0,0 +1,165 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from telebot import apihelper
+from urllib3.util.retry import Retry
+
+from health import percentile
+
+TELEGRAM_CONNECT_TIMEOUT = float(os.getenv("TELEGRAM_CONNECT_TIMEOUT", 5))
+TELEGRAM_READ_TIMEOUT = float(os.getenv("TELEGRAM_READ_TIMEOUT", 15))
+TELEGRAM_POOL_SIZE = int(os.getenv("TELEGRAM_POOL_SIZE", 10))
+# Повторяем только установку соединения: повтор чтения после того, как
+# Telegram принял sendMessage, дал бы дубликат сообщения.
+TELEGRAM_CONNECT_RETRIES = 2
+LATENCY_HISTORY = 200
+
+logger = logging.getLogger(__name__)
+
+
+def tuned_session(pool_size=TELEGRAM_POOL_SIZE):
+    """Сессия с постоянными соединениями к api.telegram.org."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1, pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=TELEGRAM_CONNECT_RETRIES, connect=TELEGRAM_CONNECT_RETRIES,
+            read=0, status=0, other=0, backoff_factor=0.5))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class TelegramTransport:
+    """Транспорт запросов TeleBot к Bot API.
+
+    Подключается к telebot через apihelper.CUSTOM_REQUEST_SENDER, поэтому
+    работает с любым экземпляром TeleBot. Все запросы идут через одну
+    сессию с пулом соединений и явными тайм-аутами, а по каждому методу
+    API считаются вызовы, ошибки и задержки. Вместо настоящей сессии
+    можно передать FakeTelegramSession.
+    """
+
+    def __init__(self, session=None, connect_timeout=TELEGRAM_CONNECT_TIMEOUT,
+                 read_timeout=TELEGRAM_READ_TIMEOUT):
+        self.session = session or tuned_session()
+        self.timeout = (connect_timeout, read_timeout)
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.previous = None
+        self.installed = False
+
+    def __call__(self, method, url, params=None, files=None,
+                 timeout=None, proxies=None):
+        """Выполняет запрос к Bot API и учитывает его в статистике."""
+        name = url.rsplit("/", 1)[-1]
+        started = time.perf_counter()
+        error = None
+        try:
+            response = self.session.request(
+                method, url, params=params, files=files,
+                timeout=self.timeout, proxies=proxies)
+        except requests.RequestException as exc:
+            error = type(exc).__name__
+            raise
+        else:
+            if response.status_code != 200:
+                error = str(response.status_code)
+            return response
+        finally:
+            self.observe(name, time.perf_counter() - started, error)
+
+    def observe(self, name, elapsed, error):
+        """Учитывает один вызов метода name."""
+        with self.lock:
+            stats = self.stats.setdefault(name, {
+                "calls": 0, "errors": {},
+                "latency": deque(maxlen=LATENCY_HISTORY)})
+            stats["calls"] += 1
+            stats["latency"].append(elapsed)
+            if error is not None:
+                stats["errors"][error] = stats["errors"].get(error, 0) + 1
+        if error is not None:
+            logger.warning(f"Запрос Telegram {name} завершился: {error}")
+
+    def report(self):
+        """Сводка по методам: вызовы, ошибки и задержки в секундах."""
+        with self.lock:
+            return {
+                name: {
+                    "calls": stats["calls"],
+                    "errors": dict(stats["errors"]),
+                    "latency_p50": round(percentile(stats["latency"], 0.5), 3),
+                    "latency_p95": round(
+                        percentile(stats["latency"], 0.95), 3),
+                    "latency_max": round(max(stats["latency"]), 3),
+                }
+                for name, stats in self.stats.items()
+            }
+
+    def install(self):
+        """Направляет запросы всех экземпляров TeleBot в этот транспорт."""
+        if not self.installed:
+            self.previous = apihelper.CUSTOM_REQUEST_SENDER
+            apihelper.CUSTOM_REQUEST_SENDER = self
+            self.installed = True
+
+    def uninstall(self):
+        """Возвращает прежний способ отправки запросов и закрывает пул."""
+        if self.installed:
+            apihelper.CUSTOM_REQUEST_SENDER = self.previous
+            self.installed = False
+        self.session.close()
+
+
+class FakeTelegramResponse:
+    """Ответ Bot API в том виде, в каком его разбирает telebot."""
+
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self.text = json.dumps(data, ensure_ascii=False)
+        self.data = data
+
+    def json(self):
+        """Тело ответа."""
+        return self.data
+
+
+class FakeTelegramSession:
+    """Сессия-заглушка Bot API для тестов и моделирования.
+
+    Запоминает отправленные сообщения; для чатов из failures отвечает
+    ошибкой Telegram с указанным кодом.
+    """
+
+    def __init__(self, failures=None):
+        self.sent = []
+        self.failures = {
+            str(chat_id): code for chat_id, code in (failures or {}).items()}
+        self.closed = False
+
+    def request(self, method, url, params=None, files=None, **kwargs):
+        """Отвечает как Bot API на sendMessage и другие методы."""
+        params = params or {}
+        chat_id = str(params.get("chat_id"))
+        if chat_id in self.failures:
+            code = self.failures[chat_id]
+            return FakeTelegramResponse(code, {
+                "ok": False, "error_code": code,
+                "description": f"Fake error {code}"})
+        self.sent.append((chat_id, params.get("text")))
+        return FakeTelegramResponse(200, {"ok": True, "result": {
+            "message_id": len(self.sent), "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": params.get("text"),
+        }})
+
+    def close(self):
+        """Закрывает сессию."""
+        self.closed = True